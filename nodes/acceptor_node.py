@@ -1,584 +1,1267 @@
-import json
-import time
-import threading
-import logging
-import uuid
-import random
-import requests
-from flask import request, jsonify
-from collections import OrderedDict
-
-from base_node import BaseNode
-
-class Acceptor(BaseNode):
-    """
-    Implementação do nó Acceptor no algoritmo Paxos.
-    Responsável por aceitar ou rejeitar propostas dos proposers,
-    garantindo a consistência do consenso no sistema distribuído.
-    """
-    
-    def __init__(self, app=None):
-        """
-        Inicializa o nó Acceptor com seu estado persistente.
-        """
-        super().__init__(app)
-        
-        # Estado persistente (deve ser salvo para recuperação após falhas)
-        self.max_promised = 0        # Maior número de proposta prometido
-        self.max_accepted = 0        # Maior número de proposta aceito
-        self.accepted_value = None   # Valor associado ao max_accepted
-        
-        # Histórico de propostas (limitado aos últimos N)
-        self.proposal_history = OrderedDict()
-        self.max_history_size = 100  # Tamanho máximo do histórico
-        
-        # Estado volátil (reinicializado após falhas)
-        self.last_heartbeat_time = 0
-        self.current_leader_id = None
-        self.proposer_heartbeats = {}
-        
-        # Cache para otimização de desempenho
-        self.response_cache = {}
-        self.cache_ttl = 60  # Tempo de vida do cache em segundos
-        self.cache_cleanup_interval = 300  # Intervalo de limpeza do cache em segundos
-        
-        # Controle de monitoramento do líder
-        self.leader_timeout = 10     # Segundos para considerar o líder como falho
-        
-        # Métricas e estatísticas
-        self.metrics = {
-            "promises_made": 0,
-            "promises_rejected": 0,
-            "values_accepted": 0,
-            "accepts_rejected": 0,
-            "learner_notifications": 0,
-            "heartbeats_received": 0
-        }
-        
-        # Parâmetros de comunicação
-        self.notification_batch_size = 10  # Tamanho do lote para notificações
-        self.pending_notifications = []    # Fila de notificações pendentes
-        
-        self.logger.info(f"Acceptor inicializado com ID {self.node_id}")
-    
-    def _get_default_port(self):
-        """Porta padrão para acceptors"""
-        return 4000
-    
-    def _register_routes(self):
-        """Registra as rotas específicas do acceptor"""
-        @self.app.route('/prepare', methods=['POST'])
-        def prepare():
-            """Receber mensagem PREPARE de um proposer"""
-            return self._handle_prepare(request.json)
-        
-        @self.app.route('/accept', methods=['POST'])
-        def accept():
-            """Receber mensagem ACCEPT de um proposer"""
-            return self._handle_accept(request.json)
-        
-        @self.app.route('/status', methods=['GET'])
-        def status():
-            """Retorna o status atual do acceptor"""
-            return self._handle_status()
-        
-        @self.app.route('/heartbeat', methods=['POST'])
-        def heartbeat():
-            """Receber heartbeat do líder"""
-            return self._handle_heartbeat(request.json)
-    
-    def _start_threads(self):
-        """Inicia as threads específicas do acceptor"""
-        # Thread para verificar o status do líder
-        threading.Thread(target=self._check_leader_status, daemon=True).start()
-        
-        # Thread para envio em lote de notificações aos learners
-        threading.Thread(target=self._notify_learners_batch, daemon=True).start()
-        
-        # Thread para limpeza periódica do cache
-        threading.Thread(target=self._cleanup_cache, daemon=True).start()
-    
-    def _generate_tid(self):
-        """
-        Gera um Transaction ID (TID) único para cada operação.
-        
-        Returns:
-            str: TID único no formato 'acceptor_id-timestamp-random'
-        """
-        timestamp = int(time.time() * 1000)
-        random_part = random.randint(1000, 9999)
-        return f"{self.node_id}-{timestamp}-{random_part}"
-    
-    def _handle_prepare(self, data):
-        """
-        Processa uma mensagem PREPARE de um proposer.
-        
-        Args:
-            data (dict): Dados do PREPARE
-                - proposer_id: ID do proposer
-                - proposal_number: Número da proposta
-                - is_leader_election: Se é uma eleição de líder
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        proposer_id = data.get('proposer_id')
-        proposal_number = data.get('proposal_number')
-        is_leader_election = data.get('is_leader_election', False)
-        
-        if not all([proposer_id, proposal_number]):
-            return jsonify({"error": "Missing required information"}), 400
-        
-        # Verificar se já processamos este prepare (cache)
-        cache_key = f"prepare_{proposer_id}_{proposal_number}"
-        if cache_key in self.response_cache:
-            self.logger.debug(f"Usando resposta em cache para PREPARE {proposal_number}")
-            return self.response_cache[cache_key]
-        
-        timestamp = time.time()
-        tid = self._generate_tid()
-        
-        with self.lock:
-            # Registrar no histórico
-            self.proposal_history[tid] = {
-                "type": "prepare",
-                "proposal_number": proposal_number,
-                "proposer_id": proposer_id,
-                "timestamp": timestamp,
-                "is_leader_election": is_leader_election,
-                "result": None  # Será atualizado abaixo
-            }
-            
-            # Se o histórico ficar muito grande, remover entradas antigas
-            if len(self.proposal_history) > self.max_history_size:
-                self.proposal_history.popitem(last=False)  # Remove o mais antigo (FIFO)
-            
-            # Fase 1 do Paxos: Comparar o número da proposta com o máximo prometido
-            if proposal_number > self.max_promised:
-                # Aceitar a proposta
-                old_max_promised = self.max_promised
-                self.max_promised = proposal_number
-                
-                # Registrar resultado
-                self.proposal_history[tid]["result"] = "promised"
-                self.metrics["promises_made"] += 1
-                
-                # Preparar resposta
-                response = {
-                    "status": "promise",
-                    "acceptor_id": self.node_id,
-                    "tid": tid,
-                    "timestamp": timestamp,
-                    "max_accepted": self.max_accepted,
-                    "accepted_value": self.accepted_value
-                }
-                
-                # Log baseado no tipo de proposta
-                if is_leader_election:
-                    self.logger.info(f"PROMISE enviado para eleição de líder com proposta {proposal_number} do proposer {proposer_id} (anterior: {old_max_promised})")
-                else:
-                    self.logger.info(f"PROMISE enviado para proposta normal {proposal_number} do proposer {proposer_id} (anterior: {old_max_promised})")
-            else:
-                # Rejeitar a proposta
-                self.proposal_history[tid]["result"] = "rejected"
-                self.metrics["promises_rejected"] += 1
-                
-                # Preparar resposta
-                response = {
-                    "status": "rejected",
-                    "acceptor_id": self.node_id,
-                    "tid": tid,
-                    "timestamp": timestamp,
-                    "message": f"Already promised to higher proposal number: {self.max_promised}"
-                }
-                
-                # Log
-                self.logger.info(f"PREPARE rejeitado: proposta {proposal_number} < máximo prometido {self.max_promised}")
-        
-        # Armazenar em cache
-        http_response = jsonify(response), 200
-        self.response_cache[cache_key] = http_response
-        
-        return http_response
-    
-    def _handle_accept(self, data):
-        """
-        Processa uma mensagem ACCEPT de um proposer.
-        
-        Args:
-            data (dict): Dados do ACCEPT
-                - proposer_id: ID do proposer
-                - proposal_number: Número da proposta
-                - value: Valor proposto
-                - is_leader_election: Se é uma eleição de líder
-                - client_id: ID do cliente (opcional)
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        proposer_id = data.get('proposer_id')
-        proposal_number = data.get('proposal_number')
-        value = data.get('value')
-        is_leader_election = data.get('is_leader_election', False)
-        client_id = data.get('client_id')
-        
-        if not all([proposer_id, proposal_number, value]):
-            return jsonify({"error": "Missing required information"}), 400
-        
-        # Verificar se já processamos este accept (cache)
-        cache_key = f"accept_{proposer_id}_{proposal_number}_{value}"
-        if cache_key in self.response_cache:
-            self.logger.debug(f"Usando resposta em cache para ACCEPT {proposal_number}")
-            return self.response_cache[cache_key]
-        
-        timestamp = time.time()
-        tid = self._generate_tid()
-        
-        with self.lock:
-            # Registrar no histórico
-            self.proposal_history[tid] = {
-                "type": "accept",
-                "proposal_number": proposal_number,
-                "proposer_id": proposer_id,
-                "value": value,
-                "timestamp": timestamp,
-                "is_leader_election": is_leader_election,
-                "client_id": client_id,
-                "result": None  # Será atualizado abaixo
-            }
-            
-            # Se o histórico ficar muito grande, remover entradas antigas
-            if len(self.proposal_history) > self.max_history_size:
-                self.proposal_history.popitem(last=False)
-            
-            # Fase 2 do Paxos: Comparar o número da proposta com o máximo prometido
-            if proposal_number >= self.max_promised:
-                # Aceitar o valor
-                old_max_accepted = self.max_accepted
-                
-                self.max_promised = max(self.max_promised, proposal_number)
-                self.max_accepted = proposal_number
-                self.accepted_value = value
-                
-                # Registrar resultado
-                self.proposal_history[tid]["result"] = "accepted"
-                self.metrics["values_accepted"] += 1
-                
-                # Preparar resposta
-                response = {
-                    "status": "accepted",
-                    "acceptor_id": self.node_id,
-                    "tid": tid,
-                    "timestamp": timestamp
-                }
-                
-                # Log baseado no tipo de proposta
-                if is_leader_election:
-                    self.logger.info(f"ACCEPTED: eleição de líder com proposta {proposal_number}, valor: {value}")
-                    
-                    # Se for eleição de líder, atualizar o líder no gossip
-                    if value.startswith("leader:"):
-                        leader_id = int(value.split(":")[1])
-                        self.current_leader_id = leader_id
-                        self.gossip.set_leader(leader_id)
-                        self.logger.info(f"Líder atualizado para {leader_id}")
-                else:
-                    self.logger.info(f"ACCEPTED: proposta normal {proposal_number}, valor: {value} (anterior: {old_max_accepted})")
-                
-                # Adicionar à fila de notificações para learners
-                notification = {
-                    "acceptor_id": self.node_id,
-                    "proposal_number": proposal_number,
-                    "value": value,
-                    "tid": tid,
-                    "timestamp": timestamp,
-                    "is_leader_election": is_leader_election,
-                    "client_id": client_id
-                }
-                
-                self.pending_notifications.append(notification)
-                
-                # Se temos muitas notificações pendentes ou é uma eleição, notificar imediatamente
-                if len(self.pending_notifications) >= self.notification_batch_size or is_leader_election:
-                    threading.Thread(target=self._notify_learners_now, daemon=True).start()
-            else:
-                # Rejeitar o valor
-                self.proposal_history[tid]["result"] = "rejected"
-                self.metrics["accepts_rejected"] += 1
-                
-                # Preparar resposta
-                response = {
-                    "status": "rejected",
-                    "acceptor_id": self.node_id,
-                    "tid": tid,
-                    "timestamp": timestamp,
-                    "message": f"Already promised to higher proposal number: {self.max_promised}"
-                }
-                
-                # Log
-                self.logger.info(f"ACCEPT rejeitado: proposta {proposal_number} < máximo prometido {self.max_promised}")
-        
-        # Armazenar em cache
-        http_response = jsonify(response), 200
-        self.response_cache[cache_key] = http_response
-        
-        return http_response
-    
-    def _handle_heartbeat(self, data):
-        """
-        Processa um heartbeat do líder.
-        
-        Args:
-            data (dict): Dados do heartbeat
-                - leader_id: ID do líder
-                - timestamp: Timestamp do heartbeat
-                - sequence_number: Número de sequência (opcional)
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        leader_id = data.get('leader_id')
-        timestamp = data.get('timestamp', time.time())
-        sequence_number = data.get('sequence_number', 0)
-        
-        if leader_id is None:
-            return jsonify({"error": "Missing leader_id"}), 400
-        
-        current_time = time.time()
-        
-        with self.lock:
-            # Atualizar último heartbeat recebido
-            self.last_heartbeat_time = current_time
-            self.current_leader_id = leader_id
-            
-            # Atualizar o líder no gossip
-            self.gossip.set_leader(leader_id)
-            
-            # Registrar heartbeat para este proposer
-            self.proposer_heartbeats[str(leader_id)] = {
-                "timestamp": current_time,
-                "sequence_number": sequence_number
-            }
-            
-            self.metrics["heartbeats_received"] += 1
-        
-        self.logger.debug(f"Heartbeat recebido do líder {leader_id} (seq: {sequence_number})")
-        
-        return jsonify({
-            "status": "acknowledged",
-            "acceptor_id": self.node_id,
-            "received_at": current_time
-        }), 200
-    
-    def _handle_status(self):
-        """
-        Retorna o status atual do acceptor.
-        
-        Returns:
-            Response: Resposta HTTP com informações de status
-        """
-        with self.lock:
-            # Obter algumas entradas recentes do histórico
-            recent_history = list(self.proposal_history.values())[-10:] if self.proposal_history else []
-            
-            learners = self.gossip.get_nodes_by_role('learner')
-            
-            return jsonify({
-                "id": self.node_id,
-                "role": self.node_role,
-                "current_leader": self.current_leader_id,
-                "state": {
-                    "max_promised": self.max_promised,
-                    "max_accepted": self.max_accepted,
-                    "accepted_value": self.accepted_value,
-                    "last_heartbeat": self.last_heartbeat_time
-                },
-                "metrics": self.metrics,
-                "recent_proposals": recent_history,
-                "learners_count": len(learners),
-                "pending_notifications": len(self.pending_notifications),
-                "cache_size": len(self.response_cache)
-            }), 200
-    
-    def _check_leader_status(self):
-        """
-        Verifica periodicamente o status do líder e detecta falhas.
-        """
-        while True:
-            try:
-                current_time = time.time()
-                current_leader = self.gossip.get_leader()
-                
-                if current_leader is not None:
-                    # Verificar se o líder está inativo
-                    if current_time - self.last_heartbeat_time > self.leader_timeout:
-                        self.logger.warning(f"Líder {current_leader} parece inativo. Último heartbeat há {current_time - self.last_heartbeat_time:.1f}s")
-                        
-                        # Limpar líder no gossip
-                        self.gossip.set_leader(None)
-                        
-                        # Atualizar metadata no gossip
-                        self.gossip.update_local_metadata({
-                            "leader_detected_failed": current_leader,
-                            "detection_time": current_time
-                        })
-                        
-                        # Limpar líder local
-                        with self.lock:
-                            self.current_leader_id = None
-            except Exception as e:
-                self.logger.error(f"Erro ao verificar status do líder: {e}")
-            
-            # Verificar a cada 2 segundos
-            time.sleep(2)
-    
-    def _notify_learners_batch(self):
-        """
-        Thread que envia notificações em lote para os learners periodicamente.
-        """
-        while True:
-            try:
-                # Esperar um pouco para acumular notificações
-                time.sleep(1)
-                
-                # Verificar se temos notificações pendentes
-                if self.pending_notifications:
-                    self._notify_learners_now()
-            except Exception as e:
-                self.logger.error(f"Erro no processamento em lote de notificações: {e}")
-    
-    def _notify_learners_now(self):
-        """
-        Envia imediatamente as notificações pendentes para todos os learners.
-        """
-        with self.lock:
-            # Obter todas as notificações pendentes
-            notifications = self.pending_notifications.copy()
-            self.pending_notifications = []
-        
-        if not notifications:
-            return
-        
-        # Obter learners via gossip
-        learners = self.gossip.get_nodes_by_role('learner')
-        
-        if not learners:
-            self.logger.warning("Nenhum learner conhecido para notificar")
-            
-            # Recolocar notificações na fila
-            with self.lock:
-                self.pending_notifications = notifications + self.pending_notifications
-            return
-        
-        self.logger.info(f"Notificando {len(learners)} learners sobre {len(notifications)} valores aceitos")
-        
-        # Para cada learner, enviar notificações
-        for learner_id, learner in learners.items():
-            try:
-                learner_url = f"http://{learner['address']}:{learner['port']}/learn"
-                
-                # Enviar em thread separada para não bloquear
-                threading.Thread(
-                    target=self._send_notifications_to_learner,
-                    args=(learner_url, notifications, learner_id)
-                ).start()
-            except Exception as e:
-                self.logger.error(f"Erro ao preparar notificação para learner {learner_id}: {e}")
-    
-    def _send_notifications_to_learner(self, url, notifications, learner_id):
-        """
-        Envia um lote de notificações para um learner específico.
-        
-        Args:
-            url (str): URL do learner
-            notifications (list): Lista de notificações
-            learner_id (str): ID do learner
-        """
-        # Implementar retry com backoff exponencial
-        max_retries = 3
-        base_timeout = 1.0
-        
-        for retry in range(max_retries):
-            try:
-                # Adicionar jitter para evitar sincronização
-                timeout = base_timeout * (2 ** retry) + random.uniform(0, 0.3)
-                
-                # Enviar todas as notificações em um único request
-                response = requests.post(
-                    url, 
-                    json={"notifications": notifications},
-                    timeout=timeout
-                )
-                
-                if response.status_code == 200:
-                    self.logger.debug(f"Notificações enviadas com sucesso para learner {learner_id}")
-                    with self.lock:
-                        self.metrics["learner_notifications"] += len(notifications)
-                    return
-                else:
-                    self.logger.warning(f"Erro ao notificar learner {learner_id}: {response.status_code} - {response.text}")
-            except Exception as e:
-                self.logger.error(f"Erro ao notificar learner {learner_id} (tentativa {retry+1}/{max_retries}): {e}")
-                
-                # Se não for a última tentativa, aguardar antes de retry
-                if retry < max_retries - 1:
-                    time.sleep(base_timeout * (2 ** retry) * 0.5)
-        
-        # Se todas as tentativas falharem, recolocar na fila
-        with self.lock:
-            # Recolocar apenas notificações importantes (eleições de líder)
-            important_notifications = [n for n in notifications if n.get("is_leader_election", False)]
-            if important_notifications:
-                self.logger.warning(f"Readicionando {len(important_notifications)} notificações importantes à fila")
-                self.pending_notifications = important_notifications + self.pending_notifications
-    
-    def _cleanup_cache(self):
-        """
-        Remove entradas antigas do cache periodicamente.
-        """
-        while True:
-            try:
-                time.sleep(self.cache_cleanup_interval)
-                
-                current_time = time.time()
-                expired_keys = []
-                
-                with self.lock:
-                    # Identificar entradas expiradas
-                    for key, (response, timestamp) in list(self.response_cache.items()):
-                        if current_time - timestamp > self.cache_ttl:
-                            expired_keys.append(key)
-                    
-                    # Remover entradas expiradas
-                    for key in expired_keys:
-                        del self.response_cache[key]
-                
-                if expired_keys:
-                    self.logger.debug(f"Limpeza de cache: removidas {len(expired_keys)} entradas expiradas")
-            except Exception as e:
-                self.logger.error(f"Erro na limpeza do cache: {e}")
-    
-    def _handle_view_logs(self):
-        """
-        Manipulador para a rota view-logs (para debugging).
-        """
-        learners = self.gossip.get_nodes_by_role('learner')
-        
-        return jsonify({
-            "id": self.node_id,
-            "role": self.node_role,
-            "state": {
-                "max_promised": self.max_promised,
-                "max_accepted": self.max_accepted,
-                "accepted_value": self.accepted_value
-            },
-            "current_leader": self.gossip.get_leader(),
-            "metrics": self.metrics,
-            "learners_count": len(learners),
-            "known_nodes_count": len(self.gossip.get_all_nodes())
-        }), 200
-
-# Para uso como aplicação independente
-if __name__ == '__main__':
-    acceptor = Acceptor()
-    acceptor.start()
\ No newline at end of file
+import json
+import os
+import time
+import threading
+import logging
+import uuid
+import random
+from flask import request, jsonify, Response
+from collections import OrderedDict
+
+from base_node import BaseNode
+from wal import WriteAheadLog
+from slot_store import SlotStore
+from reply_cache import ReplyCache
+from notification_stream import StreamHub
+from striped_lock import StripedLock
+
+class Acceptor(BaseNode):
+    """
+    Implementação do nó Acceptor no algoritmo Paxos.
+    Responsável por aceitar ou rejeitar propostas dos proposers,
+    garantindo a consistência do consenso no sistema distribuído.
+    """
+    
+    def __init__(self, app=None, group_id=None):
+        """
+        Inicializa o nó Acceptor com seu estado persistente.
+        """
+        super().__init__(app, group_id)
+        
+        # Estado persistente (deve ser salvo para recuperação após falhas)
+        self.max_promised = 0        # Maior número de proposta prometido
+        self.max_accepted = 0        # Maior número de proposta aceito
+        self.accepted_value = None   # Valor associado ao max_accepted
+        self.last_election = None    # (número de proposta, valor) da última eleição aceita
+        self.commit_index = 0        # Slots abaixo deste já foram escolhidos (informado pelo líder)
+        
+        # Cursor de entrega por learner: slots abaixo dele já foram aplicados pelo learner.
+        # Ao (re)abrir o stream, o learner recebe novamente tudo o que foi aceito a partir do
+        # cursor. Os cursores são gravados no WAL e sobrevivem a um reinício do acceptor
+        self.learner_cursors = {}  # {learner_id: slot}
+        self.learner_snapshots = {}  # {learner_id: slot coberto pelo último snapshot do learner}
+        
+        # Log Multi-Paxos: o PROMISE (max_promised) vale para todos os slots,
+        # e cada slot guarda o último valor aceito (armazenamento colunar, truncável
+        # abaixo do low-water mark)
+        self.accepted_log = SlotStore()
+        
+        # Log de escrita antecipada: PROMISE e ACCEPTED só são respondidos depois que
+        # o estado correspondente está em disco; o log é reaplicado na inicialização
+        self.wal = WriteAheadLog(
+            os.path.join(self.data_dir, 'acceptor.wal'),
+            sync_enabled=os.environ.get('WAL_FSYNC', 'true').lower() in ('1', 'true', 'yes'),
+            max_group_delay=float(os.environ.get('WAL_GROUP_MAX_DELAY_MS', 2)) / 1000.0,
+            logger=self.logger
+        )
+        self.wal_compact_bytes = int(os.environ.get('WAL_COMPACT_BYTES', 64 * 1024 * 1024))
+        self._recover_from_wal()
+        
+        # Locks do caminho crítico: um ACCEPT adquire apenas o stripe do seu slot, que
+        # ordena a atualização do estado e o registro no WAL daquele slot; PREPARE,
+        # truncamento e checkpoint adquirem todos os stripes. O state_lock protege, por
+        # instantes, o máximo prometido e o log colunar compartilhados entre os stripes.
+        # Ordem de aquisição: stripes -> self.lock -> state_lock
+        self.slot_locks = StripedLock(int(os.environ.get('ACCEPTOR_LOCK_STRIPES', 16)))
+        self.state_lock = threading.Lock()
+        
+        # Histórico de propostas (limitado aos últimos N)
+        self.proposal_history = OrderedDict()
+        self.max_history_size = 100  # Tamanho máximo do histórico
+        
+        # Estado volátil (reinicializado após falhas)
+        self.last_heartbeat_time = 0
+        self.current_leader_id = None
+        self.proposer_heartbeats = {}
+        
+        # Lease concedido ao líder: enquanto válido, PREPAREs de outros proposers são recusados
+        self.lease_holder = None
+        self.lease_ballot = 0
+        self.lease_expiry = 0
+        
+        # O lease não é gravado no WAL: após um reinício, um lease concedido antes da queda
+        # pode ainda valer no líder, então PREPAREs são recusados por um lease inteiro
+        # (exceto do líder que voltar a obter o lease deste acceptor nesse intervalo)
+        self.lease_fence = time.time() + float(os.environ.get('LEASE_DURATION', 3.0)) if self.max_promised else 0
+        
+        # Cache para otimização de desempenho
+        # Respostas de PREPARE/ACCEPT já serializadas, para reenvios do proposer (LRU com TTL e limite de memória)
+        self.response_cache = ReplyCache(
+            max_bytes=int(os.environ.get('REPLY_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+            ttl=float(os.environ.get('REPLY_CACHE_TTL', 60))
+        )
+        
+        # Controle de monitoramento do líder
+        self.leader_timeout = 10     # Segundos para considerar o líder como falho
+        
+        # Métricas e estatísticas
+        self.metrics = {
+            "promises_made": 0,
+            "promises_rejected": 0,
+            "values_accepted": 0,
+            "accepts_rejected": 0,
+            "learner_notifications": 0,
+            "heartbeats_received": 0,
+            "leases_granted": 0,
+            "prepares_blocked_by_lease": 0,
+            "batch_requests": 0,
+            "replayed_notifications": 0,
+            "learner_acks": 0,
+            "slot_requests": 0
+        }
+        
+        # Streams de notificação: cada learner mantém uma conexão aberta (/stream) pela
+        # qual recebe os valores aceitos assim que são gravados, em lotes adaptativos
+        self.streams = StreamHub(
+            max_batch=int(os.environ.get('STREAM_MAX_BATCH', 256)),
+            max_linger=float(os.environ.get('STREAM_MAX_LINGER_MS', 5)) / 1000.0
+        )
+        self.stream_keepalive = 1.0  # segundos sem notificações antes de enviar keepalive
+        self.replay_chunk_size = 1000  # slots lidos do log por aquisição do lock durante o replay
+        
+        self.logger.info(f"Acceptor inicializado com ID {self.node_id}")
+    
+    def _get_default_port(self):
+        """Porta padrão para acceptors"""
+        return 4000
+    
+    def _register_routes(self):
+        """Registra as rotas específicas do acceptor"""
+        @self.app.route('/prepare', methods=['POST'])
+        def prepare():
+            """Receber mensagem PREPARE de um proposer"""
+            return self._handle_prepare(request.json)
+        
+        @self.app.route('/accept', methods=['POST'])
+        def accept():
+            """Receber mensagem ACCEPT de um proposer"""
+            return self._handle_accept(request.json)
+        
+        @self.app.route('/prepare-batch', methods=['POST'])
+        def prepare_batch():
+            """Receber vários PREPAREs em uma única requisição"""
+            return self._handle_prepare_batch(request.json)
+        
+        @self.app.route('/accept-batch', methods=['POST'])
+        def accept_batch():
+            """Receber vários ACCEPTs em uma única requisição"""
+            return self._handle_accept_batch(request.json)
+        
+        @self.app.route('/status', methods=['GET'])
+        def status():
+            """Retorna o status atual do acceptor"""
+            return self._handle_status()
+        
+        @self.app.route('/heartbeat', methods=['POST'])
+        def heartbeat():
+            """Receber heartbeat do líder"""
+            return self._handle_heartbeat(request.json)
+        
+        @self.app.route('/truncate', methods=['POST'])
+        def truncate():
+            """Descartar slots já decididos abaixo de um low-water mark"""
+            return self._handle_truncate(request.json)
+        
+        @self.app.route('/stream', methods=['GET'])
+        def stream():
+            """Stream contínuo de valores aceitos para um learner (NDJSON)"""
+            return self._handle_stream(request.args.get('learner_id'), request.args.get('from_slot', type=int))
+        
+        @self.app.route('/slots', methods=['GET'])
+        def slots():
+            """Valores aceitos em um intervalo de slots (recuperação de lacunas dos learners)"""
+            return self._handle_slots(request.args.get('from_slot', type=int), request.args.get('to_slot', type=int))
+        
+        @self.app.route('/learner-ack', methods=['POST'])
+        def learner_ack():
+            """Avança o cursor de entrega de um learner"""
+            return self._handle_learner_ack(request.json)
+    
+    def _start_threads(self):
+        """Inicia as threads específicas do acceptor"""
+        # Thread para verificar o status do líder
+        threading.Thread(target=self._check_leader_status, daemon=True).start()
+    
+    def _generate_tid(self):
+        """
+        Gera um Transaction ID (TID) único para cada operação.
+        
+        Returns:
+            str: TID único no formato 'acceptor_id-timestamp-random'
+        """
+        timestamp = int(time.time() * 1000)
+        random_part = random.randint(1000, 9999)
+        return f"{self.node_id}-{timestamp}-{random_part}"
+    
+    def _json_reply(self, body):
+        """
+        Resposta HTTP 200 a partir de um corpo JSON já serializado.
+        """
+        return Response(body, status=200, mimetype='application/json')
+    
+    def _recover_from_wal(self):
+        """
+        Reconstrói o estado persistente (promessa, valores aceitos e log por slot)
+        reaplicando os registros do WAL.
+        """
+        records = self.wal.replay()
+        
+        for record in records:
+            if record["type"] == "checkpoint":
+                self.max_promised = record["max_promised"]
+                self.max_accepted = record["max_accepted"]
+                self.accepted_value = record["accepted_value"]
+                self.last_election = record.get("last_election")
+                self.commit_index = record.get("commit_index", 0)
+                self.learner_cursors = dict(record.get("learner_cursors", {}))
+                self.learner_snapshots = dict(record.get("learner_snapshots", {}))
+                self.accepted_log = SlotStore()
+                self.accepted_log.truncate_below(record.get("low_water_mark", 0))
+                for slot, entry in record["accepted_log"].items():
+                    self.accepted_log.put(int(slot), entry["proposal_number"], entry["value"], entry["client_id"])
+            elif record["type"] == "promise":
+                self.max_promised = max(self.max_promised, record["ballot"])
+            elif record["type"] == "accept":
+                self.max_promised = max(self.max_promised, record["ballot"])
+                self.max_accepted = record["ballot"]
+                self.accepted_value = record["value"]
+                if record["slot"] is not None:
+                    self.accepted_log.put(record["slot"], record["ballot"], record["value"], record["client_id"])
+                else:
+                    self.last_election = [record["ballot"], record["value"]]
+            elif record["type"] == "truncate":
+                self.accepted_log.truncate_below(record["below_slot"])
+            elif record["type"] == "commit":
+                self.commit_index = max(self.commit_index, record["commit_index"])
+            elif record["type"] == "cursor":
+                learner_id = record["learner_id"]
+                self.learner_cursors[learner_id] = max(self.learner_cursors.get(learner_id, 0), record["slot"])
+                self.learner_snapshots[learner_id] = max(self.learner_snapshots.get(learner_id, 0), record.get("snapshot_slot", 0))
+        
+        if records:
+            self.logger.info(f"Estado recuperado do WAL: {len(records)} registros, max_promised={self.max_promised}, {len(self.accepted_log)} slots aceitos")
+    
+    def _sync_wal(self, ticket):
+        """
+        Aguarda a gravação de um registro do WAL (group commit) e compacta o log
+        quando ele excede WAL_COMPACT_BYTES.
+        
+        Args:
+            ticket (tuple): Retorno de WriteAheadLog.append
+        
+        Returns:
+            bool: True se o registro está em disco
+        """
+        try:
+            self.wal.sync(ticket)
+        except OSError as e:
+            self.logger.error(f"Erro ao gravar o WAL: {e}")
+            return False
+        
+        if self.wal.size() > self.wal_compact_bytes:
+            # Todos os registros são enfileirados sob os stripes (promessas, ACCEPTs,
+            # truncamentos) ou sob self.lock (cursores, commit_index): com ambos adquiridos
+            # do checkpoint até o fim da compactação, nenhum registro fica fora dele
+            with self.slot_locks.all(), self.lock:
+                # Outra thread pode ter compactado enquanto aguardávamos o lock
+                if self.wal.size() > self.wal_compact_bytes:
+                    try:
+                        self.wal.compact([self._wal_checkpoint()])
+                        self.logger.info(f"WAL compactado: {self.wal.size()} bytes")
+                    except OSError as e:
+                        self.logger.error(f"Erro ao compactar o WAL: {e}")
+        
+        return True
+    
+    def _wal_checkpoint(self):
+        """
+        Registro de checkpoint com todo o estado persistente.
+        Deve ser chamado com todos os stripes e self.lock adquiridos.
+        """
+        return {
+            "type": "checkpoint",
+            "max_promised": self.max_promised,
+            "max_accepted": self.max_accepted,
+            "accepted_value": self.accepted_value,
+            "last_election": self.last_election,
+            "commit_index": self.commit_index,
+            "learner_cursors": dict(self.learner_cursors),
+            "learner_snapshots": dict(self.learner_snapshots),
+            "low_water_mark": self.accepted_log.low_water_mark,
+            "accepted_log": {str(slot): entry for slot, entry in self.accepted_log.items()}
+        }
+    
+    def _handle_prepare(self, data):
+        """
+        Processa uma mensagem PREPARE de um proposer.
+        
+        Args:
+            data (dict): Dados do PREPARE
+                - proposer_id: ID do proposer
+                - proposal_number: Número da proposta
+                - is_leader_election: Se é uma eleição de líder
+                - from_slot: Primeiro slot cujos valores aceitos devem ser retornados
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        proposer_id = data.get('proposer_id')
+        proposal_number = data.get('proposal_number')
+        is_leader_election = data.get('is_leader_election', False)
+        from_slot = data.get('from_slot', 0)
+        
+        if not all([proposer_id, proposal_number]):
+            return jsonify({"error": "Missing required information"}), 400
+        
+        cache_key = ReplyCache.make_key("prepare", proposer_id, proposal_number, from_slot)
+        cached = self._cached_prepare_reply(cache_key, proposal_number)
+        if cached is not None:
+            self.logger.debug(f"Usando resposta em cache para PREPARE {proposal_number}")
+            return self._json_reply(cached)
+        
+        timestamp = time.time()
+        wal_ticket = None
+        
+        # O PREPARE lê todo o log a partir de from_slot: acesso exclusivo
+        with self.slot_locks.all():
+            outcome = self._prepare_locked(proposer_id, proposal_number, from_slot, timestamp)
+            if outcome["status"] == "promise":
+                wal_ticket = self.wal.append({"type": "promise", "ballot": proposal_number})
+        
+        response, cacheable = self._prepare_outcome(proposer_id, proposal_number, is_leader_election, timestamp, outcome)
+        
+        # A promessa só pode ser enviada depois de gravada em disco
+        if wal_ticket is not None and not self._sync_wal(wal_ticket):
+            return jsonify({"error": "Failed to persist promise"}), 500
+        
+        body = json.dumps(response).encode('utf-8')
+        if cacheable:
+            self.response_cache.put(cache_key, body)
+        
+        return self._json_reply(body)
+    
+    def _handle_prepare_batch(self, data):
+        """
+        Processa vários PREPAREs em uma única requisição: todas as entradas são
+        avaliadas sob uma única aquisição dos locks e gravadas com um único fsync.
+        
+        Args:
+            data (dict): Dados do lote
+                - proposer_id: ID do proposer (padrão para as entradas)
+                - entries: Lista de PREPAREs (proposal_number, from_slot, is_leader_election)
+        
+        Returns:
+            Response: Resposta HTTP com um resultado por entrada, na mesma ordem
+        """
+        entries = (data or {}).get('entries')
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "entries must be a non-empty list"}), 400
+        
+        results = [None] * len(entries)
+        cache_keys = [None] * len(entries)
+        pending = []
+        
+        for index, entry in enumerate(entries):
+            proposer_id = entry.get('proposer_id', data.get('proposer_id'))
+            proposal_number = entry.get('proposal_number')
+            if not all([proposer_id, proposal_number]):
+                results[index] = {"status": "error", "error": "Missing required information"}
+                continue
+            
+            cache_keys[index] = ReplyCache.make_key("prepare", proposer_id, proposal_number, entry.get('from_slot', 0))
+            cached = self._cached_prepare_reply(cache_keys[index], proposal_number)
+            if cached is not None:
+                results[index] = json.loads(cached)
+            else:
+                pending.append((index, proposer_id, proposal_number, entry))
+        
+        timestamp = time.time()
+        outcomes = []
+        wal_records = []
+        
+        with self.slot_locks.all():
+            for index, proposer_id, proposal_number, entry in pending:
+                outcome = self._prepare_locked(proposer_id, proposal_number, entry.get('from_slot', 0), timestamp)
+                outcomes.append(outcome)
+                if outcome["status"] == "promise":
+                    wal_records.append({"type": "promise", "ballot": proposal_number})
+            
+            wal_ticket = self.wal.append_many(wal_records) if wal_records else None
+        
+        uncacheable = set()
+        for (index, proposer_id, proposal_number, entry), outcome in zip(pending, outcomes):
+            results[index], cacheable = self._prepare_outcome(
+                proposer_id, proposal_number, entry.get('is_leader_election', False), timestamp, outcome
+            )
+            if not cacheable:
+                uncacheable.add(index)
+        
+        with self.lock:
+            self.metrics["batch_requests"] += 1
+        
+        if wal_ticket is not None and not self._sync_wal(wal_ticket):
+            return jsonify({"error": "Failed to persist promises"}), 500
+        
+        for index, _, _, _ in pending:
+            if index not in uncacheable:
+                self.response_cache.put(cache_keys[index], json.dumps(results[index]).encode('utf-8'))
+        
+        return self._json_reply(json.dumps({"acceptor_id": self.node_id, "results": results}).encode('utf-8'))
+    
+    def _cached_prepare_reply(self, cache_key, proposal_number):
+        """
+        Retorna a resposta em cache de um PREPARE repetido. Um PROMISE em cache só
+        vale enquanto nenhum número maior foi prometido: um proposer reiniciado que
+        repete um número antigo deve receber a rejeição atual (com promised_ballot).
+        """
+        if proposal_number < self.max_promised:
+            return None
+        return self.response_cache.get(cache_key)
+    
+    def _prepare_locked(self, proposer_id, proposal_number, from_slot, timestamp):
+        """
+        Fase 1 do Paxos para um PREPARE: apenas a comparação com o máximo
+        prometido e a atualização do estado. Deve ser chamado com todos os
+        stripes adquiridos.
+        
+        Returns:
+            dict: Resultado ("status" lease, promise ou rejected, com os dados da resposta)
+        """
+        # O lease e a promessa são lidos pelo heartbeat sob self.lock
+        with self.lock:
+            # Lease ativo de outro líder: recusar sem prometer
+            if self.lease_holder is not None and self.lease_holder != proposer_id and timestamp < self.lease_expiry:
+                return {
+                    "status": "lease",
+                    "lease_holder": self.lease_holder,
+                    "lease_remaining": self.lease_expiry - timestamp,
+                    "promised_ballot": max(self.max_promised, self.lease_ballot)
+                }
+            
+            # Recém-reiniciado: o lease concedido antes da queda é desconhecido
+            if timestamp < self.lease_fence and self.lease_holder != proposer_id:
+                return {
+                    "status": "lease",
+                    "lease_holder": None,
+                    "lease_remaining": self.lease_fence - timestamp,
+                    "promised_ballot": self.max_promised
+                }
+            
+            if proposal_number <= self.max_promised:
+                return {"status": "rejected", "promised_ballot": self.max_promised}
+            
+            previous = self.max_promised
+            self.max_promised = proposal_number
+            commit_index = self.commit_index
+        
+        # Primeira página dos valores já aceitos a partir de from_slot, para que o novo
+        # líder complete os slots pendentes (as demais são lidas por /slots); slots
+        # abaixo do low-water mark já foram decididos e descartados
+        accepted_to = from_slot + self.replay_chunk_size
+        return {
+            "status": "promise",
+            "previous": previous,
+            "max_accepted": self.max_accepted,
+            "accepted_value": self.accepted_value,
+            "low_water_mark": self.accepted_log.low_water_mark,
+            "commit_index": commit_index,
+            "highest_slot": self.accepted_log.highest_slot(),
+            "accepted_to": accepted_to,
+            "accepted": {str(slot): entry for slot, entry in self.accepted_log.items(from_slot, accepted_to)}
+        }
+    
+    def _prepare_outcome(self, proposer_id, proposal_number, is_leader_election, timestamp, outcome):
+        """
+        Histórico, métricas, log e resposta de um PREPARE já decidido (fora dos locks do log).
+        
+        Returns:
+            tuple: (resposta, se a resposta pode ir para o cache)
+        """
+        tid = self._generate_tid()
+        status = outcome["status"]
+        
+        if status == "lease":
+            with self.lock:
+                self.metrics["promises_rejected"] += 1
+                self.metrics["prepares_blocked_by_lease"] += 1
+            
+            if outcome["lease_holder"] is None:
+                self.logger.info(f"PREPARE {proposal_number} do proposer {proposer_id} recusado: lease anterior ao reinício pode estar ativo")
+                message = "Lease state unknown after restart"
+            else:
+                self.logger.info(f"PREPARE {proposal_number} do proposer {proposer_id} recusado: lease do líder {outcome['lease_holder']} ativo")
+                message = f"Lease held by leader {outcome['lease_holder']}"
+            
+            # Resposta não vai para o cache: vale apenas enquanto o lease durar
+            return {
+                "status": "rejected",
+                "acceptor_id": self.node_id,
+                "tid": tid,
+                "timestamp": timestamp,
+                "message": message,
+                "lease_remaining": outcome["lease_remaining"],
+                "promised_ballot": outcome["promised_ballot"]
+            }, False
+        
+        with self.lock:
+            self._record_history(tid, {
+                "type": "prepare",
+                "proposal_number": proposal_number,
+                "proposer_id": proposer_id,
+                "timestamp": timestamp,
+                "is_leader_election": is_leader_election,
+                "result": "promised" if status == "promise" else "rejected"
+            })
+            self.metrics["promises_made" if status == "promise" else "promises_rejected"] += 1
+        
+        if status == "promise":
+            # Log baseado no tipo de proposta
+            if is_leader_election:
+                self.logger.info(f"PROMISE enviado para eleição de líder com proposta {proposal_number} do proposer {proposer_id} (anterior: {outcome['previous']})")
+            else:
+                self.logger.info(f"PROMISE enviado para proposta normal {proposal_number} do proposer {proposer_id} (anterior: {outcome['previous']})")
+            
+            return {
+                "status": "promise",
+                "acceptor_id": self.node_id,
+                "tid": tid,
+                "timestamp": timestamp,
+                "max_accepted": outcome["max_accepted"],
+                "accepted_value": outcome["accepted_value"],
+                "low_water_mark": outcome["low_water_mark"],
+                "commit_index": outcome["commit_index"],
+                "highest_slot": outcome["highest_slot"],
+                "accepted_to": outcome["accepted_to"],
+                "accepted": outcome["accepted"]
+            }, True
+        
+        self.logger.info(f"PREPARE rejeitado: proposta {proposal_number} < máximo prometido {outcome['promised_ballot']}")
+        
+        return {
+            "status": "rejected",
+            "acceptor_id": self.node_id,
+            "tid": tid,
+            "timestamp": timestamp,
+            "message": f"Already promised to higher proposal number: {outcome['promised_ballot']}",
+            "promised_ballot": outcome["promised_ballot"]
+        }, True
+    
+    def _record_history(self, tid, entry):
+        """
+        Registra uma operação no histórico limitado. Deve ser chamado com self.lock adquirido.
+        """
+        self.proposal_history[tid] = entry
+        
+        # Se o histórico ficar muito grande, remover entradas antigas
+        if len(self.proposal_history) > self.max_history_size:
+            self.proposal_history.popitem(last=False)  # Remove o mais antigo (FIFO)
+    
+    def _handle_accept(self, data):
+        """
+        Processa uma mensagem ACCEPT de um proposer.
+        
+        Args:
+            data (dict): Dados do ACCEPT
+                - proposer_id: ID do proposer
+                - proposal_number: Número da proposta
+                - slot: Slot do log (ausente no anúncio de eleição)
+                - value: Valor proposto
+                - is_leader_election: Se é uma eleição de líder
+                - client_id: ID do cliente (opcional)
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        proposer_id = data.get('proposer_id')
+        proposal_number = data.get('proposal_number')
+        slot = data.get('slot')
+        value = data.get('value')
+        is_leader_election = data.get('is_leader_election', False)
+        client_id = data.get('client_id')
+        
+        if not all([proposer_id, proposal_number, value]):
+            return jsonify({"error": "Missing required information"}), 400
+        
+        # Verificar se já processamos este accept (cache)
+        cache_key = ReplyCache.make_key("accept", proposer_id, proposal_number, slot, value)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug(f"Usando resposta em cache para ACCEPT {proposal_number}")
+            return self._json_reply(cached)
+        
+        timestamp = time.time()
+        wal_ticket = None
+        
+        # Apenas o stripe do slot: ACCEPTs de outros slots prosseguem em paralelo
+        with self.slot_locks.slot(slot):
+            outcome, wal_record = self._accept_locked(proposal_number, slot, value, client_id)
+            if wal_record is not None:
+                wal_ticket = self.wal.append(wal_record)
+        
+        response, notification = self._accept_outcome(
+            proposer_id, proposal_number, slot, value, client_id, is_leader_election, timestamp, outcome
+        )
+        
+        if wal_ticket is not None:
+            # O ACCEPTED (para o proposer e para os learners) só sai depois de gravado em disco
+            if not self._sync_wal(wal_ticket):
+                return jsonify({"error": "Failed to persist accepted value"}), 500
+            
+            self._enqueue_notifications([notification])
+        
+        # Armazenar em cache
+        body = json.dumps(response).encode('utf-8')
+        self.response_cache.put(cache_key, body)
+        
+        return self._json_reply(body)
+    
+    def _handle_accept_batch(self, data):
+        """
+        Processa vários ACCEPTs em uma única requisição: todas as entradas são
+        avaliadas sob uma única aquisição dos stripes dos seus slots e gravadas
+        com um único fsync.
+        
+        Args:
+            data (dict): Dados do lote
+                - proposer_id: ID do proposer (padrão para as entradas)
+                - entries: Lista de ACCEPTs (proposal_number, slot, value, client_id, is_leader_election)
+        
+        Returns:
+            Response: Resposta HTTP com um resultado por entrada, na mesma ordem
+        """
+        entries = (data or {}).get('entries')
+        if not isinstance(entries, list) or not entries:
+            return jsonify({"error": "entries must be a non-empty list"}), 400
+        
+        results = [None] * len(entries)
+        cache_keys = [None] * len(entries)
+        pending = []
+        
+        for index, entry in enumerate(entries):
+            proposer_id = entry.get('proposer_id', data.get('proposer_id'))
+            proposal_number = entry.get('proposal_number')
+            value = entry.get('value')
+            if not all([proposer_id, proposal_number, value]):
+                results[index] = {"status": "error", "error": "Missing required information"}
+                continue
+            
+            cache_keys[index] = ReplyCache.make_key("accept", proposer_id, proposal_number, entry.get('slot'), value)
+            cached = self.response_cache.get(cache_keys[index])
+            if cached is not None:
+                results[index] = json.loads(cached)
+            else:
+                pending.append((index, proposer_id, proposal_number, value, entry))
+        
+        timestamp = time.time()
+        outcomes = []
+        wal_records = []
+        
+        with self.slot_locks.slots(entry.get('slot') for _, _, _, _, entry in pending):
+            for index, proposer_id, proposal_number, value, entry in pending:
+                outcome, wal_record = self._accept_locked(proposal_number, entry.get('slot'), value, entry.get('client_id'))
+                outcomes.append(outcome)
+                if wal_record is not None:
+                    wal_records.append(wal_record)
+            
+            wal_ticket = self.wal.append_many(wal_records) if wal_records else None
+        
+        notifications = []
+        for (index, proposer_id, proposal_number, value, entry), outcome in zip(pending, outcomes):
+            results[index], notification = self._accept_outcome(
+                proposer_id, proposal_number, entry.get('slot'), value, entry.get('client_id'),
+                entry.get('is_leader_election', False), timestamp, outcome
+            )
+            if notification is not None:
+                notifications.append(notification)
+        
+        with self.lock:
+            self.metrics["batch_requests"] += 1
+        
+        if wal_ticket is not None:
+            if not self._sync_wal(wal_ticket):
+                return jsonify({"error": "Failed to persist accepted values"}), 500
+            
+            self._enqueue_notifications(notifications)
+        
+        for index, _, _, _, _ in pending:
+            self.response_cache.put(cache_keys[index], json.dumps(results[index]).encode('utf-8'))
+        
+        return self._json_reply(json.dumps({"acceptor_id": self.node_id, "results": results}).encode('utf-8'))
+    
+    def _accept_locked(self, proposal_number, slot, value, client_id):
+        """
+        Fase 2 do Paxos para um ACCEPT: apenas a comparação com o máximo prometido
+        e a atualização do estado. Deve ser chamado com o stripe do slot adquirido.
+        
+        Returns:
+            tuple: (resultado com "status" accepted, below_low_water_mark ou rejected,
+                    registro para o WAL ou None)
+        """
+        # O máximo prometido e o log colunar são compartilhados entre os stripes
+        with self.state_lock:
+            low_water_mark = self.accepted_log.low_water_mark
+            if slot is not None and slot < low_water_mark:
+                # Slot já decidido e descartado do log
+                return {"status": "below_low_water_mark", "low_water_mark": low_water_mark}, None
+            
+            if proposal_number < self.max_promised:
+                return {"status": "rejected", "promised_ballot": self.max_promised}, None
+            
+            previous = self.max_accepted
+            self.max_promised = max(self.max_promised, proposal_number)
+            self.max_accepted = proposal_number
+            self.accepted_value = value
+            
+            if slot is not None:
+                self.accepted_log.put(slot, proposal_number, value, client_id)
+            else:
+                self.last_election = [proposal_number, value]
+        
+        return {"status": "accepted", "previous": previous}, {
+            "type": "accept",
+            "ballot": proposal_number,
+            "slot": slot,
+            "value": value,
+            "client_id": client_id
+        }
+    
+    def _accept_outcome(self, proposer_id, proposal_number, slot, value, client_id, is_leader_election, timestamp, outcome):
+        """
+        Histórico, métricas, log, atualização do líder e resposta de um ACCEPT já
+        decidido (fora dos locks do log).
+        
+        Returns:
+            tuple: (resposta, notificação para os learners ou None)
+        """
+        tid = self._generate_tid()
+        status = outcome["status"]
+        accepted = status == "accepted"
+        
+        with self.lock:
+            self._record_history(tid, {
+                "type": "accept",
+                "proposal_number": proposal_number,
+                "proposer_id": proposer_id,
+                "slot": slot,
+                "value": value,
+                "timestamp": timestamp,
+                "is_leader_election": is_leader_election,
+                "client_id": client_id,
+                "result": "accepted" if accepted else "rejected"
+            })
+            self.metrics["values_accepted" if accepted else "accepts_rejected"] += 1
+        
+        if status == "below_low_water_mark":
+            self.logger.info(f"ACCEPT rejeitado: slot {slot} abaixo do low-water mark {outcome['low_water_mark']}")
+            
+            return {
+                "status": "rejected",
+                "acceptor_id": self.node_id,
+                "tid": tid,
+                "timestamp": timestamp,
+                "message": f"Slot {slot} below low-water mark {outcome['low_water_mark']}",
+                "low_water_mark": outcome["low_water_mark"]
+            }, None
+        
+        if status == "rejected":
+            self.logger.info(f"ACCEPT rejeitado: proposta {proposal_number} < máximo prometido {outcome['promised_ballot']}")
+            
+            return {
+                "status": "rejected",
+                "acceptor_id": self.node_id,
+                "tid": tid,
+                "timestamp": timestamp,
+                "message": f"Already promised to higher proposal number: {outcome['promised_ballot']}",
+                "promised_ballot": outcome["promised_ballot"]
+            }, None
+        
+        # Log baseado no tipo de proposta
+        if is_leader_election:
+            self.logger.info(f"ACCEPTED: eleição de líder com proposta {proposal_number}, valor: {value}")
+            
+            # Se for eleição de líder, atualizar o líder no gossip
+            if value.startswith("leader:"):
+                leader_id = int(value.split(":")[1])
+                with self.lock:
+                    self.current_leader_id = leader_id
+                self.gossip.set_leader(leader_id)
+                self.logger.info(f"Líder atualizado para {leader_id}")
+        else:
+            self.logger.info(f"ACCEPTED: proposta normal {proposal_number} no slot {slot}, valor: {value} (anterior: {outcome['previous']})")
+        
+        response = {
+            "status": "accepted",
+            "acceptor_id": self.node_id,
+            "slot": slot,
+            "tid": tid,
+            "timestamp": timestamp
+        }
+        
+        # Notificação para os learners, enfileirada depois da gravação em disco
+        notification = {
+            "acceptor_id": self.node_id,
+            "proposal_number": proposal_number,
+            "slot": slot,
+            "value": value,
+            "tid": tid,
+            "timestamp": timestamp,
+            "is_leader_election": is_leader_election,
+            "client_id": client_id
+        }
+        
+        return response, notification
+    
+    def _enqueue_notifications(self, notifications):
+        """
+        Enfileira notificações de valores aceitos (já gravados em disco) para os learners.
+        
+        Args:
+            notifications (list): Notificações geradas por _accept_locked
+        """
+        # Learners sem stream aberto não perdem nada: recebem o replay a partir
+        # do cursor quando reconectam
+        self.streams.publish(notifications)
+    
+    def _handle_stream(self, learner_id, from_slot=None):
+        """
+        Mantém uma resposta HTTP aberta pela qual o learner recebe as notificações
+        de valores aceitos (NDJSON, um lote de notificações por linha, para que o
+        learner conte os votos do lote de uma só vez). Linhas de keepalive permitem
+        que os dois lados detectem uma conexão perdida.
+        
+        O stream começa pelo replay do log a partir do cursor do learner (o maior
+        entre from_slot e o último cursor confirmado, que sobrevive a reinícios) e
+        pela última eleição aceita; em seguida vêm as notificações ao vivo. Slots
+        abaixo do cursor que faltarem ao learner são buscados por ele em /slots. Um slot pode chegar pelos dois caminhos, e o learner
+        conta cada acceptor uma única vez por slot.
+        
+        Args:
+            learner_id (str): ID do learner
+            from_slot (int, optional): Primeiro slot ainda não aplicado pelo learner
+        
+        Returns:
+            Response: Resposta HTTP em streaming
+        """
+        if not learner_id:
+            return jsonify({"error": "Missing learner_id"}), 400
+        
+        # Inscrever antes de medir o log: o que for aceito depois disso chega ao vivo
+        stream = self.streams.subscribe(learner_id)
+        
+        with self.lock:
+            # O cursor confirmado só avança: o replay nunca recomeça abaixo dele
+            from_slot = max(self.learner_cursors.get(learner_id, 0), from_slot or 0)
+        
+        with self.state_lock:
+            highest_slot = self.accepted_log.highest_slot()
+            replay_to = highest_slot + 1 if highest_slot is not None else from_slot
+            election = self.last_election
+        
+        self.logger.info(f"Stream de notificações aberto para o learner {learner_id} (replay dos slots {from_slot} a {replay_to - 1})")
+        
+        def generate():
+            try:
+                yield json.dumps({
+                    "type": "hello",
+                    "acceptor_id": self.node_id,
+                    "from_slot": from_slot,
+                    "replay_to": replay_to
+                }) + "\n"
+                
+                if election is not None:
+                    yield json.dumps(self._replay_notification(None, election[0], election[1], None)) + "\n"
+                
+                for batch in self._replay_batches(from_slot, replay_to):
+                    yield json.dumps({"type": "batch", "notifications": batch}) + "\n"
+                    with self.lock:
+                        self.metrics["replayed_notifications"] += len(batch)
+                
+                while not stream.closed:
+                    batch = stream.next_batch(self.stream_keepalive)
+                    if batch:
+                        yield json.dumps({"type": "batch", "notifications": batch}) + "\n"
+                        with self.lock:
+                            self.metrics["learner_notifications"] += len(batch)
+                    elif not stream.closed:
+                        yield json.dumps({"type": "keepalive"}) + "\n"
+            finally:
+                self.streams.unsubscribe(stream)
+                self.logger.info(f"Stream de notificações do learner {learner_id} encerrado")
+        
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    def _replay_batches(self, from_slot, to_slot):
+        """
+        Percorre os valores aceitos no intervalo [from_slot, to_slot) em lotes,
+        adquirindo o lock uma vez por lote. Cada lote só é liberado depois que
+        o WAL está em disco até ele, como as notificações ao vivo.
+        
+        Yields:
+            list: Notificações no formato de _accept_locked
+        """
+        position = from_slot
+        
+        while position < to_slot:
+            end = min(to_slot, position + self.replay_chunk_size)
+            # Com todos os stripes, nenhum ACCEPT está entre a atualização do log e o
+            # registro no WAL, então o ticket cobre todas as entradas lidas
+            with self.slot_locks.all():
+                entries = list(self.accepted_log.items(position, end))
+                ticket = self.wal.mark()
+            
+            self.wal.sync(ticket)
+            
+            if entries:
+                yield [
+                    self._replay_notification(slot, entry["proposal_number"], entry["value"], entry["client_id"])
+                    for slot, entry in entries
+                ]
+            position = end
+    
+    def _replay_notification(self, slot, proposal_number, value, client_id):
+        """
+        Notificação de um valor já aceito, reenviada no replay do stream. O TID é
+        determinístico para que reenvios do mesmo valor sejam reconhecidos.
+        """
+        return {
+            "acceptor_id": self.node_id,
+            "proposal_number": proposal_number,
+            "slot": slot,
+            "value": value,
+            "tid": f"{self.node_id}-{'election' if slot is None else slot}-{proposal_number}",
+            "timestamp": time.time(),
+            "is_leader_election": slot is None,
+            "client_id": client_id,
+            "replay": True
+        }
+    
+    def _handle_slots(self, from_slot, to_slot=None):
+        """
+        Retorna os valores aceitos em [from_slot, to_slot), no formato das
+        notificações de replay, para que um learner preencha lacunas do seu log.
+        O intervalo é limitado a replay_chunk_size slots e, como no replay, só
+        inclui valores já gravados em disco.
+        
+        Args:
+            from_slot (int): Primeiro slot
+            to_slot (int, optional): Fim (exclusivo) do intervalo
+        
+        Returns:
+            Response: Resposta HTTP com as notificações e o low-water mark
+        """
+        if from_slot is None or from_slot < 0:
+            return jsonify({"error": "Missing or invalid from_slot"}), 400
+        
+        limit = from_slot + self.replay_chunk_size
+        to_slot = limit if to_slot is None else min(to_slot, limit)
+        
+        notifications = [
+            notification
+            for batch in self._replay_batches(from_slot, to_slot)
+            for notification in batch
+        ]
+        
+        with self.state_lock:
+            low_water_mark = self.accepted_log.low_water_mark
+        
+        with self.lock:
+            self.metrics["slot_requests"] += 1
+        
+        return jsonify({
+            "acceptor_id": self.node_id,
+            "from_slot": from_slot,
+            "to_slot": to_slot,
+            "low_water_mark": low_water_mark,
+            "notifications": notifications
+        }), 200
+    
+    def _handle_learner_ack(self, data):
+        """
+        Registra até onde um learner aplicou o log.
+        
+        Args:
+            data (dict): {"learner_id", "slot", "snapshot_slot"}; slots abaixo de slot já
+                         foram aplicados, e abaixo de snapshot_slot estão no snapshot do learner
+        
+        Returns:
+            Response: Resposta HTTP com o cursor atual
+        """
+        learner_id = data.get('learner_id')
+        slot = data.get('slot')
+        snapshot_slot = data.get('snapshot_slot')
+        
+        if learner_id is None or not isinstance(slot, int):
+            return jsonify({"error": "Missing learner_id or slot"}), 400
+        
+        learner_id = str(learner_id)
+        
+        with self.lock:
+            cursor = max(self.learner_cursors.get(learner_id, 0), slot)
+            self.learner_cursors[learner_id] = cursor
+            if isinstance(snapshot_slot, int):
+                self.learner_snapshots[learner_id] = max(self.learner_snapshots.get(learner_id, 0), snapshot_slot)
+            self.metrics["learner_acks"] += 1
+            
+            # Gravado no WAL para que o cursor sobreviva a um reinício do acceptor; sob
+            # self.lock, o registro não se perde em uma compactação concorrente
+            wal_ticket = self.wal.append({
+                "type": "cursor",
+                "learner_id": learner_id,
+                "slot": cursor,
+                "snapshot_slot": self.learner_snapshots.get(learner_id, 0)
+            })
+        
+        if not self._sync_wal(wal_ticket):
+            return jsonify({"error": "Failed to persist cursor"}), 500
+        
+        return jsonify({"acceptor_id": self.node_id, "learner_id": learner_id, "cursor": cursor}), 200
+    
+    def _handle_heartbeat(self, data):
+        """
+        Processa um heartbeat do líder.
+        
+        Args:
+            data (dict): Dados do heartbeat
+                - leader_id: ID do líder
+                - timestamp: Timestamp do heartbeat
+                - sequence_number: Número de sequência (opcional)
+                - proposal_number: Número de proposta da liderança (pedido de lease)
+                - lease_duration: Duração do lease solicitado em segundos
+                - commit_index: Slots abaixo deste já foram escolhidos pelo líder
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        leader_id = data.get('leader_id')
+        timestamp = data.get('timestamp', time.time())
+        sequence_number = data.get('sequence_number', 0)
+        proposal_number = data.get('proposal_number')
+        lease_duration = data.get('lease_duration')
+        commit_index = data.get('commit_index')
+        lease_granted = False
+        
+        if leader_id is None:
+            return jsonify({"error": "Missing leader_id"}), 400
+        
+        current_time = time.time()
+        
+        with self.lock:
+            # Atualizar último heartbeat recebido
+            self.last_heartbeat_time = current_time
+            self.current_leader_id = leader_id
+            
+            # Atualizar o líder no gossip (set_leader propaga a mudança, então só quando mudou)
+            if self.gossip.get_leader() != leader_id:
+                self.gossip.set_leader(leader_id)
+            
+            # Registrar heartbeat para este proposer
+            self.proposer_heartbeats[str(leader_id)] = {
+                "timestamp": current_time,
+                "sequence_number": sequence_number
+            }
+            
+            self.metrics["heartbeats_received"] += 1
+            
+            # Informado no PROMISE: um novo líder não repropõe slots já escolhidos.
+            # Enfileirado no WAL sob self.lock, como os cursores, para que uma compactação
+            # concorrente não o descarte (ver _sync_wal); não aguarda o sync (segue com a
+            # próxima gravação): perdê-lo em uma queda apenas faz um novo líder repropor
+            # slots já escolhidos
+            if isinstance(commit_index, int) and commit_index > self.commit_index:
+                self.commit_index = commit_index
+                self.wal.append({"type": "commit", "commit_index": commit_index})
+            
+            # Conceder o lease apenas ao líder com o maior número de proposta prometido,
+            # e nunca sobrepor o lease ainda válido de outro líder
+            if proposal_number is not None and lease_duration:
+                lease_free = self.lease_holder in (None, leader_id) or current_time >= self.lease_expiry
+                with self.state_lock:
+                    # ACCEPTs também elevam o máximo prometido (sob o state_lock)
+                    current_ballot = proposal_number >= self.max_promised
+                if current_ballot and lease_free:
+                    self.lease_holder = leader_id
+                    self.lease_ballot = proposal_number
+                    self.lease_expiry = current_time + float(lease_duration)
+                    self.metrics["leases_granted"] += 1
+                    lease_granted = True
+        
+        self.logger.debug(f"Heartbeat recebido do líder {leader_id} (seq: {sequence_number}, lease: {lease_granted})")
+        
+        return jsonify({
+            "status": "acknowledged",
+            "acceptor_id": self.node_id,
+            "received_at": current_time,
+            "lease_granted": lease_granted,
+            "max_promised": self.max_promised
+        }), 200
+    
+    def _safe_truncate_index(self):
+        """
+        Maior low-water mark seguro: slots já escolhidos (commit_index informado pelo
+        líder), aplicados por todos os learners conhecidos e cobertos pelo snapshot de
+        cada um deles, de onde um learner novo ou atrasado copia o estado. Um learner
+        que ainda não confirmou nada impede qualquer truncamento.
+        Deve ser chamado com self.lock adquirido.
+        
+        Returns:
+            int: Slot abaixo do qual o log pode ser descartado
+        """
+        learners = self.gossip.get_nodes_by_role('learner')
+        if not learners:
+            return 0
+        
+        safe_index = self.commit_index
+        for learner_id in learners:
+            learner_id = str(learner_id)
+            safe_index = min(safe_index, self.learner_cursors.get(learner_id, 0), self.learner_snapshots.get(learner_id, 0))
+        return safe_index
+    
+    def _handle_truncate(self, data):
+        """
+        Descarta do log os slots abaixo de below_slot (padrão: o índice seguro).
+        Um novo líder não recupera nem preenche slots abaixo do low-water mark,
+        e os learners não os recebem mais por /slots: below_slot acima do índice
+        seguro (_safe_truncate_index) é recusado.
+        
+        Args:
+            data (dict): Dados da requisição
+                - below_slot: Novo low-water mark (opcional)
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        with self.lock:
+            safe_index = self._safe_truncate_index()
+        
+        below_slot = (data or {}).get('below_slot', safe_index)
+        if not isinstance(below_slot, int) or below_slot < 0:
+            return jsonify({"error": "below_slot must be a non-negative integer"}), 400
+        
+        if below_slot > safe_index:
+            return jsonify({
+                "error": "below_slot above safe truncation index (not chosen, applied and snapshotted by every learner)",
+                "below_slot": below_slot,
+                "safe_index": safe_index
+            }), 409
+        
+        with self.slot_locks.all():
+            removed = self.accepted_log.truncate_below(below_slot)
+            low_water_mark = self.accepted_log.low_water_mark
+            wal_ticket = self.wal.append({"type": "truncate", "below_slot": low_water_mark})
+        
+        if not self._sync_wal(wal_ticket):
+            return jsonify({"error": "Failed to persist truncation"}), 500
+        
+        self.logger.info(f"Log truncado abaixo do slot {low_water_mark}: {removed} slots descartados")
+        
+        return jsonify({
+            "status": "truncated",
+            "acceptor_id": self.node_id,
+            "low_water_mark": low_water_mark,
+            "removed": removed
+        }), 200
+    
+    def _handle_status(self):
+        """
+        Retorna o status atual do acceptor.
+        
+        Returns:
+            Response: Resposta HTTP com informações de status
+        """
+        with self.lock:
+            # Obter algumas entradas recentes do histórico
+            recent_history = list(self.proposal_history.values())[-10:] if self.proposal_history else []
+            
+            learners = self.gossip.get_nodes_by_role('learner')
+            
+            with self.state_lock:
+                state = {
+                    "max_promised": self.max_promised,
+                    "max_accepted": self.max_accepted,
+                    "accepted_value": self.accepted_value,
+                    "last_heartbeat": self.last_heartbeat_time,
+                    "log_size": len(self.accepted_log),
+                    "highest_slot": self.accepted_log.highest_slot(),
+                    "low_water_mark": self.accepted_log.low_water_mark,
+                    "commit_index": self.commit_index,
+                    "lease_holder": self.lease_holder if time.time() < self.lease_expiry else None,
+                    "lease_remaining": max(0, self.lease_expiry - time.time())
+                }
+                slot_store = self.accepted_log.summary()
+            
+            return jsonify({
+                "id": self.node_id,
+                "role": self.node_role,
+                "current_leader": self.current_leader_id,
+                "state": state,
+                "metrics": self.metrics,
+                "recent_proposals": recent_history,
+                "learners_count": len(learners),
+                "learner_cursors": dict(self.learner_cursors),
+                "learner_snapshots": dict(self.learner_snapshots),
+                "safe_truncate_index": self._safe_truncate_index(),
+                "cache_size": len(self.response_cache),
+                "reply_cache": self.response_cache.summary(),
+                "streams": self.streams.summary(),
+                "slot_store": slot_store,
+                "locks": self.slot_locks.summary(),
+                "wal": self.wal.summary()
+            }), 200
+    
+    def _check_leader_status(self):
+        """
+        Verifica periodicamente o status do líder e detecta falhas.
+        """
+        while True:
+            try:
+                current_time = time.time()
+                current_leader = self.gossip.get_leader()
+                
+                if current_leader is not None:
+                    # Verificar se o líder está inativo
+                    if current_time - self.last_heartbeat_time > self.leader_timeout:
+                        self.logger.warning(f"Líder {current_leader} parece inativo. Último heartbeat há {current_time - self.last_heartbeat_time:.1f}s")
+                        
+                        # Limpar líder no gossip
+                        self.gossip.set_leader(None)
+                        
+                        # Atualizar metadata no gossip
+                        self.gossip.update_local_metadata({
+                            "leader_detected_failed": current_leader,
+                            "detection_time": current_time
+                        })
+                        
+                        # Limpar líder local
+                        with self.lock:
+                            self.current_leader_id = None
+            except Exception as e:
+                self.logger.error(f"Erro ao verificar status do líder: {e}")
+            
+            # Verificar a cada 2 segundos
+            time.sleep(2)
+    
+    def _handle_view_logs(self):
+        """
+        Manipulador para a rota view-logs (para debugging).
+        """
+        learners = self.gossip.get_nodes_by_role('learner')
+        
+        return jsonify({
+            "id": self.node_id,
+            "role": self.node_role,
+            "state": {
+                "max_promised": self.max_promised,
+                "max_accepted": self.max_accepted,
+                "accepted_value": self.accepted_value,
+                "log_size": len(self.accepted_log)
+            },
+            "current_leader": self.gossip.get_leader(),
+            "metrics": self.metrics,
+            "learners_count": len(learners),
+            "known_nodes_count": len(self.gossip.get_all_nodes())
+        }), 200
+
+# Para uso como aplicação independente
+if __name__ == '__main__':
+    acceptor = Acceptor()
+    acceptor.start()
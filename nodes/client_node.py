@@ -1,202 +1,338 @@
-import json
-import time
-import threading
-import logging
-import random
-import requests
-from flask import request, jsonify
-
-from base_node import BaseNode
-
-class Client(BaseNode):
-    """
-    Implementação do nó Cliente no algoritmo Paxos.
-    Responsável por enviar requisições ao sistema e receber respostas.
-    """
-    
-    def __init__(self, app=None):
-        """
-        Inicializa o nó Cliente.
-        """
-        super().__init__(app)
-        
-        # Estado específico do cliente
-        self.responses = []
-    
-    def _get_default_port(self):
-        """Porta padrão para clientes"""
-        return 6000
-    
-    def _register_routes(self):
-        """Registrar rotas específicas do cliente"""
-        @self.app.route('/send', methods=['POST'])
-        def send():
-            """Enviar valor para o sistema Paxos"""
-            return self._handle_send(request.json)
-        
-        @self.app.route('/notify', methods=['POST'])
-        def notify():
-            """Receber notificação de learner sobre valor aprendido"""
-            return self._handle_notify(request.json)
-        
-        @self.app.route('/read', methods=['GET'])
-        def read():
-            """Ler valores aprendidos"""
-            return self._handle_read()
-        
-        @self.app.route('/get-responses', methods=['GET'])
-        def get_responses():
-            """Obter respostas recebidas"""
-            with self.lock:
-                return jsonify({"responses": self.responses}), 200
-    
-    def _handle_send(self, data):
-        """
-        Manipula requisições para enviar valores ao sistema.
-        
-        Args:
-            data (dict): Dados da requisição
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        value = data.get('value')
-        
-        if not value:
-            return jsonify({"error": "Value required"}), 400
-        
-        # Obter proposers via Gossip
-        proposers = self.gossip.get_nodes_by_role('proposer')
-        
-        if not proposers:
-            return jsonify({"error": "No proposers available"}), 503
-        
-        # Obter líder atual
-        leader_id = self.gossip.get_leader()
-        
-        # Enviar para o líder, se conhecido, ou para um proposer aleatório
-        target_proposer = None
-        if leader_id and str(leader_id) in proposers:
-            target_proposer = proposers[str(leader_id)]
-            self.logger.info(f"Usando líder conhecido: {leader_id}")
-        else:
-            # Escolher um proposer aleatório
-            proposer_id = random.choice(list(proposers.keys()))
-            target_proposer = proposers[proposer_id]
-            self.logger.info(f"Escolhendo proposer aleatório: {proposer_id}")
-        
-        try:
-            proposer_url = f"http://{target_proposer['address']}:{target_proposer['port']}/propose"
-            send_data = {
-                "value": value,
-                "client_id": self.node_id
-            }
-            
-            response = requests.post(proposer_url, json=send_data, timeout=5)
-            
-            if response.status_code == 200:
-                self.logger.info(f"Valor '{value}' enviado para proposer {target_proposer['id']}")
-                return jsonify({"status": "value sent", "proposer_id": target_proposer['id']}), 200
-            elif response.status_code == 403:
-                # Não é o líder, tente o líder sugerido
-                result = response.json()
-                new_leader = result.get("current_leader")
-                
-                if new_leader and str(new_leader) in proposers:
-                    new_target = proposers[str(new_leader)]
-                    proposer_url = f"http://{new_target['address']}:{new_target['port']}/propose"
-                    
-                    response = requests.post(proposer_url, json=send_data, timeout=5)
-                    
-                    if response.status_code == 200:
-                        self.logger.info(f"Valor '{value}' enviado para líder {new_target['id']}")
-                        return jsonify({"status": "value sent", "proposer_id": new_target['id']}), 200
-                    else:
-                        return jsonify({"error": f"Error sending to leader: {response.text}"}), 500
-                else:
-                    return jsonify({"error": "Leader not available"}), 503
-            else:
-                return jsonify({"error": f"Error sending to proposer: {response.text}"}), 500
-        except Exception as e:
-            self.logger.error(f"Erro ao enviar para proposer: {e}")
-            return jsonify({"error": str(e)}), 500
-    
-    def _handle_notify(self, data):
-        """
-        Manipula notificações de valores aprendidos dos learners.
-        
-        Args:
-            data (dict): Dados da notificação
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        learner_id = data.get('learner_id')
-        proposal_number = data.get('proposal_number')
-        value = data.get('value')
-        learned_at = data.get('learned_at')
-        
-        if not all([learner_id, proposal_number, value]):
-            return jsonify({"error": "Missing required information"}), 400
-        
-        with self.lock:
-            self.responses.append({
-                "learner_id": learner_id,
-                "proposal_number": proposal_number,
-                "value": value,
-                "learned_at": learned_at,
-                "received_at": time.strftime("%Y-%m-%d %H:%M:%S")
-            })
-        
-        self.logger.info(f"Notificação recebida do learner {learner_id}: valor '{value}' foi aprendido")
-        return jsonify({"status": "acknowledged"}), 200
-    
-    def _handle_read(self):
-        """
-        Manipula requisições para ler valores do sistema.
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        # Encontrar learners via Gossip
-        learners = self.gossip.get_nodes_by_role('learner')
-        
-        if not learners:
-            return jsonify({"error": "No learners available"}), 503
-        
-        # Escolher um learner aleatório
-        learner_id = random.choice(list(learners.keys()))
-        learner = learners[learner_id]
-        
-        try:
-            learner_url = f"http://{learner['address']}:{learner['port']}/get-values"
-            response = requests.get(learner_url, timeout=5)
-            
-            if response.status_code == 200:
-                values = response.json().get("values", [])
-                self.logger.info(f"Leitura concluída: {len(values)} valores obtidos do learner {learner_id}")
-                return jsonify({"values": values}), 200
-            else:
-                return jsonify({"error": f"Error reading from learner: {response.text}"}), 500
-        except Exception as e:
-            self.logger.error(f"Erro ao ler do learner: {e}")
-            return jsonify({"error": str(e)}), 500
-    
-    def _handle_view_logs(self):
-        """Manipulador para a rota view-logs"""
-        proposers = self.gossip.get_nodes_by_role('proposer')
-        
-        return jsonify({
-            "id": self.node_id,
-            "role": self.node_role,
-            "proposers_count": len(proposers),
-            "responses_count": len(self.responses),
-            "recent_responses": self.responses[-10:] if self.responses else [],
-            "known_nodes_count": len(self.gossip.get_all_nodes()),
-            "current_leader": self.gossip.get_leader()
-        }), 200
-
-# Para uso como aplicação independente
-if __name__ == '__main__':
-    client = Client()
+import json
+import time
+import threading
+import logging
+import random
+import requests
+from flask import request, jsonify
+
+from base_node import BaseNode
+
+class Client(BaseNode):
+    """
+    Implementação do nó Cliente no algoritmo Paxos.
+    Responsável por enviar requisições ao sistema e receber respostas.
+    """
+    
+    def __init__(self, app=None, group_id=None):
+        """
+        Inicializa o nó Cliente.
+        """
+        super().__init__(app, group_id)
+        
+        # Estado específico do cliente
+        self.responses = []
+    
+    def _get_default_port(self):
+        """Porta padrão para clientes"""
+        return 6000
+    
+    def _register_routes(self):
+        """Registrar rotas específicas do cliente"""
+        @self.app.route('/send', methods=['POST'])
+        def send():
+            """Enviar valor para o sistema Paxos"""
+            return self._handle_send(request.json)
+        
+        @self.app.route('/notify', methods=['POST'])
+        def notify():
+            """Receber notificação de learner sobre valor aprendido"""
+            return self._handle_notify(request.json)
+        
+        @self.app.route('/read', methods=['GET'])
+        def read():
+            """Ler valores aprendidos"""
+            return self._handle_read()
+        
+        @self.app.route('/get-responses', methods=['GET'])
+        def get_responses():
+            """Obter respostas recebidas"""
+            with self.lock:
+                return jsonify({"responses": self.responses}), 200
+    
+    def _handle_send(self, data):
+        """
+        Manipula requisições para enviar valores ao sistema.
+        
+        Args:
+            data (dict): Dados da requisição
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        value = data.get('value')
+        
+        if not value:
+            return jsonify({"error": "Value required"}), 400
+        
+        # Obter proposers via Gossip
+        proposers = self.gossip.get_nodes_by_role('proposer')
+        
+        if not proposers:
+            return jsonify({"error": "No proposers available"}), 503
+        
+        # Obter líder atual
+        leader_id = self.gossip.get_leader()
+        
+        # Enviar para o líder, se conhecido, ou para um proposer aleatório
+        target_proposer = None
+        if leader_id and str(leader_id) in proposers:
+            target_proposer = proposers[str(leader_id)]
+            self.logger.info(f"Usando líder conhecido: {leader_id}")
+        else:
+            # Escolher um proposer aleatório
+            proposer_id = random.choice(list(proposers.keys()))
+            target_proposer = proposers[proposer_id]
+            self.logger.info(f"Escolhendo proposer aleatório: {proposer_id}")
+        
+        # Modo síncrono: aguardar a escolha do valor pelo líder
+        sync = bool(data.get('sync', False))
+        send_timeout = 5
+        
+        try:
+            proposer_url = self._node_url(target_proposer, '/propose')
+            send_data = {
+                "value": value,
+                "client_id": self.node_id
+            }
+            
+            if sync:
+                send_data["sync"] = True
+                if data.get('timeout') is not None:
+                    send_data["timeout"] = data.get('timeout')
+                send_timeout = float(data.get('timeout', 10)) + 5
+            
+            start_time = time.time()
+            response = requests.post(proposer_url, json=send_data, timeout=send_timeout)
+            
+            if response.status_code == 200 and sync:
+                return self._sync_send_result(value, response, start_time)
+            elif response.status_code == 200:
+                self.logger.info(f"Valor '{value}' enviado para proposer {target_proposer['id']}")
+                return jsonify({"status": "value sent", "proposer_id": target_proposer['id']}), 200
+            elif sync and response.status_code in (503, 504):
+                # Prazo esgotado ou liderança perdida antes do commit
+                self.logger.warning(f"Valor '{value}' sem confirmação de commit: {response.status_code}")
+                return jsonify(response.json()), response.status_code
+            elif response.status_code == 429:
+                # Fila do líder cheia: repassar o backpressure com a sugestão de espera
+                self.logger.warning(f"Proposer {target_proposer['id']} sobrecarregado, valor '{value}' não enviado")
+                return jsonify(response.json()), 429, {"Retry-After": response.headers.get("Retry-After", "1")}
+            elif response.status_code == 403:
+                # Não é o líder, tente o líder sugerido
+                result = response.json()
+                new_leader = result.get("current_leader")
+                
+                if new_leader and str(new_leader) in proposers:
+                    new_target = proposers[str(new_leader)]
+                    proposer_url = self._node_url(new_target, '/propose')
+                    
+                    response = requests.post(proposer_url, json=send_data, timeout=send_timeout)
+                    
+                    if response.status_code == 200 and sync:
+                        return self._sync_send_result(value, response, start_time)
+                    elif response.status_code == 200:
+                        self.logger.info(f"Valor '{value}' enviado para líder {new_target['id']}")
+                        return jsonify({"status": "value sent", "proposer_id": new_target['id']}), 200
+                    else:
+                        return jsonify({"error": f"Error sending to leader: {response.text}"}), 500
+                else:
+                    return jsonify({"error": "Leader not available"}), 503
+            else:
+                return jsonify({"error": f"Error sending to proposer: {response.text}"}), 500
+        except Exception as e:
+            self.logger.error(f"Erro ao enviar para proposer: {e}")
+            return jsonify({"error": str(e)}), 500
+    
+    def _sync_send_result(self, value, response, start_time):
+        """
+        Monta a resposta de um envio síncrono confirmado pelo líder.
+        
+        Args:
+            value (str): Valor enviado
+            response (requests.Response): Resposta do proposer
+            start_time (float): Início do envio
+        
+        Returns:
+            Response: Resposta HTTP com slot e latências
+        """
+        result = response.json()
+        result["end_to_end_latency_ms"] = (time.time() - start_time) * 1000
+        self.logger.info(f"Valor '{value}' escolhido no slot {result.get('slot')} ({result['end_to_end_latency_ms']:.1f}ms)")
+        return jsonify(result), 200
+    
+    def _handle_notify(self, data):
+        """
+        Manipula notificações de valores aprendidos dos learners.
+        
+        Args:
+            data (dict): Dados da notificação
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        learner_id = data.get('learner_id')
+        proposal_number = data.get('proposal_number')
+        slot = data.get('slot')
+        value = data.get('value')
+        learned_at = data.get('learned_at')
+        
+        if not all([learner_id, proposal_number, value]):
+            return jsonify({"error": "Missing required information"}), 400
+        
+        with self.lock:
+            self.responses.append({
+                "learner_id": learner_id,
+                "proposal_number": proposal_number,
+                "slot": slot,
+                "value": value,
+                "learned_at": learned_at,
+                "received_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            })
+        
+        self.logger.info(f"Notificação recebida do learner {learner_id}: valor '{value}' foi aprendido")
+        return jsonify({"status": "acknowledged"}), 200
+    
+    def _handle_read(self):
+        """
+        Manipula requisições para ler valores do sistema.
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        # Consistência da leitura:
+        # - linearizable (padrão): learner aguarda o read_index confirmado pelo líder
+        # - lease: índice de leitura do líder sob lease, valores de um learner
+        # - stale: valores já aprendidos pelo learner, sem coordenação
+        consistency = request.args.get('consistency', 'linearizable')
+        
+        if consistency == 'lease':
+            return self._read_from_leader()
+        
+        # Encontrar learners via Gossip
+        learners = self.gossip.get_nodes_by_role('learner')
+        
+        if not learners:
+            return jsonify({"error": "No learners available"}), 503
+        
+        # Escolher um learner aleatório
+        learner_id = random.choice(list(learners.keys()))
+        learner = learners[learner_id]
+        
+        try:
+            learner_url = self._node_url(learner, '/get-values')
+            params = {"consistency": "linearizable"} if consistency == 'linearizable' else {}
+            
+            # Leitura incremental: repassar cursor e tamanho de página (ou all) ao learner
+            for name in ('cursor', 'since', 'page_size', 'all'):
+                if request.args.get(name) is not None:
+                    params[name] = request.args.get(name)
+            
+            response = requests.get(learner_url, params=params, timeout=10)
+            
+            if response.status_code == 200:
+                result = response.json()
+                values = result.get("values", [])
+                self.logger.info(f"Leitura concluída: {len(values)} valores obtidos do learner {learner_id}")
+                reply = {"values": values, "consistency": consistency, "learner_id": learner_id}
+                if "next_cursor" in result:
+                    reply.update({
+                        "total_count": result.get("total_count"),
+                        "next_cursor": result.get("next_cursor"),
+                        "has_more": result.get("has_more")
+                    })
+                return jsonify(reply), 200
+            elif response.status_code in (400, 503, 504):
+                return jsonify(response.json()), response.status_code
+            else:
+                return jsonify({"error": f"Error reading from learner: {response.text}"}), 500
+        except Exception as e:
+            self.logger.error(f"Erro ao ler do learner: {e}")
+            return jsonify({"error": str(e)}), 500
+    
+    def _read_from_leader(self):
+        """
+        Leitura linear via lease: obtém do líder o índice de leitura (sem rodada
+        de heartbeat) e lê os valores de um learner aleatório, que responde após
+        aplicar todos os slots abaixo dele.
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        proposers = self.gossip.get_nodes_by_role('proposer')
+        learners = self.gossip.get_nodes_by_role('learner')
+        leader_id = self.gossip.get_leader()
+        
+        if leader_id is None or str(leader_id) not in proposers:
+            return jsonify({"error": "Leader not available", "retry_suggested": True}), 503
+        
+        if not learners:
+            return jsonify({"error": "No learners available"}), 503
+        
+        try:
+            for attempt in range(2):
+                leader = proposers[str(leader_id)]
+                leader_url = self._node_url(leader, '/read')
+                response = requests.get(leader_url, timeout=5)
+                
+                if response.status_code == 200:
+                    break
+                
+                # Líder mudou: tentar uma vez o líder indicado
+                new_leader = response.json().get("current_leader") if response.status_code == 409 else None
+                if new_leader is None or str(new_leader) not in proposers or new_leader == leader_id:
+                    return jsonify(response.json()), response.status_code
+                leader_id = new_leader
+            else:
+                return jsonify({"error": "Leader not available", "retry_suggested": True}), 503
+            
+            read_index = response.json()["read_index"]
+            
+            learner_id = random.choice(list(learners.keys()))
+            params = {"read_index": read_index}
+            for name in ('cursor', 'since', 'page_size', 'all'):
+                if request.args.get(name) is not None:
+                    params[name] = request.args.get(name)
+            
+            response = requests.get(self._node_url(learners[learner_id], '/get-values'), params=params, timeout=10)
+            if response.status_code != 200:
+                return jsonify(response.json()), response.status_code
+            
+            result = response.json()
+            self.logger.info(f"Leitura linear concluída: {len(result.get('values', []))} valores obtidos do learner {learner_id} (read_index {read_index} do líder {leader_id})")
+            reply = {
+                "values": result.get("values", []),
+                "consistency": "lease",
+                "leader_id": leader_id,
+                "learner_id": learner_id,
+                "read_index": read_index
+            }
+            if "next_cursor" in result:
+                reply.update({
+                    "total_count": result.get("total_count"),
+                    "next_cursor": result.get("next_cursor"),
+                    "has_more": result.get("has_more")
+                })
+            return jsonify(reply), 200
+        except Exception as e:
+            self.logger.error(f"Erro ao ler do líder: {e}")
+            return jsonify({"error": str(e)}), 500
+    
+    def _handle_view_logs(self):
+        """Manipulador para a rota view-logs"""
+        proposers = self.gossip.get_nodes_by_role('proposer')
+        
+        return jsonify({
+            "id": self.node_id,
+            "role": self.node_role,
+            "proposers_count": len(proposers),
+            "responses_count": len(self.responses),
+            "recent_responses": self.responses[-10:] if self.responses else [],
+            "known_nodes_count": len(self.gossip.get_all_nodes()),
+            "current_leader": self.gossip.get_leader()
+        }), 200
+
+# Para uso como aplicação independente
+if __name__ == '__main__':
+    client = Client()
     client.start()
\ No newline at end of file
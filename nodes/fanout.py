@@ -0,0 +1,305 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class QuorumCall:
+    """
+    Envio de uma mesma mensagem a vários nós, concluído assim que um quórum
+    responde com sucesso (ou assim que o quórum se torna impossível).
+    Respostas que chegam depois da conclusão (stragglers) são ignoradas
+    e as tentativas ainda não iniciadas são canceladas.
+    """
+    
+    def __init__(self, targets, quorum_size, on_reply=None, on_complete=None):
+        """
+        Inicializa a chamada.
+        
+        Args:
+            targets (list): IDs dos nós contatados
+            quorum_size (int): Respostas de sucesso necessárias
+            on_reply (callable, optional): on_reply(node_id, result, ok) para cada resposta antes da conclusão
+            on_complete (callable, optional): on_complete(call), chamado uma única vez na conclusão
+        """
+        self.targets = list(targets)
+        self.quorum_size = quorum_size
+        self.on_reply = on_reply
+        self.on_complete = on_complete
+        self.replies = {}  # {node_id: resposta} das respostas de sucesso
+        self.failures = {}  # {node_id: resposta ou motivo} das rejeições e erros
+        self.stragglers = 0
+        self.succeeded = False
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.futures = []
+        
+        # Modo econômico (thrifty): nós reservas só são contatados se um dos
+        # nós escolhidos falhar, rejeitar ou demorar demais
+        self.reserves = []
+        self.sender = None
+        self.fallbacks = 0
+    
+    @property
+    def completed(self):
+        return self.done.is_set()
+    
+    def record(self, node_id, result, ok):
+        """
+        Registra a resposta de um nó e conclui a chamada se possível.
+        
+        Args:
+            node_id (str): ID do nó
+            result: Resposta (dict) ou motivo da falha (str)
+            ok (bool): Se a resposta conta para o quórum
+        """
+        with self.lock:
+            if self.done.is_set():
+                self.stragglers += 1
+                return
+            
+            if ok:
+                self.replies[node_id] = result
+            else:
+                self.failures[node_id] = result
+        
+        if self.on_reply and isinstance(result, dict):
+            self.on_reply(node_id, result, ok)
+        
+        with self.lock:
+            if self.done.is_set():
+                return
+            
+            # Concluir com quórum, ou quando as respostas pendentes não bastam mais
+            self.succeeded = len(self.replies) >= self.quorum_size
+            finished = self.succeeded or len(self.targets) - len(self.failures) < self.quorum_size
+            if finished:
+                self.done.set()
+        
+        if finished:
+            self._finish()
+        elif not ok:
+            # Substituir o nó que falhou por um reserva
+            self.expand()
+    
+    def expand(self):
+        """
+        Envia a mensagem ao próximo nó reserva (modo econômico).
+        
+        Returns:
+            bool: True se algum reserva foi contatado
+        """
+        with self.lock:
+            if self.done.is_set() or not self.reserves:
+                return False
+            node_id = self.reserves.pop(0)
+            self.fallbacks += 1
+        
+        self.sender(node_id, fallback=True)
+        return True
+    
+    def cancel(self):
+        """
+        Encerra a chamada sem sucesso (ex.: o proposer deixou a liderança).
+        """
+        with self.lock:
+            if self.done.is_set():
+                return
+            self.done.set()
+        
+        self._finish()
+    
+    def wait(self, timeout=None):
+        """
+        Aguarda a conclusão da chamada.
+        
+        Returns:
+            bool: True se o quórum foi atingido
+        """
+        self.done.wait(timeout)
+        return self.succeeded
+    
+    def _finish(self):
+        # Tentativas ainda na fila do pool não precisam mais ser enviadas
+        for future in self.futures:
+            future.cancel()
+        
+        if self.on_complete:
+            self.on_complete(self)
+
+class Fanout:
+    """
+    Envio de mensagens HTTP a vários nós por um pool fixo de threads e
+    conexões reutilizadas, em vez de uma thread nova por mensagem.
+    """
+    
+    def __init__(self, max_workers=64, logger=None, url_prefix=''):
+        """
+        Inicializa o pool.
+        
+        Args:
+            max_workers (int): Número máximo de envios simultâneos
+            logger (logging.Logger, optional): Logger do nó
+            url_prefix (str, optional): Prefixo das rotas do grupo Paxos ('' com grupo único)
+        """
+        self.logger = logger
+        self.url_prefix = url_prefix
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+        
+        # Conexões keep-alive com cada nó (requests.Session é usado de forma concorrente
+        # apenas para POSTs sem estado, o que o pool de conexões do urllib3 suporta)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        
+        # Tempo de ida e volta por nó (média móvel), usado para escolher o quórum no modo econômico
+        self.rtt = {}
+        self.rtt_lock = threading.Lock()
+        self.min_thrifty_timeout = 0.05  # segundos
+        self.stats = {"messages_sent": 0, "fallbacks": 0}
+    
+    def post(self, url, data, timeout=1.0):
+        """
+        Envia um POST usando as conexões do pool.
+        
+        Returns:
+            requests.Response: Resposta HTTP
+        """
+        return self.session.post(url, json=data, timeout=timeout)
+    
+    def quorum(self, targets, path, data, quorum_size, is_success, on_reply=None, on_complete=None,
+               base_timeout=1.0, max_retries=3, thrifty=False):
+        """
+        Envia a mesma mensagem a todos os nós e retorna sem bloquear.
+        No modo econômico, envia apenas aos quorum_size nós com menor RTT e
+        recorre aos demais quando um deles falha, rejeita ou excede o timeout.
+        
+        Args:
+            targets (dict): Nós de destino {node_id: {address, port, ...}}
+            path (str): Rota HTTP (ex.: "/accept")
+            data (dict): Corpo JSON da mensagem
+            quorum_size (int): Respostas de sucesso necessárias
+            is_success (callable): is_success(resposta_json) -> bool
+            on_reply (callable, optional): Ver QuorumCall
+            on_complete (callable, optional): Ver QuorumCall
+            base_timeout (float): Timeout da primeira tentativa (cresce 0.5s por tentativa)
+            max_retries (int): Tentativas por nó em caso de erro de rede
+            thrifty (bool): Contatar apenas um quórum, ordenado por RTT
+        
+        Returns:
+            QuorumCall: Chamada em andamento
+        """
+        call = QuorumCall(targets.keys(), quorum_size, on_reply=on_reply, on_complete=on_complete)
+        
+        if not targets or quorum_size <= 0:
+            call.cancel()
+            return call
+        
+        def send(node_id, fallback=False):
+            node = targets[node_id]
+            url = f"http://{node['address']}:{node['port']}{self.url_prefix}{path}"
+            with self.rtt_lock:
+                self.stats["messages_sent"] += 1
+                # Contado uma vez por reserva acionado
+                if fallback:
+                    self.stats["fallbacks"] += 1
+            call.futures.append(self.executor.submit(
+                self._send_to_node, call, node_id, url, data, is_success, base_timeout, max_retries, thrifty
+            ))
+        
+        call.sender = send
+        selected = list(targets)
+        if thrifty and len(targets) > quorum_size:
+            selected = self.rank(targets)
+            selected, call.reserves = selected[:quorum_size], selected[quorum_size:]
+        
+        for node_id in selected:
+            send(node_id)
+        
+        return call
+    
+    def rank(self, targets):
+        """
+        Ordena nós pelo RTT medido; nós sem medição vêm primeiro para serem medidos.
+        
+        Returns:
+            list: IDs dos nós, do mais rápido ao mais lento
+        """
+        with self.rtt_lock:
+            return sorted(targets, key=lambda node_id: self.rtt.get(node_id, 0.0))
+    
+    def rtt_summary(self):
+        """
+        Retorna o RTT médio por nó em milissegundos.
+        """
+        with self.rtt_lock:
+            return {node_id: rtt * 1000 for node_id, rtt in self.rtt.items()}
+    
+    def _record_rtt(self, node_id, elapsed):
+        with self.rtt_lock:
+            previous = self.rtt.get(node_id)
+            self.rtt[node_id] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+    
+    def broadcast(self, targets, path, data, timeout=1.0):
+        """
+        Envia a mesma mensagem a todos os nós, sem aguardar respostas.
+        
+        Args:
+            targets (dict): Nós de destino {node_id: {address, port, ...}}
+            path (str): Rota HTTP
+            data (dict): Corpo JSON da mensagem
+            timeout (float): Timeout de cada envio
+        """
+        for node_id, node in targets.items():
+            url = f"http://{node['address']}:{node['port']}{self.url_prefix}{path}"
+            self.executor.submit(self._send_once, node_id, url, data, timeout)
+    
+    def _send_to_node(self, call, node_id, url, data, is_success, base_timeout, max_retries, thrifty=False):
+        for retry in range(max_retries):
+            # Quórum já decidido: não insistir com nós lentos
+            if call.completed:
+                call.record(node_id, None, False)
+                return
+            
+            try:
+                # Adicionar jitter para evitar sincronização
+                timeout = base_timeout + (retry * 0.5) + random.uniform(0, 0.2)
+                
+                # Modo econômico: a primeira tentativa expira cedo (em função do RTT)
+                # para acionar um reserva sem esperar o timeout completo
+                if thrifty and retry == 0 and call.reserves:
+                    with self.rtt_lock:
+                        rtt = self.rtt.get(node_id)
+                    if rtt is not None:
+                        timeout = min(timeout, max(self.min_thrifty_timeout, 4 * rtt))
+                
+                started = time.time()
+                response = self.post(url, data, timeout)
+                self._record_rtt(node_id, time.time() - started)
+                
+                if response.status_code != 200:
+                    call.record(node_id, f"HTTP {response.status_code}", False)
+                    return
+                
+                result = response.json()
+                call.record(node_id, result, bool(is_success(result)))
+                return
+            except Exception as e:
+                if self.logger:
+                    self.logger.debug(f"Erro ao enviar {url} (tentativa {retry+1}/{max_retries}): {e}")
+                
+                if thrifty and retry == 0:
+                    # Resposta atrasada: penalizar o RTT e acionar um reserva em paralelo
+                    self._record_rtt(node_id, timeout)
+                    call.expand()
+        
+        call.record(node_id, "unreachable", False)
+    
+    def _send_once(self, node_id, url, data, timeout):
+        try:
+            self.post(url, data, timeout)
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(f"Erro ao enviar {url} para o nó {node_id}: {e}")
@@ -0,0 +1,106 @@
+import zlib
+import logging
+from flask import Flask, request, jsonify
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+
+from base_node import group_prefix
+
+def group_for_key(key, groups):
+    """
+    Grupo Paxos responsável por uma chave. Usa CRC32 (e não hash(), que varia
+    entre processos) para que todos os clientes escolham o mesmo grupo.
+    
+    Args:
+        key: Chave do valor (convertida para texto)
+        groups (int): Número de grupos
+    
+    Returns:
+        int: ID do grupo, em [0, groups)
+    """
+    return zlib.crc32(str(key).encode('utf-8')) % groups
+
+class GroupHost:
+    """
+    Hospeda vários grupos Paxos independentes em um único processo.
+    
+    Cada grupo é uma instância completa do nó (gossip, números de proposta,
+    log, líder e DATA_DIR próprios), com suas rotas montadas sob /g/<id> na
+    mesma porta. Todos os processos do cluster devem usar o mesmo PAXOS_GROUPS, pois
+    cada instância conversa apenas com as instâncias do seu grupo nos outros nós.
+    """
+    
+    def __init__(self, node_class, groups):
+        """
+        Cria uma instância do nó por grupo.
+        
+        Args:
+            node_class (type): Classe do nó (Proposer, Acceptor, Learner ou Client)
+            groups (int): Número de grupos
+        """
+        self.logger = logging.getLogger('[GroupHost]')
+        self.groups = groups
+        self.nodes = [node_class(group_id=group_id) for group_id in range(groups)]
+        self.port = self.nodes[0].port
+        
+        # Rotas do processo (fora dos grupos)
+        self.app = Flask(__name__)
+        self._register_routes()
+        
+        self.app.wsgi_app = DispatcherMiddleware(self.app.wsgi_app, {
+            group_prefix(node.group_id): node.app for node in self.nodes
+        })
+    
+    def _register_routes(self):
+        @self.app.route('/health', methods=['GET'])
+        def health():
+            """Verificar saúde do processo"""
+            node = self.nodes[0]
+            return jsonify({
+                "status": "healthy",
+                "role": node.node_role,
+                "id": node.node_id,
+                "groups": self.groups
+            }), 200
+        
+        @self.app.route('/groups', methods=['GET'])
+        def groups():
+            """Líder atual e nós conhecidos de cada grupo"""
+            return jsonify({
+                "groups": {
+                    str(node.group_id): {
+                        "prefix": group_prefix(node.group_id),
+                        "current_leader": node.gossip.get_leader(),
+                        "known_nodes": len(node.gossip.get_all_nodes())
+                    } for node in self.nodes
+                }
+            }), 200
+        
+        if hasattr(self.nodes[0], '_handle_send'):
+            @self.app.route('/send', methods=['POST'])
+            def send():
+                """Enviar valor ao grupo da chave (ou do próprio valor, sem chave)"""
+                data = request.json or {}
+                key = data.get('key', data.get('value'))
+                if key is None:
+                    return jsonify({"error": "Value required"}), 400
+                
+                group_id = group_for_key(key, self.groups)
+                response = self.nodes[group_id]._handle_send(data)
+                
+                # Informar o grupo escolhido junto com a resposta (status e cabeçalhos preservados)
+                body, rest = (response[0], response[1:]) if isinstance(response, tuple) else (response, ())
+                payload = body.get_json(silent=True)
+                if not isinstance(payload, dict):
+                    return response
+                payload["group"] = group_id
+                return (jsonify(payload),) + tuple(rest)
+    
+    def start(self):
+        """
+        Inicia todos os grupos e serve as rotas de todos na porta do nó.
+        """
+        for node in self.nodes:
+            node.setup()
+        
+        self.logger.info(f"{self.groups} grupos Paxos hospedados na porta {self.port}")
+        self.app.run(host='0.0.0.0', port=self.port, threaded=True)
@@ -1,387 +1,1229 @@
-import json
-import time
-import threading
-import logging
-import uuid
-import random
-import requests
-from flask import request, jsonify
-from collections import defaultdict, OrderedDict
-
-from base_node import BaseNode
-
-class Learner(BaseNode):
-    """
-    Implementação do nó Learner no algoritmo Paxos.
-    Responsável por aprender e armazenar os valores que atingiram consenso,
-    bem como notificar os clientes sobre esses valores.
-    """
-    
-    def __init__(self, app=None):
-        """
-        Inicializa o nó Learner.
-        """
-        super().__init__(app)
-        
-        # Estruturas de dados para rastreamento de propostas
-        self.learned_values = []  # Valores aprendidos em ordem
-        self.proposal_counts = defaultdict(lambda: defaultdict(int))  # {proposal_number: {value: count}}
-        self.acceptor_proposals = defaultdict(dict)  # {acceptor_id: {proposal_number: value}}
-        
-        # Estado compartilhado entre todos os nós
-        self.shared_data = []  # Lista de valores em ordem de aprendizado
-        
-        # Cache para otimização
-        self.learned_proposal_numbers = set()  # Conjunto para rápida verificação de proposals já aprendidas
-        
-        # Estado do líder
-        self.current_leader = None
-        
-        # Métricas
-        self.metrics = {
-            "total_learned": 0,
-            "values_by_type": defaultdict(int),
-            "client_notifications": 0,
-            "batch_notifications_received": 0,
-            "single_notifications_received": 0
-        }
-        
-        # Mapa de TIDs para evitar processamento duplicado
-        self.processed_tids = set()
-        self.max_processed_tids = 10000  # Limitar tamanho para evitar crescimento ilimitado
-        
-        self.logger.info(f"Learner inicializado com ID {self.node_id}")
-    
-    def _get_default_port(self):
-        """Porta padrão para learners"""
-        return 5000
-    
-    def _register_routes(self):
-        """Registra as rotas específicas do learner"""
-        @self.app.route('/learn', methods=['POST'])
-        def learn():
-            """Recebe notificação de valor aceito de um acceptor"""
-            return self._handle_learn(request.json)
-        
-        @self.app.route('/get-values', methods=['GET'])
-        def get_values():
-            """Obtém valores aprendidos"""
-            return self._handle_get_values()
-        
-        @self.app.route('/status', methods=['GET'])
-        def status():
-            """Retorna o status atual do learner"""
-            return self._handle_status()
-    
-    def _handle_learn(self, data):
-        """
-        Processa notificações de valores aceitos enviados pelos acceptors.
-        Suporta tanto notificações individuais quanto em lote.
-        
-        Args:
-            data (dict): Dados da notificação
-                - Um único objeto de notificação ou
-                - Uma lista de notificações em 'notifications'
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        # Verificar se é uma notificação em lote
-        notifications = data.get('notifications')
-        if notifications and isinstance(notifications, list):
-            self.logger.info(f"Recebido lote com {len(notifications)} notificações")
-            self.metrics["batch_notifications_received"] += 1
-            
-            results = []
-            for notification in notifications:
-                result = self._process_single_notification(notification)
-                results.append(result)
-            
-            return jsonify({
-                "status": "acknowledged",
-                "processed": len(results),
-                "learned": sum(1 for r in results if r.get("learned", False))
-            }), 200
-        else:
-            # Notificação individual
-            self.metrics["single_notifications_received"] += 1
-            result = self._process_single_notification(data)
-            
-            return jsonify({
-                "status": "acknowledged",
-                "learned": result.get("learned", False)
-            }), 200
-    
-    def _process_single_notification(self, data):
-        """
-        Processa uma única notificação de um acceptor.
-        
-        Args:
-            data (dict): Dados da notificação
-                - acceptor_id: ID do acceptor
-                - proposal_number: Número da proposta
-                - value: Valor aceito
-                - tid: Transaction ID
-                - is_leader_election: Se é eleição de líder
-                - client_id: ID do cliente (opcional)
-        
-        Returns:
-            dict: Resultado do processamento
-        """
-        acceptor_id = data.get('acceptor_id')
-        proposal_number = data.get('proposal_number')
-        value = data.get('value')
-        tid = data.get('tid')
-        is_leader_election = data.get('is_leader_election', False)
-        client_id = data.get('client_id')
-        
-        if not all([acceptor_id, proposal_number, value, tid]):
-            self.logger.warning(f"Notificação incompleta recebida: {data}")
-            return {"learned": False, "error": "Missing required information"}
-        
-        # Verificar se já processamos este TID para evitar duplicação
-        if tid in self.processed_tids:
-            self.logger.debug(f"TID {tid} já processado, ignorando")
-            return {"learned": False, "already_processed": True}
-        
-        # Adicionar TID ao conjunto de processados
-        self.processed_tids.add(tid)
-        
-        # Limitar tamanho do conjunto de TIDs processados
-        if len(self.processed_tids) > self.max_processed_tids:
-            # Remover os mais antigos (estima-se que os primeiros sejam os mais antigos)
-            self.processed_tids = set(list(self.processed_tids)[len(self.processed_tids) // 2:])
-        
-        with self.lock:
-            # Registrar a proposta deste acceptor
-            self.acceptor_proposals[acceptor_id][proposal_number] = value
-            
-            # Incrementar contador para esta proposta e valor
-            self.proposal_counts[proposal_number][value] += 1
-            
-            # Obter contagem total de acceptors
-            acceptors = self.gossip.get_nodes_by_role('acceptor')
-            acceptor_count = len(acceptors)
-            
-            # Calcular tamanho do quórum (maioria)
-            quorum_size = acceptor_count // 2 + 1
-            
-            # Verificar se este valor atingiu quórum para esta proposta
-            value_count = self.proposal_counts[proposal_number][value]
-            has_quorum = value_count >= quorum_size
-            
-            self.logger.info(f"Acceptor {acceptor_id} enviou valor: {value} para proposta {proposal_number}. Contagem: {value_count}/{quorum_size}")
-            
-            if has_quorum and proposal_number not in self.learned_proposal_numbers:
-                # Marcar proposta como aprendida
-                self.learned_proposal_numbers.add(proposal_number)
-                
-                # Se for eleição de líder, atualizar informação no gossip
-                if is_leader_election and value.startswith("leader:"):
-                    leader_id = int(value.split(":")[1])
-                    self.current_leader = leader_id
-                    self.gossip.set_leader(leader_id)
-                    self.logger.info(f"Líder atualizado para {leader_id}")
-                    
-                    # Adicionar aos valores aprendidos
-                    value_type = "leader_election"
-                    self.metrics["values_by_type"][value_type] += 1
-                    
-                    learned_entry = {
-                        "proposal_number": proposal_number,
-                        "value": value,
-                        "timestamp": time.time(),
-                        "type": value_type,
-                        "acceptor_count": value_count,
-                        "quorum_size": quorum_size
-                    }
-                    self.learned_values.append(learned_entry)
-                    
-                else:
-                    # Valor normal, adicionar aos dados compartilhados
-                    self.shared_data.append(value)
-                    
-                    # Adicionar aos valores aprendidos
-                    value_type = "normal"
-                    self.metrics["values_by_type"][value_type] += 1
-                    
-                    learned_entry = {
-                        "proposal_number": proposal_number,
-                        "value": value,
-                        "timestamp": time.time(),
-                        "type": value_type,
-                        "acceptor_count": value_count,
-                        "quorum_size": quorum_size
-                    }
-                    self.learned_values.append(learned_entry)
-                    
-                    # Limitar o tamanho da lista de valores aprendidos
-                    if len(self.learned_values) > 1000:
-                        self.learned_values = self.learned_values[-1000:]
-                    
-                    # Atualizar contagem total
-                    self.metrics["total_learned"] += 1
-                    
-                    # Atualizar metadata no gossip
-                    self.gossip.update_local_metadata({
-                        "last_learned_proposal": proposal_number,
-                        "last_learned_value": value,
-                        "learned_values_count": len(self.learned_values)
-                    })
-                    
-                    self.logger.info(f"Aprendido valor: {value} da proposta {proposal_number} (quórum: {value_count}/{quorum_size})")
-                    
-                    # Notificar cliente se especificado
-                    if client_id:
-                        threading.Thread(
-                            target=self._notify_client,
-                            args=(client_id, value, proposal_number)
-                        ).start()
-                
-                return {"learned": True, "value": value, "proposal_number": proposal_number}
-            else:
-                # Ainda não atingiu quórum ou já foi aprendido
-                already_learned = proposal_number in self.learned_proposal_numbers
-                if already_learned:
-                    self.logger.debug(f"Proposta {proposal_number} já aprendida anteriormente")
-                    
-                return {"learned": False, "already_learned": already_learned}
-    
-    def _handle_get_values(self):
-        """
-        Responde a solicitações para obter valores aprendidos.
-        
-        Returns:
-            Response: Resposta HTTP com os valores
-        """
-        # Opcional: adicionar parâmetros como limit, offset, etc.
-        limit = request.args.get('limit', default=0, type=int)
-        
-        with self.lock:
-            if limit > 0:
-                values = self.shared_data[-limit:]
-            else:
-                values = self.shared_data
-            
-            return jsonify({
-                "values": values,
-                "total_count": len(self.shared_data),
-                "returned_count": len(values)
-            }), 200
-    
-    def _handle_status(self):
-        """
-        Retorna o status atual do learner.
-        
-        Returns:
-            Response: Resposta HTTP com informações de status
-        """
-        clients = self.gossip.get_nodes_by_role('client')
-        acceptors = self.gossip.get_nodes_by_role('acceptor')
-        
-        with self.lock:
-            # Preparar metrics para serialização JSON
-            json_metrics = dict(self.metrics)
-            json_metrics["values_by_type"] = dict(json_metrics["values_by_type"])
-            
-            recent_values = self.learned_values[-10:] if self.learned_values else []
-            
-            return jsonify({
-                "id": self.node_id,
-                "role": self.node_role,
-                "current_leader": self.current_leader,
-                "learned_values_count": len(self.learned_values),
-                "recent_learned_values": recent_values,
-                "shared_data_count": len(self.shared_data),
-                "recent_shared_data": self.shared_data[-10:] if self.shared_data else [],
-                "clients_count": len(clients),
-                "acceptors_count": len(acceptors),
-                "known_nodes_count": len(self.gossip.get_all_nodes()),
-                "metrics": json_metrics
-            }), 200
-    
-    def _notify_client(self, client_id, value, proposal_number):
-        """
-        Notifica um cliente sobre um valor aprendido.
-        
-        Args:
-            client_id (int): ID do cliente
-            value (str): Valor aprendido
-            proposal_number (int): Número da proposta
-        """
-        self.logger.info(f"Notificando cliente {client_id} sobre valor: {value}")
-        
-        # Obter clientes via gossip
-        clients = self.gossip.get_nodes_by_role('client')
-        
-        # Encontrar o cliente específico
-        client = None
-        for cid, c in clients.items():
-            if str(c['id']) == str(client_id):
-                client = c
-                break
-        
-        if client:
-            # Implementar retry com backoff exponencial
-            max_retries = 3
-            base_timeout = 1.0
-            
-            for retry in range(max_retries):
-                try:
-                    # Timeout adaptativo com jitter para evitar sincronização
-                    timeout = base_timeout * (2 ** retry) + random.uniform(0, 0.3)
-                    
-                    client_url = f"http://{client['address']}:{client['port']}/notify"
-                    notification_data = {
-                        "learner_id": self.node_id,
-                        "proposal_number": proposal_number,
-                        "value": value,
-                        "learned_at": time.strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    
-                    response = requests.post(client_url, json=notification_data, timeout=timeout)
-                    
-                    if response.status_code == 200:
-                        self.logger.info(f"Cliente {client_id} notificado com sucesso sobre valor: {value}")
-                        self.metrics["client_notifications"] += 1
-                        break  # Sucesso, sair do loop
-                    else:
-                        self.logger.warning(f"Erro ao notificar cliente {client_id}: {response.status_code} - {response.text}")
-                except Exception as e:
-                    self.logger.error(f"Erro ao notificar cliente {client_id} (tentativa {retry+1}/{max_retries}): {e}")
-                    
-                    # Se não for a última tentativa, aguardar antes de tentar novamente
-                    if retry < max_retries - 1:
-                        time.sleep(base_timeout * (2 ** retry) * 0.5)
-        else:
-            self.logger.warning(f"Cliente {client_id} não encontrado para notificação")
-    
-    def _handle_view_logs(self):
-        """
-        Manipulador para a rota view-logs (para debugging).
-        """
-        clients = self.gossip.get_nodes_by_role('client')
-        acceptors = self.gossip.get_nodes_by_role('acceptor')
-        
-        with self.lock:
-            # Preparar metrics para serialização JSON
-            json_metrics = dict(self.metrics)
-            json_metrics["values_by_type"] = dict(json_metrics["values_by_type"])
-            
-            return jsonify({
-                "id": self.node_id,
-                "role": self.node_role,
-                "learned_values_count": len(self.learned_values),
-                "recent_learned_values": self.learned_values[-10:] if self.learned_values else [],
-                "shared_data": self.shared_data if len(self.shared_data) <= 20 else self.shared_data[-20:],
-                "clients_count": len(clients),
-                "acceptors_count": len(acceptors),
-                "known_nodes_count": len(self.gossip.get_all_nodes()),
-                "current_leader": self.gossip.get_leader(),
-                "metrics": json_metrics
-            }), 200
-
-# Para uso como aplicação independente
-if __name__ == '__main__':
-    learner = Learner()
+import json
+import os
+import shutil
+import time
+import threading
+import logging
+import uuid
+import random
+import http.client
+import requests
+from flask import Response, request, jsonify
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from base_node import BaseNode
+from quorum import QuorumPolicy
+from vote_tracker import VoteTracker
+from sequence_window import SequenceWindow
+from segment_log import SegmentLog
+
+class Learner(BaseNode):
+    """
+    Implementação do nó Learner no algoritmo Paxos.
+    Responsável por aprender e armazenar os valores que atingiram consenso,
+    bem como notificar os clientes sobre esses valores.
+    """
+    
+    def __init__(self, app=None, group_id=None):
+        """
+        Inicializa o nó Learner.
+        """
+        super().__init__(app, group_id)
+        
+        # Estruturas de dados para rastreamento de propostas
+        self.learned_values = []  # Valores aprendidos em ordem
+        self.vote_tracker = VoteTracker()  # Votos dos acceptors por instância ainda não decidida
+        
+        # Estado compartilhado entre todos os nós, aplicado estritamente em ordem de slot:
+        # learners com o mesmo applied_index têm os mesmos valores na mesma ordem. Os
+        # valores ficam em um log segmentado em DATA_DIR, lido por mmap
+        self.segment_bytes = int(os.environ.get('LEARNER_SEGMENT_BYTES', 64 * 1024 * 1024))
+        self.value_log = SegmentLog(os.path.join(self.data_dir, 'values'), self.segment_bytes)
+        
+        # Cache para otimização
+        self.learned_proposal_numbers = set()  # Eleições já aprendidas (por número de proposta)
+        self.chosen_slots = {}  # Slots decididos acima do applied_index, aguardando os anteriores {slot: decisão}
+        
+        # Prefixo contíguo de slots aplicados, usado pelas leituras lineares (read-index)
+        self.applied_index = 0
+        self.applied_condition = threading.Condition(self.lock)
+        self.read_index_timeout = 5.0  # segundos aguardando aplicar até o read_index
+        self.max_page_size = max(1, int(os.environ.get('LEARNER_MAX_PAGE_SIZE', 1000)))  # valores por página (leitura com cursor)
+        
+        # Recuperação de lacunas: slots faltando abaixo de um slot já decidido (ou de um
+        # read_index) por mais de gap_fill_delay são buscados em lote nos acceptors (/slots)
+        self.gap_fill_delay = float(os.environ.get('LEARNER_GAP_FILL_DELAY_MS', 500)) / 1000.0  # segundos
+        self.gap_since = None     # Momento em que a lacuna atual foi detectada
+        self.catch_up_to = 0      # Maior read_index recebido do líder (slots que devem existir)
+        
+        # Estado do líder
+        self.current_leader = None
+        
+        # Notificações aos clientes por um pool fixo de threads (não uma thread por valor).
+        # Apenas valores decididos por notificações ao vivo são notificados: o histórico
+        # recebido em replay, por /slots ou em snapshot já foi entregue antes
+        self.client_notifier = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notify")
+        
+        # Tamanho do quórum de fase 2, o mesmo usado pelos proposers
+        self.quorum = QuorumPolicy.from_env()
+        
+        # Métricas
+        self.metrics = {
+            "total_learned": 0,
+            "values_by_type": defaultdict(int),
+            "client_notifications": 0,
+            "client_notifications_skipped": 0,
+            "batch_notifications_received": 0,
+            "single_notifications_received": 0,
+            "linearizable_reads": 0,
+            "read_index_timeouts": 0,
+            "stream_notifications_received": 0,
+            "stream_reconnects": 0,
+            "replayed_notifications_received": 0,
+            "out_of_order_slots": 0,
+            "failed_slots": 0,
+            "gap_fills": 0,
+            "gap_slots_recovered": 0,
+            "snapshots_taken": 0,
+            "snapshot_chunks_served": 0,
+            "snapshot_installs": 0,
+            "cursor_reads": 0
+        }
+        
+        # Streams de notificação abertos com os acceptors: {acceptor_id: thread consumidora}
+        self.acceptor_streams = {}
+        self.stream_timeout = 3.0  # segundos sem dados (nem keepalive) antes de reconectar
+        self.acked_index = {}  # {acceptor_id: último applied_index confirmado ao acceptor}
+        
+        # Janela de seqs por acceptor para descartar notificações repetidas
+        self.sequence_window = SequenceWindow(int(os.environ.get('LEARNER_DEDUP_WINDOW', 1024)))
+        
+        # Snapshots do estado aplicado (os primeiros value_count valores do log, que cobrem
+        # os slots abaixo de applied_index), tirados a cada snapshot_every slots, gravados em
+        # DATA_DIR e transferidos em partes para learners novos, que depois recebem dos
+        # acceptors apenas os slots seguintes
+        self.snapshot_file = 'learner_snapshot.json'
+        self.snapshot_every = max(1, int(os.environ.get('LEARNER_SNAPSHOT_EVERY', 1000)))  # slots
+        self.snapshot_chunk_size = max(1, int(os.environ.get('LEARNER_SNAPSHOT_CHUNK', 1000)))  # valores por parte
+        self.snapshots = OrderedDict()  # {snapshot_id: snapshot}; o anterior é mantido para transferências em andamento
+        self.max_snapshots = 2
+        
+        # Checkpoint do log de valores: applied_index e quantos valores o cobrem, gravado
+        # em DATA_DIR (após sincronizar o log) antes de cada confirmação aos acceptors, que
+        # nunca recebem um cursor além do que sobrevive a um reinício
+        self.checkpoint_file = 'learner_applied.json'
+        self.persisted_index = 0  # applied_index do último checkpoint gravado
+        
+        # Ao reiniciar, o log é reaberto até o checkpoint (ou o snapshot) mais recente;
+        # apenas os valores além dele (slots ainda não registrados, ou aplicados pela
+        # metade) são descartados e recebidos de novo pelo replay dos acceptors
+        stored = len(self.value_log)
+        checkpoint = self._load_state(self.checkpoint_file)
+        snapshot = self._load_state(self.snapshot_file)
+        if checkpoint and checkpoint.get("value_count", stored + 1) > stored:
+            self.logger.warning(f"Checkpoint local não corresponde ao log de valores, ignorando-o")
+            checkpoint = None
+        if snapshot and snapshot.get("value_count", stored + 1) > stored:
+            self.logger.warning(f"Snapshot local não corresponde ao log de valores, ignorando-o")
+            snapshot = None
+        
+        if checkpoint and (snapshot is None or checkpoint["applied_index"] >= snapshot["applied_index"]):
+            self.value_log.truncate(checkpoint["value_count"])
+            self.applied_index = self.persisted_index = checkpoint["applied_index"]
+            self.current_leader = checkpoint.get("current_leader")
+            if snapshot:
+                self.snapshots[snapshot["id"]] = snapshot
+            self.logger.info(f"Log de valores reaberto até o slot {checkpoint['applied_index'] - 1} ({checkpoint['value_count']} valores, {stored - checkpoint['value_count']} descartados)")
+        elif snapshot:
+            self._install_snapshot(snapshot)
+            self.persisted_index = snapshot["applied_index"]
+            self.logger.info(f"Estado restaurado do snapshot local até o slot {snapshot['applied_index'] - 1} ({snapshot['value_count']} valores)")
+        else:
+            self.value_log.truncate(0)
+        
+        self.logger.info(f"Learner inicializado com ID {self.node_id}")
+    
+    def _get_default_port(self):
+        """Porta padrão para learners"""
+        return 5000
+    
+    def _register_routes(self):
+        """Registra as rotas específicas do learner"""
+        @self.app.route('/learn', methods=['POST'])
+        def learn():
+            """Recebe notificação de valor aceito de um acceptor"""
+            return self._handle_learn(request.json)
+        
+        @self.app.route('/get-values', methods=['GET'])
+        def get_values():
+            """Obtém valores aprendidos"""
+            return self._handle_get_values()
+        
+        @self.app.route('/snapshot', methods=['GET'])
+        def snapshot():
+            """Descreve o snapshot mais recente (transferência de estado)"""
+            return self._handle_snapshot()
+        
+        @self.app.route('/snapshot/chunk', methods=['GET'])
+        def snapshot_chunk():
+            """Obtém uma parte dos valores de um snapshot"""
+            return self._handle_snapshot_chunk(request.args.get('id'), request.args.get('offset', default=0, type=int))
+        
+        @self.app.route('/status', methods=['GET'])
+        def status():
+            """Retorna o status atual do learner"""
+            return self._handle_status()
+    
+    def _start_threads(self):
+        """Inicia as threads específicas do learner"""
+        # Thread que mantém um stream de notificações aberto com cada acceptor
+        threading.Thread(target=self._maintain_streams, daemon=True).start()
+        
+        # Thread que detecta lacunas no log e busca os slots faltantes nos acceptors
+        threading.Thread(target=self._gap_fill_loop, daemon=True).start()
+        
+        # Thread que tira snapshots periódicos do estado aplicado
+        threading.Thread(target=self._snapshot_loop, daemon=True).start()
+    
+    def _maintain_streams(self):
+        """
+        Thread que abre um stream (/stream) com cada acceptor descoberto via gossip
+        e confirma periodicamente a cada acceptor até onde o log foi aplicado.
+        
+        Antes de abrir os streams, um learner muito atrás de seus pares (novo ou
+        reiniciado) copia o snapshot de um deles, e os streams começam após ele.
+        """
+        try:
+            self._bootstrap_from_peer()
+        except Exception as e:
+            self.logger.error(f"Erro ao copiar snapshot de um learner: {e}")
+        
+        while True:
+            try:
+                self._checkpoint_applied()
+            except Exception as e:
+                self.logger.error(f"Erro ao gravar checkpoint do log de valores: {e}")
+            
+            try:
+                acceptors = self.gossip.get_nodes_by_role('acceptor')
+                for acceptor_id, acceptor in acceptors.items():
+                    consumer = self.acceptor_streams.get(acceptor_id)
+                    if consumer is None or not consumer.is_alive():
+                        consumer = threading.Thread(
+                            target=self._consume_stream,
+                            args=(acceptor_id, acceptor['address'], acceptor['port']),
+                            daemon=True
+                        )
+                        self.acceptor_streams[acceptor_id] = consumer
+                        consumer.start()
+                    else:
+                        self._ack_acceptor(acceptor_id, acceptor)
+            except Exception as e:
+                self.logger.error(f"Erro ao manter streams de notificação: {e}")
+            
+            time.sleep(1)
+    
+    def _consume_stream(self, acceptor_id, address, port):
+        """
+        Lê o stream de notificações de um acceptor até a conexão cair.
+        
+        O stream é lido linha a linha com http.client, sem o buffer de
+        requests.iter_lines, para que cada lote seja processado assim que chega.
+        Ao conectar, o learner informa o primeiro slot ainda não aplicado, e o
+        acceptor reenvia tudo o que aceitou a partir dele.
+        
+        Args:
+            acceptor_id (str): ID do acceptor
+            address (str): Endereço do acceptor
+            port (int): Porta do acceptor
+        """
+        with self.lock:
+            from_slot = self.applied_index
+        
+        connection = http.client.HTTPConnection(address, port, timeout=self.stream_timeout)
+        try:
+            connection.request('GET', f'{self.url_prefix}/stream?learner_id={self.node_id}&from_slot={from_slot}')
+            response = connection.getresponse()
+            if response.status != 200:
+                self.logger.warning(f"Acceptor {acceptor_id} recusou o stream: HTTP {response.status}")
+                return
+            
+            self.logger.info(f"Stream de notificações aberto com o acceptor {acceptor_id} a partir do slot {from_slot}")
+            self.acked_index[acceptor_id] = from_slot
+            
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                
+                message = json.loads(line)
+                if message.get("type") == "hello":
+                    # O acceptor retoma do cursor confirmado, se maior: os slots entre o
+                    # applied_index e ele existem e são buscados pela recuperação de lacunas
+                    if message.get("from_slot", 0) > from_slot:
+                        with self.lock:
+                            self.catch_up_to = max(self.catch_up_to, message["from_slot"])
+                        self.logger.warning(f"Acceptor {acceptor_id} retomou o stream no slot {message['from_slot']}, acima do slot {from_slot} pedido")
+                    continue
+                if message.get("type") == "keepalive":
+                    continue
+                
+                # Cada lote do acceptor chega em uma linha e é contado de uma só vez
+                notifications = message["notifications"] if message.get("type") == "batch" else [message]
+                with self.lock:
+                    self.metrics["stream_notifications_received"] += len(notifications)
+                    self.metrics["replayed_notifications_received"] += sum(1 for n in notifications if n.get("replay"))
+                self._process_notifications(notifications)
+        except Exception as e:
+            self.logger.debug(f"Stream com o acceptor {acceptor_id} encerrado: {e}")
+        finally:
+            connection.close()
+            with self.lock:
+                self.metrics["stream_reconnects"] += 1
+    
+    def _checkpoint_applied(self):
+        """
+        Sincroniza o log de valores e grava o checkpoint com o applied_index atual
+        e a quantidade de valores que o cobre (apenas quando o índice avançou).
+        """
+        with self.lock:
+            if self.applied_index <= self.persisted_index:
+                return
+            path = self.value_log.sync_target()
+            checkpoint = {
+                "applied_index": self.applied_index,
+                "value_count": len(self.value_log),
+                "current_leader": self.current_leader
+            }
+        
+        # fsync e gravação fora do lock, sem bloquear a aplicação de novos slots;
+        # apenas esta thread grava o checkpoint
+        if path is not None:
+            SegmentLog.sync_path(path)
+        if self._save_state(self.checkpoint_file, checkpoint):
+            self.persisted_index = checkpoint["applied_index"]
+    
+    def _ack_acceptor(self, acceptor_id, acceptor):
+        """
+        Confirma ao acceptor o applied_index do último checkpoint, avançando o
+        cursor de entrega deste learner (enviado apenas quando o índice avançou),
+        e o slot coberto pelo último snapshot, que limita o truncamento do log do
+        acceptor.
+        
+        Args:
+            acceptor_id (str): ID do acceptor
+            acceptor (dict): Endereço e porta do acceptor (gossip)
+        """
+        with self.lock:
+            applied_index = self.persisted_index
+            latest = next(reversed(self.snapshots.values()), None)
+            snapshot_slot = latest["applied_index"] if latest else 0
+        
+        if applied_index <= self.acked_index.get(acceptor_id, 0):
+            return
+        
+        try:
+            response = requests.post(
+                self._node_url(acceptor, '/learner-ack'),
+                json={"learner_id": self.node_id, "slot": applied_index, "snapshot_slot": snapshot_slot},
+                timeout=1.0
+            )
+            if response.status_code == 200:
+                self.acked_index[acceptor_id] = applied_index
+        except Exception as e:
+            self.logger.debug(f"Erro ao confirmar cursor ao acceptor {acceptor_id}: {e}")
+    
+    def _gap_fill_loop(self):
+        """
+        Thread que detecta lacunas no log (slots faltando abaixo de um slot já
+        decidido ou do último read_index) e, se a lacuna persistir por mais de
+        gap_fill_delay, busca os slots faltantes em lote em todos os acceptors.
+        """
+        while True:
+            try:
+                with self.lock:
+                    target = max(max(self.chosen_slots, default=-1) + 1, self.catch_up_to)
+                    from_slot = self.applied_index
+                    
+                    if target <= from_slot:
+                        self.gap_since = None
+                    elif self.gap_since is None:
+                        self.gap_since = time.time()
+                    
+                    due = self.gap_since is not None and time.time() - self.gap_since >= self.gap_fill_delay
+                
+                if due:
+                    self._fill_gap(from_slot, target)
+            except Exception as e:
+                self.logger.error(f"Erro ao recuperar lacunas do log: {e}")
+            
+            time.sleep(self.gap_fill_delay / 2)
+    
+    def _fill_gap(self, from_slot, to_slot):
+        """
+        Busca os valores aceitos em [from_slot, to_slot) em cada acceptor (/slots) e
+        os conta como votos: um slot só é aprendido com o mesmo valor em um quórum.
+        
+        Args:
+            from_slot (int): Primeiro slot faltante (applied_index)
+            to_slot (int): Fim (exclusivo) do intervalo buscado
+        """
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        notifications = []
+        low_water_mark = 0
+        
+        for acceptor_id, acceptor in acceptors.items():
+            try:
+                response = requests.get(
+                    self._node_url(acceptor, '/slots'),
+                    params={"from_slot": from_slot, "to_slot": to_slot},
+                    timeout=2.0
+                )
+                if response.status_code == 200:
+                    result = response.json()
+                    notifications.extend(result.get("notifications", []))
+                    low_water_mark = max(low_water_mark, result.get("low_water_mark", 0))
+            except Exception as e:
+                self.logger.debug(f"Erro ao buscar slots no acceptor {acceptor_id}: {e}")
+        
+        if low_water_mark > from_slot:
+            # Slots já descartados pelos acceptors só existem nos snapshots dos outros learners
+            self.logger.warning(f"Slots {from_slot} a {low_water_mark - 1} já foram descartados pelos acceptors, buscando snapshot de um learner")
+            self._bootstrap_from_peer(min_lead=1)
+        
+        with self.lock:
+            applied_before = self.applied_index
+            self.metrics["gap_fills"] += 1
+        
+        self._process_notifications(notifications)
+        
+        with self.lock:
+            recovered = self.applied_index - applied_before
+            self.metrics["gap_slots_recovered"] += recovered
+            # Reiniciar a espera: a próxima busca só ocorre se a lacuna persistir
+            self.gap_since = None
+        
+        self.logger.info(f"Lacuna {from_slot}-{to_slot - 1}: {len(notifications)} valores recebidos dos acceptors, {recovered} slots aplicados")
+    
+    def _snapshot_loop(self):
+        """
+        Thread que tira um snapshot a cada snapshot_every slots aplicados.
+        """
+        while True:
+            try:
+                with self.lock:
+                    latest = next(reversed(self.snapshots.values()), None)
+                    due = self.applied_index - (latest["applied_index"] if latest else 0) >= self.snapshot_every
+                
+                if due:
+                    self._take_snapshot()
+            except Exception as e:
+                self.logger.error(f"Erro ao tirar snapshot: {e}")
+            
+            time.sleep(1)
+    
+    def _take_snapshot(self):
+        """
+        Registra o estado aplicado até o applied_index e o grava em DATA_DIR. Como
+        o log de valores só cresce, o snapshot guarda apenas quantos valores cobre.
+        
+        Returns:
+            dict: Snapshot criado
+        """
+        with self.lock:
+            path = self.value_log.sync_target()
+            snapshot = {
+                "id": f"{self.node_id}-{self.applied_index}",
+                "applied_index": self.applied_index,
+                "value_count": len(self.value_log),
+                "current_leader": self.current_leader,
+                "created_at": time.time()
+            }
+        
+        # O snapshot só pode citar valores já em disco; o fsync é feito fora do lock
+        if path is not None:
+            SegmentLog.sync_path(path)
+        
+        with self.lock:
+            self.snapshots[snapshot["id"]] = snapshot
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+            self.metrics["snapshots_taken"] += 1
+        
+        # Gravação fora do lock: o snapshot não é mais alterado
+        self._save_state(self.snapshot_file, snapshot)
+        self.logger.info(f"Snapshot {snapshot['id']} criado ({snapshot['value_count']} valores, slots abaixo de {snapshot['applied_index']})")
+        return snapshot
+    
+    def _install_snapshot(self, snapshot, staged_log=None):
+        """
+        Substitui o estado aplicado pelo de um snapshot mais avançado. Slots já
+        decididos após o snapshot continuam aguardando e são aplicados em seguida.
+        
+        Args:
+            snapshot (dict): applied_index, value_count e current_leader
+            staged_log (SegmentLog, optional): Log com os valores copiados de outro
+                learner; sem ele, o snapshot é o local e o log atual é cortado em value_count
+        
+        Returns:
+            bool: True se o snapshot foi instalado
+        """
+        # Diretório para onde o log atual é movido ao instalar um log copiado
+        replaced = os.path.join(self.data_dir, 'values-replaced')
+        if staged_log is not None:
+            shutil.rmtree(replaced, ignore_errors=True)
+        
+        with self.lock:
+            applied_index = snapshot["applied_index"]
+            if applied_index <= self.applied_index:
+                return False
+            
+            if staged_log is None:
+                self.value_log.truncate(snapshot["value_count"])
+            else:
+                # Trocar o log pelo copiado, já aberto e sincronizado: sob o lock, apenas
+                # as renomeações dos diretórios; o antigo é removido depois, fora do lock.
+                # Snapshots anteriores citavam o log antigo
+                directory = self.value_log.directory
+                self.value_log.close()
+                os.replace(directory, replaced)
+                staged_log.move(directory)
+                self.value_log = staged_log
+                self.snapshots.clear()
+            
+            self.applied_index = applied_index
+            self.chosen_slots = {slot: decision for slot, decision in self.chosen_slots.items() if slot >= applied_index}
+            self.vote_tracker.discard_below(applied_index)
+            if self.current_leader is None:
+                self.current_leader = snapshot.get("current_leader")
+            
+            self.snapshots[snapshot["id"]] = snapshot
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+            
+            self.metrics["snapshot_installs"] += 1
+            self._advance_applied_index()
+            self.applied_condition.notify_all()
+        
+        if staged_log is not None:
+            shutil.rmtree(replaced, ignore_errors=True)
+        return True
+    
+    def _bootstrap_from_peer(self, min_lead=None):
+        """
+        Copia, em partes, o snapshot mais avançado entre os outros learners, se
+        ele estiver pelo menos min_lead slots à frente deste learner (por padrão,
+        snapshot_every). Os slots seguintes chegam pelo replay dos acceptors.
+        
+        Args:
+            min_lead (int, optional): Vantagem mínima do snapshot, em slots
+        
+        Returns:
+            bool: True se um snapshot foi instalado
+        """
+        min_lead = self.snapshot_every if min_lead is None else min_lead
+        
+        best = None
+        for learner_id, learner in self.gossip.get_nodes_by_role('learner').items():
+            if str(learner_id) == str(self.node_id):
+                continue
+            try:
+                response = requests.get(self._node_url(learner, '/snapshot'), timeout=2.0)
+                if response.status_code == 200:
+                    meta = response.json()
+                    if best is None or meta["applied_index"] > best[1]["applied_index"]:
+                        best = (learner, meta)
+            except Exception as e:
+                self.logger.debug(f"Erro ao consultar snapshot do learner {learner_id}: {e}")
+        
+        with self.lock:
+            applied_index = self.applied_index
+        
+        if best is None or best[1]["applied_index"] - applied_index < min_lead:
+            return False
+        
+        learner, meta = best
+        started = time.time()
+        
+        # Os valores são gravados, parte a parte, em um log separado, que só substitui o
+        # atual quando a cópia termina
+        staged_log = SegmentLog(os.path.join(self.data_dir, 'values-transfer'), self.segment_bytes)
+        staged_log.truncate(0)
+        installed = False
+        try:
+            while len(staged_log) < meta["value_count"]:
+                response = requests.get(
+                    self._node_url(learner, '/snapshot/chunk'),
+                    params={"id": meta["snapshot_id"], "offset": len(staged_log)},
+                    timeout=5.0
+                )
+                if response.status_code != 200:
+                    self.logger.warning(f"Transferência do snapshot {meta['snapshot_id']} interrompida: HTTP {response.status_code}")
+                    return False
+                chunk = response.json()["values"]
+                if not chunk:
+                    break
+                for value in chunk:
+                    staged_log.append(value)
+            staged_log.sync()
+            
+            installed = self._install_snapshot({
+                "id": meta["snapshot_id"],
+                "applied_index": meta["applied_index"],
+                "value_count": len(staged_log),
+                "current_leader": meta.get("current_leader"),
+                "created_at": meta.get("created_at")
+            }, staged_log)
+        finally:
+            if not installed:
+                staged_log.close()
+                shutil.rmtree(staged_log.directory, ignore_errors=True)
+        
+        if not installed:
+            return False
+        
+        # Persistir o snapshot copiado: um reinício não precisa transferi-lo de novo
+        self._save_state(self.snapshot_file, self.snapshots[meta["snapshot_id"]])
+        self.logger.info(f"Snapshot {meta['snapshot_id']} instalado em {time.time() - started:.2f}s ({meta['value_count']} valores, slots abaixo de {meta['applied_index']})")
+        return True
+    
+    def _handle_snapshot(self):
+        """
+        Descreve o snapshot mais recente, cujos valores são obtidos em partes
+        por /snapshot/chunk.
+        
+        Returns:
+            Response: Resposta HTTP com os metadados do snapshot
+        """
+        with self.lock:
+            snapshot = next(reversed(self.snapshots.values()), None)
+        
+        if snapshot is None:
+            return jsonify({"error": "No snapshot available"}), 404
+        
+        return jsonify({
+            "snapshot_id": snapshot["id"],
+            "learner_id": self.node_id,
+            "applied_index": snapshot["applied_index"],
+            "value_count": snapshot["value_count"],
+            "chunk_size": self.snapshot_chunk_size,
+            "current_leader": snapshot.get("current_leader"),
+            "created_at": snapshot.get("created_at")
+        }), 200
+    
+    def _handle_snapshot_chunk(self, snapshot_id, offset):
+        """
+        Retorna até snapshot_chunk_size valores de um snapshot a partir de offset.
+        
+        Args:
+            snapshot_id (str): ID do snapshot (de /snapshot)
+            offset (int): Posição do primeiro valor
+        
+        Returns:
+            Response: Resposta HTTP com os valores
+        """
+        if offset < 0:
+            return jsonify({"error": "Invalid offset"}), 400
+        
+        with self.lock:
+            snapshot = self.snapshots.get(snapshot_id)
+            if snapshot is None:
+                # Substituído por snapshots mais novos: a transferência deve recomeçar
+                return jsonify({"error": "Snapshot no longer available", "snapshot_id": snapshot_id}), 404
+            
+            end = min(offset + self.snapshot_chunk_size, snapshot["value_count"])
+            values = self.value_log.read_json(offset, end)
+            self.metrics["snapshot_chunks_served"] += 1
+        
+        return self._values_response({
+            "snapshot_id": snapshot_id,
+            "offset": offset,
+            "done": end >= snapshot["value_count"]
+        }, values)
+    
+    def _values_response(self, fields, values):
+        """
+        Resposta JSON com os campos informados e os valores em "values", já
+        serializados pelo log (copiados sem decodificar cada valor).
+        
+        Args:
+            fields (dict): Demais campos da resposta (não vazio)
+            values (bytes): Array JSON lido do log de valores
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        body = json.dumps(fields).encode('utf-8')[:-1] + b', "values": ' + values + b"}"
+        return Response(body, status=200, mimetype='application/json')
+    
+    def _handle_learn(self, data):
+        """
+        Processa notificações de valores aceitos enviados pelos acceptors.
+        Suporta tanto notificações individuais quanto em lote.
+        
+        Args:
+            data (dict): Dados da notificação
+                - Um único objeto de notificação ou
+                - Uma lista de notificações em 'notifications'
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        # Verificar se é uma notificação em lote
+        notifications = data.get('notifications')
+        if notifications and isinstance(notifications, list):
+            self.logger.info(f"Recebido lote com {len(notifications)} notificações")
+            self.metrics["batch_notifications_received"] += 1
+            
+            results = self._process_notifications(notifications)
+            
+            return jsonify({
+                "status": "acknowledged",
+                "processed": len(results),
+                "learned": sum(1 for r in results if r.get("learned", False))
+            }), 200
+        else:
+            # Notificação individual
+            self.metrics["single_notifications_received"] += 1
+            result = self._process_single_notification(data)
+            
+            return jsonify({
+                "status": "acknowledged",
+                "learned": result.get("learned", False)
+            }), 200
+    
+    def _process_single_notification(self, data):
+        """
+        Processa uma única notificação de um acceptor.
+        
+        Args:
+            data (dict): Dados da notificação (ver _process_notifications)
+        
+        Returns:
+            dict: Resultado do processamento
+        """
+        return self._process_notifications([data])[0]
+    
+    def _process_notifications(self, notifications):
+        """
+        Processa um lote de notificações de acceptors. Os votos do lote são
+        registrados no rastreador de uma só vez, com uma única aquisição do lock.
+        
+        Args:
+            notifications (list): Notificações, cada uma com
+                - acceptor_id: ID do acceptor
+                - proposal_number: Número da proposta
+                - slot: Slot do log (ausente em eleições)
+                - value: Valor aceito
+                - tid: Transaction ID
+                - seq, epoch: Sequência e época do acceptor (notificações ao vivo do stream)
+                - is_leader_election: Se é eleição de líder
+                - client_id: ID do cliente (opcional)
+        
+        Returns:
+            list: Resultado do processamento de cada notificação, na mesma ordem
+        """
+        results = [None] * len(notifications)
+        accepted = []  # [(posição, notificação, instância, valor para contagem)]
+        
+        for position, data in enumerate(notifications):
+            acceptor_id = data.get('acceptor_id')
+            proposal_number = data.get('proposal_number')
+            value = data.get('value')
+            tid = data.get('tid')
+            
+            if not all([acceptor_id, proposal_number, value, tid]):
+                self.logger.warning(f"Notificação incompleta recebida: {data}")
+                results[position] = {"learned": False, "error": "Missing required information"}
+                continue
+            
+            # Valores do log são decididos por (slot, número de proposta);
+            # eleições, apenas pelo número de proposta
+            slot = data.get('slot')
+            instance = slot if slot is not None else ("election", proposal_number)
+            
+            # Valores que não são strings (lotes) são contados pela sua forma serializada,
+            # que é hashable e igual para o mesmo valor vindo de acceptors diferentes
+            vote_key = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+            accepted.append((position, data, instance, vote_key))
+        
+        if not accepted:
+            return results
+        
+        with self.lock:
+            # Descartar notificações já vistas (pela seq do acceptor). Notificações
+            # sem seq (replay, /learn) não passam pela janela: votos repetidos não
+            # contam de novo no rastreador
+            fresh = []
+            for position, data, instance, vote_key in accepted:
+                seq = data.get('seq')
+                if seq is not None and self.sequence_window.is_duplicate(data['acceptor_id'], data.get('epoch'), seq):
+                    self.logger.debug(f"Notificação {seq} do acceptor {data['acceptor_id']} já processada, ignorando")
+                    results[position] = {"learned": False, "already_processed": True}
+                else:
+                    fresh.append((position, data, instance, vote_key))
+            accepted = fresh
+            
+            # Obter contagem total de acceptors
+            acceptors = self.gossip.get_nodes_by_role('acceptor')
+            acceptor_count = len(acceptors)
+            
+            # Calcular tamanho do quórum de fase 2 (maioria ou Flexible Paxos)
+            quorum_size = self.quorum.phase2_size(acceptor_count)
+            
+            # Votos de instâncias já decididas não são mais rastreados
+            votes = [
+                (instance, data['proposal_number'], vote_key, data['acceptor_id'])
+                for _, data, instance, vote_key in accepted
+                if not self._is_learned(instance)
+            ]
+            counts = self.vote_tracker.record_batch(votes)
+            
+            for position, data, instance, vote_key in accepted:
+                results[position] = self._learn_if_chosen(data, instance, counts.get((instance, data['proposal_number'], vote_key)), quorum_size)
+        
+        return results
+    
+    def _is_learned(self, instance):
+        """
+        Verifica se uma instância (slot ou ("election", número)) já foi aprendida.
+        Deve ser chamado com self.lock adquirido.
+        """
+        if isinstance(instance, tuple):
+            return instance[1] in self.learned_proposal_numbers
+        return instance < self.applied_index or instance in self.chosen_slots
+    
+    def _learn_if_chosen(self, data, instance, value_count, quorum_size):
+        """
+        Aprende o valor de uma notificação se sua instância atingiu quórum.
+        Deve ser chamado com self.lock adquirido.
+        
+        Args:
+            data (dict): Notificação do acceptor
+            instance: Slot ou ("election", número de proposta)
+            value_count (int): Acceptors que votaram no valor (None se a instância já estava decidida)
+            quorum_size (int): Tamanho do quórum de fase 2
+        
+        Returns:
+            dict: Resultado do processamento
+        """
+        acceptor_id = data['acceptor_id']
+        proposal_number = data['proposal_number']
+        slot = data.get('slot')
+        value = data['value']
+        is_leader_election = data.get('is_leader_election', False)
+        client_id = data.get('client_id')
+        
+        already_learned = self._is_learned(instance)
+        has_quorum = value_count is not None and value_count >= quorum_size
+        
+        if value_count is not None:
+            self.logger.info(f"Acceptor {acceptor_id} enviou valor: {value} para proposta {proposal_number} (slot {slot}). Contagem: {value_count}/{quorum_size}")
+        
+        if has_quorum and not already_learned:
+            # Marcar proposta como aprendida e descartar os votos da instância
+            self.vote_tracker.discard(instance)
+            
+            if slot is not None:
+                # Valores do log são aplicados em ordem de slot: um slot decidido antes
+                # dos anteriores aguarda em chosen_slots
+                self.chosen_slots[slot] = {
+                    "value": value,
+                    "client_id": client_id,
+                    "proposal_number": proposal_number,
+                    "value_count": value_count,
+                    "quorum_size": quorum_size,
+                    "notify_client": not data.get("replay", False)
+                }
+                if slot > self.applied_index:
+                    self.metrics["out_of_order_slots"] += 1
+                self._advance_applied_index()
+            
+            elif is_leader_election and value.startswith("leader:"):
+                # Eleições não ocupam slots: aplicadas ao serem decididas
+                self.learned_proposal_numbers.add(proposal_number)
+                leader_id = int(value.split(":")[1])
+                self.current_leader = leader_id
+                self.gossip.set_leader(leader_id)
+                self.logger.info(f"Líder atualizado para {leader_id}")
+                
+                # Adicionar aos valores aprendidos
+                value_type = "leader_election"
+                self.metrics["values_by_type"][value_type] += 1
+                
+                learned_entry = {
+                    "proposal_number": proposal_number,
+                    "slot": slot,
+                    "value": value,
+                    "timestamp": time.time(),
+                    "type": value_type,
+                    "acceptor_count": value_count,
+                    "quorum_size": quorum_size
+                }
+                self.learned_values.append(learned_entry)
+            
+            else:
+                self.learned_proposal_numbers.add(proposal_number)
+            
+            return {"learned": True, "value": value, "proposal_number": proposal_number, "slot": slot}
+        else:
+            # Ainda não atingiu quórum ou já foi aprendido
+            if already_learned:
+                self.logger.debug(f"Proposta {proposal_number} (slot {slot}) já aprendida anteriormente")
+                
+            return {"learned": False, "already_learned": already_learned}
+    
+    def _apply_value(self, value, client_id, proposal_number, slot, value_count, quorum_size, notify_client=True):
+        """
+        Aplica um valor decidido aos dados compartilhados e notifica o cliente.
+        Deve ser chamado com self.lock adquirido.
+        
+        Args:
+            value (str): Valor aprendido
+            client_id (int): ID do cliente (opcional)
+            proposal_number (int): Número da proposta
+            slot (int): Slot do log em que o valor foi decidido
+            value_count (int): Número de acceptors que aceitaram
+            quorum_size (int): Tamanho do quórum
+            notify_client (bool): False para valores recuperados (replay ou /slots)
+        """
+        self.value_log.append(value)
+        
+        # Adicionar aos valores aprendidos
+        value_type = "normal"
+        self.metrics["values_by_type"][value_type] += 1
+        
+        learned_entry = {
+            "proposal_number": proposal_number,
+            "slot": slot,
+            "value": value,
+            "timestamp": time.time(),
+            "type": value_type,
+            "acceptor_count": value_count,
+            "quorum_size": quorum_size
+        }
+        self.learned_values.append(learned_entry)
+        
+        # Limitar o tamanho da lista de valores aprendidos
+        if len(self.learned_values) > 1000:
+            self.learned_values = self.learned_values[-1000:]
+        
+        # Atualizar contagem total
+        self.metrics["total_learned"] += 1
+        
+        # Atualizar metadata no gossip
+        self.gossip.update_local_metadata({
+            "last_learned_proposal": proposal_number,
+            "last_learned_slot": slot,
+            "last_learned_value": value,
+            "learned_values_count": len(self.learned_values)
+        })
+        
+        self.logger.info(f"Aprendido valor: {value} da proposta {proposal_number} no slot {slot} (quórum: {value_count}/{quorum_size})")
+        
+        # Notificar cliente se especificado
+        if client_id and notify_client:
+            self.client_notifier.submit(self._notify_client, client_id, value, proposal_number, slot)
+        elif client_id:
+            self.metrics["client_notifications_skipped"] += 1
+    
+    def _advance_applied_index(self):
+        """
+        Aplica, em ordem, os slots decididos a partir do applied_index e acorda
+        leituras lineares. Deve ser chamado com self.lock adquirido.
+        """
+        advanced = False
+        while self.applied_index in self.chosen_slots:
+            # Um valor malformado não pode travar o log: o slot é registrado como falho e
+            # o índice avança (todos os learners recebem o mesmo valor e fazem o mesmo)
+            try:
+                self._apply_slot(self.applied_index, self.chosen_slots[self.applied_index])
+            except Exception as e:
+                self.metrics["failed_slots"] += 1
+                self.logger.error(f"Erro ao aplicar o slot {self.applied_index}, ignorando-o: {e}")
+            del self.chosen_slots[self.applied_index]
+            self.applied_index += 1
+            advanced = True
+        
+        if advanced:
+            self.value_log.flush()
+            if self.applied_index not in self.chosen_slots:
+                self.gap_since = None
+            self.applied_condition.notify_all()
+    
+    def _apply_slot(self, slot, decision):
+        """
+        Aplica o valor decidido de um slot do log.
+        Deve ser chamado com self.lock adquirido.
+        
+        Args:
+            slot (int): Slot do log (igual ao applied_index)
+            decision (dict): Valor, cliente, número de proposta e contagem de votos
+        """
+        value = decision["value"]
+        proposal_number = decision["proposal_number"]
+        value_count = decision["value_count"]
+        quorum_size = decision["quorum_size"]
+        notify_client = decision.get("notify_client", True)
+        
+        if isinstance(value, str) and value.startswith("noop:"):
+            # Lacuna preenchida pelo novo líder: ocupa o slot sem valor de cliente
+            self.metrics["values_by_type"]["noop"] += 1
+            self.logger.info(f"Slot {slot} preenchido com no-op (proposta {proposal_number})")
+        
+        elif isinstance(value, dict):
+            # Valor em lote ({"batch": [...]}): cada item é entregue individualmente, com seu próprio cliente
+            for item in value["batch"]:
+                self._apply_value(item.get("value"), item.get("client_id"), proposal_number, slot, value_count, quorum_size, notify_client)
+        
+        else:
+            # Valor normal, adicionar aos dados compartilhados
+            self._apply_value(value, decision["client_id"], proposal_number, slot, value_count, quorum_size, notify_client)
+    
+    def _handle_get_values(self):
+        """
+        Responde a solicitações para obter valores aprendidos.
+        Com consistency=linearizable, obtém o read_index do líder e aguarda
+        ter aplicado todos os slots abaixo dele antes de responder; com read_index,
+        usa o índice informado (obtido do líder sob lease pelo cliente).
+        
+        Leitura incremental: com cursor (ou since), retorna até page_size valores a
+        partir dessa posição do log e o next_cursor da próxima leitura. Como todos
+        os learners aplicam os valores na mesma ordem, um cursor vale em qualquer
+        learner. Sem cursor, limit retorna os últimos valores (até max_page_size);
+        sem nenhum dos dois, a primeira página. Todo o histórico, apenas com all=true.
+        
+        Returns:
+            Response: Resposta HTTP com os valores
+        """
+        read_all = request.args.get('all', '').lower() == 'true'
+        limit = min(request.args.get('limit', default=0, type=int), self.max_page_size)
+        cursor = request.args.get('cursor', type=int)
+        if cursor is None:
+            cursor = request.args.get('since', type=int)
+        if cursor is None and limit <= 0 and not read_all:
+            cursor = 0
+        page_size = min(request.args.get('page_size', default=self.max_page_size, type=int), self.max_page_size)
+        read_index = request.args.get('read_index', type=int)
+        linearizable = request.args.get('consistency') == 'linearizable' or read_index is not None
+        
+        if cursor is not None and (cursor < 0 or page_size <= 0):
+            return jsonify({"error": "cursor must be >= 0 and page_size > 0"}), 400
+        
+        if linearizable and read_index is None:
+            read_index, error = self._fetch_read_index()
+            if read_index is None:
+                return jsonify({"error": error, "retry_suggested": True}), 503
+        
+        with self.lock:
+            if linearizable:
+                # Slots abaixo do read_index estão decididos: se faltarem, são uma lacuna
+                self.catch_up_to = max(self.catch_up_to, read_index)
+                applied = self.applied_condition.wait_for(
+                    lambda: self.applied_index >= read_index, timeout=self.read_index_timeout
+                )
+                if not applied:
+                    self.metrics["read_index_timeouts"] += 1
+                    return jsonify({
+                        "error": "Learner did not reach read index before deadline",
+                        "read_index": read_index,
+                        "applied_index": self.applied_index
+                    }), 504
+                self.metrics["linearizable_reads"] += 1
+            
+            # Valores copiados do log mapeado, sem decodificação: a leitura de uma
+            # página custa O(page_size), independente do tamanho do histórico
+            total_count = len(self.value_log)
+            if cursor is not None:
+                start = cursor
+                end = min(total_count, cursor + page_size)
+                self.metrics["cursor_reads"] += 1
+            else:
+                start = max(0, total_count - limit) if limit > 0 else 0
+                end = total_count
+            values = self.value_log.read_json(start, end)
+            returned_count = max(0, end - start)
+            
+            response = {
+                "total_count": total_count,
+                "returned_count": returned_count
+            }
+            if cursor is not None:
+                response.update({
+                    "cursor": cursor,
+                    "next_cursor": cursor + returned_count,
+                    "has_more": cursor + returned_count < total_count
+                })
+            if linearizable:
+                response.update({
+                    "consistency": "linearizable",
+                    "read_index": read_index,
+                    "applied_index": self.applied_index
+                })
+            
+            return self._values_response(response, values)
+    
+    def _fetch_read_index(self):
+        """
+        Solicita ao líder o índice de leitura (protocolo read-index).
+        
+        Returns:
+            tuple: (read_index, erro) - read_index é None em caso de falha
+        """
+        leader_id = self.gossip.get_leader()
+        
+        for attempt in range(2):
+            if leader_id is None:
+                return None, "Leader not available"
+            
+            leader = self.gossip.get_node_info(str(leader_id))
+            if not leader:
+                return None, "Leader not available"
+            
+            try:
+                leader_url = self._node_url(leader, '/read-index')
+                response = requests.get(leader_url, timeout=4)
+                result = response.json()
+            except Exception as e:
+                self.logger.error(f"Erro ao obter read-index do líder {leader_id}: {e}")
+                return None, "Leader unreachable"
+            
+            if response.status_code == 200:
+                return result["read_index"], None
+            
+            # O líder mudou: tentar uma vez o líder indicado
+            if response.status_code == 409 and result.get("current_leader") not in (None, leader_id):
+                leader_id = result["current_leader"]
+                continue
+            
+            return None, result.get("error", "Read index not available")
+        
+        return None, "Leader not available"
+    
+    def _handle_status(self):
+        """
+        Retorna o status atual do learner.
+        
+        Returns:
+            Response: Resposta HTTP com informações de status
+        """
+        clients = self.gossip.get_nodes_by_role('client')
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        
+        with self.lock:
+            # Preparar metrics para serialização JSON
+            json_metrics = dict(self.metrics)
+            json_metrics["values_by_type"] = dict(json_metrics["values_by_type"])
+            
+            recent_values = self.learned_values[-10:] if self.learned_values else []
+            
+            return jsonify({
+                "id": self.node_id,
+                "role": self.node_role,
+                "current_leader": self.current_leader,
+                "learned_values_count": len(self.learned_values),
+                "recent_learned_values": recent_values,
+                "shared_data_count": len(self.value_log),
+                "applied_index": self.applied_index,
+                "persisted_index": self.persisted_index,
+                "buffered_slots": len(self.chosen_slots),
+                "snapshot_index": next(reversed(self.snapshots.values()))["applied_index"] if self.snapshots else None,
+                "recent_shared_data": self.value_log.read(len(self.value_log) - 10, len(self.value_log)),
+                "value_log": self.value_log.summary(),
+                "clients_count": len(clients),
+                "acceptors_count": len(acceptors),
+                "quorum": self.quorum.describe(len(acceptors)),
+                "votes": self.vote_tracker.summary(),
+                "dedup": self.sequence_window.summary(),
+                "known_nodes_count": len(self.gossip.get_all_nodes()),
+                "metrics": json_metrics
+            }), 200
+    
+    def _notify_client(self, client_id, value, proposal_number, slot=None):
+        """
+        Notifica um cliente sobre um valor aprendido.
+        
+        Args:
+            client_id (int): ID do cliente
+            value (str): Valor aprendido
+            proposal_number (int): Número da proposta
+            slot (int, optional): Slot do log em que o valor foi decidido
+        """
+        self.logger.info(f"Notificando cliente {client_id} sobre valor: {value}")
+        
+        # Obter clientes via gossip
+        clients = self.gossip.get_nodes_by_role('client')
+        
+        # Encontrar o cliente específico
+        client = None
+        for cid, c in clients.items():
+            if str(c['id']) == str(client_id):
+                client = c
+                break
+        
+        if client:
+            # Implementar retry com backoff exponencial
+            max_retries = 3
+            base_timeout = 1.0
+            
+            for retry in range(max_retries):
+                try:
+                    # Timeout adaptativo com jitter para evitar sincronização
+                    timeout = base_timeout * (2 ** retry) + random.uniform(0, 0.3)
+                    
+                    client_url = self._node_url(client, '/notify')
+                    notification_data = {
+                        "learner_id": self.node_id,
+                        "proposal_number": proposal_number,
+                        "slot": slot,
+                        "value": value,
+                        "learned_at": time.strftime("%Y-%m-%d %H:%M:%S")
+                    }
+                    
+                    response = requests.post(client_url, json=notification_data, timeout=timeout)
+                    
+                    if response.status_code == 200:
+                        self.logger.info(f"Cliente {client_id} notificado com sucesso sobre valor: {value}")
+                        self.metrics["client_notifications"] += 1
+                        break  # Sucesso, sair do loop
+                    else:
+                        self.logger.warning(f"Erro ao notificar cliente {client_id}: {response.status_code} - {response.text}")
+                except Exception as e:
+                    self.logger.error(f"Erro ao notificar cliente {client_id} (tentativa {retry+1}/{max_retries}): {e}")
+                    
+                    # Se não for a última tentativa, aguardar antes de tentar novamente
+                    if retry < max_retries - 1:
+                        time.sleep(base_timeout * (2 ** retry) * 0.5)
+        else:
+            self.logger.warning(f"Cliente {client_id} não encontrado para notificação")
+    
+    def _handle_view_logs(self):
+        """
+        Manipulador para a rota view-logs (para debugging).
+        """
+        clients = self.gossip.get_nodes_by_role('client')
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        
+        with self.lock:
+            # Preparar metrics para serialização JSON
+            json_metrics = dict(self.metrics)
+            json_metrics["values_by_type"] = dict(json_metrics["values_by_type"])
+            
+            return jsonify({
+                "id": self.node_id,
+                "role": self.node_role,
+                "learned_values_count": len(self.learned_values),
+                "recent_learned_values": self.learned_values[-10:] if self.learned_values else [],
+                "shared_data": self.value_log.read(len(self.value_log) - 20, len(self.value_log)),
+                "clients_count": len(clients),
+                "acceptors_count": len(acceptors),
+                "known_nodes_count": len(self.gossip.get_all_nodes()),
+                "current_leader": self.gossip.get_leader(),
+                "metrics": json_metrics
+            }), 200
+
+# Para uso como aplicação independente
+if __name__ == '__main__':
+    learner = Learner()
     learner.start()
\ No newline at end of file
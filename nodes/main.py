@@ -1,49 +1,68 @@
-#!/usr/bin/env python3
-import os
-import sys
-import logging
-
-# Importar classes de nó
-from proposer_node import Proposer
-from acceptor_node import Acceptor
-from learner_node import Learner
-from client_node import Client
-
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger('[Main]')
-
-def main():
-    """
-    Ponto de entrada principal que inicializa o tipo correto de nó
-    com base na variável de ambiente NODE_ROLE.
-    """
-    # Determinar o tipo de nó a partir da variável de ambiente
-    node_role = os.environ.get('NODE_ROLE', '').lower()
-    
-    # Criar a instância apropriada do nó
-    if node_role == 'proposer':
-        logger.info("Iniciando nó Proposer")
-        node = Proposer()
-    elif node_role == 'acceptor':
-        logger.info("Iniciando nó Acceptor")
-        node = Acceptor()
-    elif node_role == 'learner':
-        logger.info("Iniciando nó Learner")
-        node = Learner()
-    elif node_role == 'client':
-        logger.info("Iniciando nó Client")
-        node = Client()
-    else:
-        logger.error(f"Tipo de nó desconhecido: {node_role}")
-        logger.error("Use NODE_ROLE=proposer|acceptor|learner|client")
-        sys.exit(1)
-    
-    # Iniciar o nó
-    node.start()
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+import os
+import sys
+import logging
+
+# Importar classes de nó
+from proposer_node import Proposer
+from acceptor_node import Acceptor
+from learner_node import Learner
+from client_node import Client
+from quorum import QuorumPolicy
+from groups import GroupHost
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('[Main]')
+
+def main():
+    """
+    Ponto de entrada principal que inicializa o tipo correto de nó
+    com base na variável de ambiente NODE_ROLE.
+    """
+    # Determinar o tipo de nó a partir da variável de ambiente
+    node_role = os.environ.get('NODE_ROLE', '').lower()
+    
+    # Rejeitar configurações de quórum sem interseção entre as fases (Q1 + Q2 > N)
+    try:
+        QuorumPolicy.from_env()
+    except ValueError as e:
+        logger.error(f"Configuração de quórum inválida: {e}")
+        sys.exit(1)
+    
+    # Número de grupos Paxos independentes hospedados neste processo
+    groups = int(os.environ.get('PAXOS_GROUPS', 1))
+    if groups < 1:
+        logger.error(f"PAXOS_GROUPS deve ser positivo: {groups}")
+        sys.exit(1)
+    
+    # Determinar a classe apropriada do nó
+    if node_role == 'proposer':
+        logger.info("Iniciando nó Proposer")
+        node_class = Proposer
+    elif node_role == 'acceptor':
+        logger.info("Iniciando nó Acceptor")
+        node_class = Acceptor
+    elif node_role == 'learner':
+        logger.info("Iniciando nó Learner")
+        node_class = Learner
+    elif node_role == 'client':
+        logger.info("Iniciando nó Client")
+        node_class = Client
+    else:
+        logger.error(f"Tipo de nó desconhecido: {node_role}")
+        logger.error("Use NODE_ROLE=proposer|acceptor|learner|client")
+        sys.exit(1)
+    
+    # Iniciar o nó (ou um nó por grupo, com as rotas de cada grupo sob /g/<id>)
+    if groups > 1:
+        logger.info(f"Hospedando {groups} grupos Paxos")
+        GroupHost(node_class, groups).start()
+    else:
+        node_class().start()
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
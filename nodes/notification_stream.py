@@ -0,0 +1,193 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+class NotificationStream:
+    """
+    Fila de notificações de um learner conectado ao acceptor por uma resposta
+    HTTP de longa duração (NDJSON). O handler do stream consome a fila em lotes.
+    
+    O tamanho dos lotes se adapta à carga: com o canal ocioso, uma notificação
+    é enviada assim que chega; com notificações chegando em sequência (o lote
+    anterior acabou de sair), o consumidor aguarda até max_linger para agrupar
+    mais notificações em uma única escrita.
+    """
+    
+    def __init__(self, learner_id, max_batch=256, max_linger=0.005, max_queue=100000):
+        """
+        Inicializa o stream.
+        
+        Args:
+            learner_id (str): ID do learner conectado
+            max_batch (int): Máximo de notificações por escrita
+            max_linger (float): Espera máxima, em segundos, para agrupar sob carga
+            max_queue (int): Notificações pendentes toleradas antes de desconectar o learner
+        """
+        self.learner_id = learner_id
+        self.max_batch = max_batch
+        self.max_linger = max_linger
+        self.max_queue = max_queue
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.connected_at = time.time()
+        self.last_flush = 0
+        self.stats = {"batches": 0, "notifications": 0, "max_batch": 0}
+    
+    def publish(self, notifications):
+        """
+        Enfileira notificações para o learner.
+        
+        Returns:
+            bool: False se o stream foi encerrado (fechado ou learner lento demais)
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            if len(self.items) + len(notifications) > self.max_queue:
+                # Learner não acompanha: encerrar o stream em vez de crescer sem limite
+                self.closed = True
+                self.condition.notify_all()
+                return False
+            self.items.extend(notifications)
+            self.condition.notify_all()
+            return True
+    
+    def close(self):
+        """
+        Encerra o stream; o consumidor retorna na próxima espera.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+    
+    def next_batch(self, timeout):
+        """
+        Retira o próximo lote de notificações.
+        
+        Args:
+            timeout (float): Espera máxima por uma notificação, em segundos
+        
+        Returns:
+            list: Notificações (vazia se o timeout expirou ou o stream foi encerrado)
+        """
+        deadline = time.time() + timeout
+        
+        with self.condition:
+            while not self.items and not self.closed:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return []
+                self.condition.wait(remaining)
+            
+            if self.closed:
+                return []
+            
+            # Sob carga (lote anterior enviado há pouco), aguardar mais notificações
+            now = time.time()
+            if now - self.last_flush < 2 * self.max_linger:
+                linger_deadline = now + self.max_linger
+                while len(self.items) < self.max_batch and not self.closed:
+                    remaining = linger_deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+            
+            count = min(len(self.items), self.max_batch)
+            batch = [self.items.popleft() for _ in range(count)]
+            
+            self.last_flush = time.time()
+            self.stats["batches"] += 1
+            self.stats["notifications"] += count
+            self.stats["max_batch"] = max(self.stats["max_batch"], count)
+            return batch
+    
+    def summary(self):
+        """
+        Resume o stream para o endpoint de status.
+        """
+        with self.condition:
+            return {
+                "connected_for": time.time() - self.connected_at,
+                "pending": len(self.items),
+                "avg_batch": self.stats["notifications"] / self.stats["batches"] if self.stats["batches"] else 0.0,
+                **self.stats
+            }
+
+class StreamHub:
+    """
+    Streams ativos de um acceptor, um por learner.
+    
+    Cada notificação publicada recebe um número de sequência crescente (seq) e a
+    época desta execução do acceptor (epoch), que muda a cada reinício. Como a
+    numeração e a entrega acontecem sob o mesmo lock, cada stream recebe as
+    notificações ao vivo em ordem de seq, e o learner pode descartar repetições
+    comparando-as com a maior seq já vista.
+    """
+    
+    def __init__(self, max_batch=256, max_linger=0.005):
+        """
+        Inicializa o conjunto de streams.
+        
+        Args:
+            max_batch (int): Máximo de notificações por escrita em cada stream
+            max_linger (float): Espera máxima, em segundos, para agrupar sob carga
+        """
+        self.max_batch = max_batch
+        self.max_linger = max_linger
+        self.streams = {}  # {learner_id: NotificationStream}
+        self.lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:12]
+        self.next_seq = 0
+    
+    def subscribe(self, learner_id):
+        """
+        Abre o stream de um learner, encerrando uma conexão anterior do mesmo learner.
+        
+        Returns:
+            NotificationStream: Stream aberto
+        """
+        stream = NotificationStream(learner_id, self.max_batch, self.max_linger)
+        with self.lock:
+            previous = self.streams.get(learner_id)
+            self.streams[learner_id] = stream
+        if previous is not None:
+            previous.close()
+        return stream
+    
+    def unsubscribe(self, stream):
+        """
+        Remove um stream encerrado (se ainda for o atual do learner).
+        """
+        stream.close()
+        with self.lock:
+            if self.streams.get(stream.learner_id) is stream:
+                del self.streams[stream.learner_id]
+    
+    def publish(self, notifications):
+        """
+        Numera as notificações e as entrega a todos os streams ativos.
+        """
+        with self.lock:
+            for notification in notifications:
+                notification["epoch"] = self.epoch
+                notification["seq"] = self.next_seq
+                self.next_seq += 1
+            for stream in self.streams.values():
+                stream.publish(notifications)
+    
+    def active_ids(self):
+        """
+        Retorna os IDs dos learners com stream aberto.
+        """
+        with self.lock:
+            return {learner_id for learner_id, stream in self.streams.items() if not stream.closed}
+    
+    def summary(self):
+        """
+        Resume os streams ativos para o endpoint de status.
+        """
+        with self.lock:
+            streams = dict(self.streams)
+        return {learner_id: stream.summary() for learner_id, stream in streams.items()}
@@ -0,0 +1,159 @@
+import time
+import threading
+from collections import deque
+
+class ProposalQueue:
+    """
+    Fila limitada de propostas pendentes do líder.
+    
+    O consumidor bloqueia numa variável de condição e é acordado assim que
+    chega uma proposta ou assim que o líder libera espaço na janela de
+    pipelining (notify), sem polling. Retiradas são O(1) (deque).
+    
+    A cada retirada, last_wait registra quanto o lote esperou por espaço (ready()
+    falso) e quanto aguardou por mais propostas depois disso (linger), lidos pelo
+    único consumidor logo após take().
+    """
+    
+    def __init__(self, capacity, sizeof=None):
+        """
+        Inicializa a fila.
+        
+        Args:
+            capacity (int): Número máximo de propostas na fila
+            sizeof (callable, optional): Função que retorna o tamanho em bytes de um item
+        """
+        self.capacity = capacity
+        self.sizeof = sizeof or (lambda item: 0)
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.ready_since = None       # Desde quando a proposta da frente pode ser consumida
+        self.last_wait = (0.0, 0.0)   # (espera por ready(), linger) do último lote retirado
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def put(self, item):
+        """
+        Adiciona uma proposta ao final da fila, sem bloquear.
+        
+        Args:
+            item (dict): Proposta com pelo menos a chave 'timestamp'
+        
+        Returns:
+            int: Posição na fila, ou None se a fila está cheia
+        """
+        with self.condition:
+            if len(self.items) >= self.capacity:
+                return None
+            self.items.append(item)
+            self.condition.notify()
+            return len(self.items)
+    
+    def put_front(self, items):
+        """
+        Devolve propostas à frente da fila (ex.: falha ao iniciar a instância),
+        preservando a ordem e ignorando a capacidade.
+        
+        Args:
+            items (list): Propostas a devolver
+        """
+        with self.condition:
+            self.items.extendleft(reversed(items))
+            self.condition.notify()
+    
+    def drain(self, predicate):
+        """
+        Remove da fila as propostas para as quais predicate é verdadeiro,
+        preservando a ordem das demais.
+        
+        Args:
+            predicate (callable): Função que recebe a proposta
+        
+        Returns:
+            list: Propostas removidas, na ordem da fila
+        """
+        with self.condition:
+            removed = [item for item in self.items if predicate(item)]
+            if removed:
+                self.items = deque(item for item in self.items if not predicate(item))
+                self.ready_since = None
+            return removed
+    
+    def notify(self):
+        """
+        Acorda o consumidor para reavaliar a fila (ex.: um slot da janela foi liberado).
+        """
+        with self.condition:
+            self.condition.notify_all()
+    
+    def take(self, ready, max_items=1, max_bytes=None, linger=0.0, timeout=None):
+        """
+        Retira o próximo lote de propostas, bloqueando até que haja propostas
+        e ready() seja verdadeiro.
+        
+        Args:
+            ready (callable): Condição externa para consumir (ex.: janela com espaço)
+            max_items (int): Máximo de propostas no lote
+            max_bytes (int, optional): Máximo de bytes no lote
+            linger (float): Tempo máximo, a partir da proposta mais antiga,
+                            que um lote incompleto aguarda por mais propostas
+            timeout (float, optional): Tempo máximo de espera em segundos
+        
+        Returns:
+            list: Propostas retiradas (vazia se o timeout expirou)
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        
+        with self.condition:
+            while True:
+                if self.items and ready():
+                    now = time.time()
+                    if self.ready_since is None:
+                        self.ready_since = now
+                    
+                    batch_size, batch_bytes = self._batch_size(max_items, max_bytes)
+                    batch_full = batch_size >= max_items or batch_size < len(self.items)
+                    oldest = self.items[0]['timestamp']
+                    wait_linger = oldest + linger - now
+                    
+                    if batch_full or wait_linger <= 0:
+                        # O linger conta só a partir do momento em que o lote poderia ter saído
+                        ready_at = max(oldest, self.ready_since)
+                        self.last_wait = (ready_at - oldest, now - ready_at)
+                        self.ready_since = None
+                        return [self.items.popleft() for _ in range(batch_size)]
+                    
+                    # Lote incompleto: aguardar mais propostas até o fim do linger
+                    wait = wait_linger
+                else:
+                    self.ready_since = None
+                    wait = None
+                
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return []
+                    wait = remaining if wait is None else min(wait, remaining)
+                
+                self.condition.wait(wait)
+    
+    def _batch_size(self, max_items, max_bytes):
+        """
+        Calcula quantas propostas do início da fila cabem no lote.
+        Deve ser chamado com a condição adquirida.
+        
+        Returns:
+            tuple: (número de propostas, bytes do lote)
+        """
+        count = 0
+        total_bytes = 0
+        
+        for item in self.items:
+            item_bytes = self.sizeof(item)
+            if count and (count >= max_items or (max_bytes is not None and total_bytes + item_bytes > max_bytes)):
+                break
+            count += 1
+            total_bytes += item_bytes
+        
+        return count, total_bytes
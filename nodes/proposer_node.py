@@ -1,784 +1,1765 @@
-import json
-import time
-import threading
-import logging
-import random
-import requests
-from flask import request, jsonify
-from enum import Enum
-
-from base_node import BaseNode
-
-class ProposerState(Enum):
-    """Estados possíveis para um Proposer no sistema Paxos"""
-    FOLLOWER = "follower"  # Nó seguidor (não-líder)
-    CANDIDATE = "candidate"  # Em processo de eleição
-    LEADER = "leader"  # Líder atual
-
-class Proposer(BaseNode):
-    """
-    Implementação do nó Proposer no algoritmo Paxos.
-    Responsável por propor valores e coordenar o consenso.
-    """
-    
-    def __init__(self, app=None):
-        """
-        Inicializa o nó Proposer.
-        """
-        super().__init__(app)
-        
-        # Estado do proposer
-        self.state = ProposerState.FOLLOWER
-        self.current_leader = None
-        
-        # Contador para geração de números de proposta
-        self.proposal_counter = 0
-        
-        # Controle de eleição
-        self.election_in_progress = False
-        self.election_start_time = 0
-        self.election_timeout = 5  # segundos
-        
-        # Controle de heartbeat
-        self.heartbeat_interval = 1.0  # segundos
-        self.last_heartbeat_received = 0
-        self.leader_timeout = 5.0  # segundos para considerar o líder como falho
-        
-        # Backoff para evitar tempestade de eleições
-        self.backoff_time = 0  # tempo até a próxima tentativa de eleição
-        self.max_backoff = 10  # backoff máximo em segundos
-        self.base_backoff = 1  # backoff base em segundos
-        
-        # Controle de proposta atual
-        self.current_proposal_number = 0
-        self.proposed_value = None
-        self.proposal_accepted_count = 0
-        self.waiting_for_acceptor_response = False
-        
-        # Fila de propostas pendentes
-        self.pending_proposals = []
-        
-        # Controle de inicialização
-        self.bootstrap_completed = False
-        self.bootstrap_delay = 5 * (1 + 0.5 * self.node_id)  # Atraso proporcional ao ID
-        
-        # Histórico para monitoramento
-        self.proposal_history = []  # Últimas propostas
-        self.leader_history = []    # Histórico de líderes
-        self.metrics = {
-            "election_count": 0,
-            "proposal_count": 0,
-            "accept_count": 0,
-            "reject_count": 0,
-            "heartbeat_sent": 0,
-            "heartbeat_received": 0
-        }
-        
-        self.logger.info(f"Proposer inicializado com ID {self.node_id}")
-    
-    def _get_default_port(self):
-        """Retorna a porta padrão para proposers"""
-        return 3000
-    
-    def _register_routes(self):
-        """Registra as rotas específicas do proposer"""
-        @self.app.route('/propose', methods=['POST'])
-        def propose():
-            """Receber proposta de um cliente"""
-            return self._handle_propose(request.json)
-        
-        @self.app.route('/heartbeat', methods=['POST'])
-        def heartbeat():
-            """Receber heartbeat do líder"""
-            return self._handle_heartbeat(request.json)
-        
-        @self.app.route('/status', methods=['GET'])
-        def status():
-            """Retorna o status atual do proposer"""
-            return self._handle_status()
-    
-    def _start_threads(self):
-        """Inicia as threads do proposer"""
-        # Thread para monitorar o líder e iniciar eleições
-        threading.Thread(target=self._leader_monitor_loop, daemon=True).start()
-        
-        # Thread para enviar heartbeats quando for líder
-        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
-        
-        # Thread para processar propostas pendentes
-        threading.Thread(target=self._proposal_processor_loop, daemon=True).start()
-        
-        # Thread para bootstrap inicial
-        threading.Thread(target=self._bootstrap, daemon=True).start()
-    
-    def _bootstrap(self):
-        """
-        Realiza o bootstrap inicial do proposer, aguardando um tempo proporcional
-        ao ID antes de tentar iniciar uma eleição se nenhum líder for detectado.
-        """
-        self.logger.info(f"Iniciando bootstrap com delay de {self.bootstrap_delay:.1f}s")
-        time.sleep(self.bootstrap_delay)
-        
-        # Verificar se já existe um líder
-        current_leader = self.gossip.get_leader()
-        
-        if current_leader is not None:
-            self.logger.info(f"Líder {current_leader} detectado durante bootstrap")
-            self.current_leader = current_leader
-            self.state = ProposerState.FOLLOWER
-        else:
-            # Nenhum líder detectado, iniciar eleição
-            self.logger.info("Nenhum líder detectado após bootstrap, iniciando eleição")
-            self._start_election()
-        
-        self.bootstrap_completed = True
-    
-    def _leader_monitor_loop(self):
-        """
-        Loop contínuo que monitora o status do líder e inicia
-        eleições quando necessário.
-        """
-        while True:
-            try:
-                current_time = time.time()
-                current_leader = self.gossip.get_leader()
-                
-                # Atualizar o líder conhecido
-                if self.current_leader != current_leader:
-                    old_leader = self.current_leader
-                    self.current_leader = current_leader
-                    
-                    if old_leader is not None and current_leader is None:
-                        self.logger.warning(f"Líder {old_leader} removido")
-                    elif current_leader is not None:
-                        self.logger.info(f"Novo líder reconhecido: {current_leader}")
-                        
-                        # Registrar no histórico
-                        self.leader_history.append({
-                            "leader_id": current_leader,
-                            "start_time": current_time
-                        })
-                        
-                        # Limitar tamanho do histórico
-                        if len(self.leader_history) > 10:
-                            self.leader_history = self.leader_history[-10:]
-                    
-                    # Atualizar estado conforme o líder
-                    if current_leader == self.node_id:
-                        if self.state != ProposerState.LEADER:
-                            self.logger.info(f"Este nó agora é o líder")
-                            self.state = ProposerState.LEADER
-                    else:
-                        if self.state == ProposerState.LEADER:
-                            self.logger.info(f"Este nó não é mais o líder")
-                            self.state = ProposerState.FOLLOWER
-                
-                # Verificar se estamos sem líder e não em eleição
-                if current_leader is None and not self.election_in_progress:
-                    # Verificar se já passou o tempo de backoff
-                    if current_time > self.backoff_time and self.bootstrap_completed:
-                        self.logger.info("Sem líder detectado e backoff expirado, iniciando eleição")
-                        self._start_election()
-                
-                # Se sou o líder, verificar se ainda estou registrado como tal
-                if self.state == ProposerState.LEADER:
-                    if current_leader != self.node_id:
-                        self.logger.warning(f"Estado inconsistente! Sou líder mas gossip indica {current_leader}")
-                        # Atualizar gossip para refletir liderança
-                        self.gossip.set_leader(self.node_id)
-                
-                # Se sou follower, verificar timeout do líder
-                elif self.state == ProposerState.FOLLOWER and current_leader is not None:
-                    # Verificar quando foi o último heartbeat recebido
-                    if current_time - self.last_heartbeat_received > self.leader_timeout:
-                        self.logger.warning(f"Timeout do líder {current_leader} detectado")
-                        
-                        # Limpar o líder no gossip
-                        self.gossip.set_leader(None)
-                        
-                        # Calcular backoff com jitter para evitar eleições simultâneas
-                        jitter = random.uniform(0, 1.0)
-                        backoff = min(self.base_backoff * (2 ** self.metrics["election_count"] % 5), self.max_backoff)
-                        self.backoff_time = current_time + backoff + (jitter * self.node_id)
-                        
-                        self.logger.info(f"Backoff para próxima eleição: {backoff + jitter*self.node_id:.2f}s")
-            except Exception as e:
-                self.logger.error(f"Erro no monitor de líder: {e}")
-            
-            # Verificar a cada 1 segundo
-            time.sleep(1.0)
-    
-    def _heartbeat_loop(self):
-        """
-        Envia heartbeats periódicos quando este nó é o líder.
-        """
-        while True:
-            try:
-                # Verificar se sou o líder
-                if self.state == ProposerState.LEADER:
-                    self._send_heartbeat_to_all_proposers()
-                    self.metrics["heartbeat_sent"] += 1
-                    
-                    # Atualizar metadata no gossip
-                    self.gossip.update_local_metadata({
-                        "is_leader": True,
-                        "last_heartbeat": time.time(),
-                        "proposal_count": self.metrics["proposal_count"]
-                    })
-            except Exception as e:
-                self.logger.error(f"Erro no loop de heartbeat: {e}")
-            
-            # Enviar heartbeats no intervalo configurado
-            time.sleep(self.heartbeat_interval)
-    
-    def _proposal_processor_loop(self):
-        """
-        Processa as propostas pendentes quando este nó é o líder.
-        """
-        while True:
-            try:
-                # Verificar se sou o líder e tenho propostas pendentes
-                if self.state == ProposerState.LEADER and self.pending_proposals and not self.waiting_for_acceptor_response:
-                    # Obter a próxima proposta
-                    next_proposal = self.pending_proposals.pop(0)
-                    self.logger.info(f"Processando proposta pendente: {next_proposal['value']}")
-                    
-                    # Processar a proposta
-                    self._process_proposal(next_proposal['value'], next_proposal['client_id'], 
-                                          is_leader_election=False)
-            except Exception as e:
-                self.logger.error(f"Erro no processador de propostas: {e}")
-            
-            # Verificar a cada 0.5 segundos
-            time.sleep(0.5)
-    
-    def _handle_status(self):
-        """
-        Retorna informações detalhadas sobre o status atual do proposer.
-        """
-        acceptors = self.gossip.get_nodes_by_role('acceptor')
-        learners = self.gossip.get_nodes_by_role('learner')
-        
-        return jsonify({
-            "id": self.node_id,
-            "role": self.node_role,
-            "state": self.state.value,
-            "current_leader": self.current_leader,
-            "is_leader": self.state == ProposerState.LEADER,
-            "election_in_progress": self.election_in_progress,
-            "bootstrap_completed": self.bootstrap_completed,
-            "proposal_counter": self.proposal_counter,
-            "acceptors_count": len(acceptors),
-            "learners_count": len(learners),
-            "pending_proposals": len(self.pending_proposals),
-            "metrics": self.metrics,
-            "last_heartbeat_received": self.last_heartbeat_received,
-            "current_proposal": {
-                "number": self.current_proposal_number,
-                "value": self.proposed_value,
-                "accepted_count": self.proposal_accepted_count,
-                "waiting_for_response": self.waiting_for_acceptor_response
-            }
-        }), 200
-    
-    def _handle_heartbeat(self, data):
-        """
-        Processa heartbeats recebidos do líder atual.
-        
-        Args:
-            data (dict): Dados do heartbeat
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        leader_id = data.get('leader_id')
-        timestamp = data.get('timestamp', time.time())
-        first_heartbeat = data.get('first_heartbeat', False)
-        
-        if leader_id is None:
-            return jsonify({"error": "Missing leader_id"}), 400
-        
-        # Atualizar último heartbeat recebido
-        self.last_heartbeat_received = time.time()
-        self.metrics["heartbeat_received"] += 1
-        
-        # Se o líder é diferente do atual, atualizar
-        if self.current_leader != leader_id:
-            old_leader = self.current_leader
-            self.current_leader = leader_id
-            
-            # Atualizar o líder no gossip
-            self.gossip.set_leader(leader_id)
-            
-            self.logger.info(f"Líder atualizado via heartbeat: {old_leader} -> {leader_id}")
-            
-            # Se eu pensava que era o líder, mas recebi heartbeat de outro
-            if self.state == ProposerState.LEADER and leader_id != self.node_id:
-                self.logger.warning(f"Conflito de liderança! Voltando para estado FOLLOWER")
-                self.state = ProposerState.FOLLOWER
-        
-        # Se é o primeiro heartbeat do líder, registrar
-        if first_heartbeat:
-            self.logger.info(f"Recebido primeiro heartbeat do líder {leader_id}")
-            
-            # Registrar no histórico
-            self.leader_history.append({
-                "leader_id": leader_id,
-                "start_time": timestamp
-            })
-        
-        # Responder com acknowledgment
-        return jsonify({
-            "status": "acknowledged",
-            "from_proposer": self.node_id,
-            "received_at": time.time()
-        }), 200
-    
-    def _handle_propose(self, data):
-        """
-        Processa requisições de proposta recebidas dos clientes.
-        
-        Args:
-            data (dict): Dados da requisição
-        
-        Returns:
-            Response: Resposta HTTP
-        """
-        value = data.get('value')
-        client_id = data.get('client_id')
-        is_leader_election = data.get('is_leader_election', False)
-        force_election = "force_election" in str(value).lower() if value else False
-        
-        if not value:
-            return jsonify({"error": "Value required"}), 400
-        
-        # Se é uma requisição para forçar eleição
-        if force_election or is_leader_election:
-            self.logger.info(f"Recebida solicitação para forçar eleição")
-            election_started = self._start_election()
-            
-            if election_started:
-                return jsonify({
-                    "status": "election_started",
-                    "proposer_id": self.node_id
-                }), 200
-            else:
-                return jsonify({
-                    "status": "election_already_in_progress",
-                    "proposer_id": self.node_id
-                }), 200
-        
-        # Verificar se sou o líder ou se não há líder
-        if self.state == ProposerState.LEADER:
-            # Sou o líder, processar proposta
-            self.logger.info(f"Recebida proposta como líder: {value} do cliente {client_id}")
-            
-            # Se já estou processando uma proposta, adicionar à fila
-            if self.waiting_for_acceptor_response:
-                self.logger.info(f"Adicionando proposta à fila: {value}")
-                self.pending_proposals.append({
-                    "value": value,
-                    "client_id": client_id,
-                    "timestamp": time.time()
-                })
-                
-                return jsonify({
-                    "status": "queued",
-                    "position": len(self.pending_proposals),
-                    "leader": self.node_id
-                }), 200
-            else:
-                # Processar proposta imediatamente
-                return self._process_proposal(value, client_id)
-        
-        else:
-            # Não sou o líder, redirecionar para o líder se conhecido
-            if self.current_leader is not None:
-                self.logger.info(f"Redirecionando proposta para o líder {self.current_leader}")
-                
-                # Tentar redirecionar para o líder
-                try:
-                    leader_info = self.gossip.get_node_info(str(self.current_leader))
-                    if leader_info:
-                        leader_url = f"http://{leader_info['address']}:{leader_info['port']}/propose"
-                        try:
-                            response = requests.post(leader_url, json=data, timeout=3)
-                            if response.status_code == 200:
-                                return response.json(), 200
-                            else:
-                                self.logger.warning(f"Líder retornou erro: {response.status_code}")
-                        except Exception as e:
-                            self.logger.error(f"Erro ao contatar líder: {e}")
-                            # Líder inatingível, iniciar nova eleição
-                            self.gossip.set_leader(None)
-                except Exception as e:
-                    self.logger.error(f"Erro ao obter info do líder: {e}")
-            
-            # Se não há líder ou ocorreu erro no redirecionamento
-            # Informar ao cliente que não sou o líder
-            return jsonify({
-                "error": "Not the leader",
-                "current_leader": self.current_leader,
-                "retry_suggested": True
-            }), 409  # Conflict
-    
-    def _process_proposal(self, value, client_id, is_leader_election=False):
-        """
-        Processa uma proposta, enviando-a para os acceptors.
-        
-        Args:
-            value (str): Valor a ser proposto
-            client_id (int): ID do cliente
-            is_leader_election (bool): Se é proposta de eleição
-        
-        Returns:
-            Response: Resposta HTTP ou None se chamado internamente
-        """
-        with self.lock:
-            if self.waiting_for_acceptor_response and not is_leader_election:
-                self.logger.warning("Já processando uma proposta")
-                return jsonify({"error": "Already processing a proposal"}), 429
-            
-            self.waiting_for_acceptor_response = True
-            self.proposed_value = value
-            
-            # Incrementar contador e gerar número único de proposta
-            self.proposal_counter += 1
-            self.current_proposal_number = self.proposal_counter * 100 + self.node_id
-            self.proposal_accepted_count = 0
-            
-            self.metrics["proposal_count"] += 1
-            
-            # Adicionar ao histórico
-            self.proposal_history.append({
-                "number": self.current_proposal_number,
-                "value": value,
-                "timestamp": time.time(),
-                "is_election": is_leader_election
-            })
-            
-            # Limitar tamanho do histórico
-            if len(self.proposal_history) > 20:
-                self.proposal_history = self.proposal_history[-20:]
-        
-        # Registrar tipo de proposta
-        if is_leader_election:
-            self.logger.info(f"Iniciando proposta de eleição {self.current_proposal_number}")
-        else:
-            self.logger.info(f"Iniciando proposta normal {self.current_proposal_number}: {value}")
-        
-        # Obter acceptors via gossip
-        acceptors = self.gossip.get_nodes_by_role('acceptor')
-        quorum_size = len(acceptors) // 2 + 1
-        
-        if not acceptors:
-            self.logger.error("Nenhum acceptor disponível")
-            with self.lock:
-                self.waiting_for_acceptor_response = False
-            return jsonify({"error": "No acceptors available"}), 503
-        
-        self.logger.info(f"Enviando PREPARE para {len(acceptors)} acceptors (quorum={quorum_size})")
-        
-        # Enviar mensagem PREPARE para todos os acceptors (fase 1)
-        threads = []
-        for acceptor_id, acceptor in acceptors.items():
-            acceptor_url = f"http://{acceptor['address']}:{acceptor['port']}/prepare"
-            prepare_data = {
-                "proposer_id": self.node_id,
-                "proposal_number": self.current_proposal_number,
-                "is_leader_election": is_leader_election
-            }
-            
-            thread = threading.Thread(
-                target=self._send_prepare,
-                args=(acceptor_url, prepare_data, quorum_size, value, client_id, is_leader_election)
-            )
-            threads.append(thread)
-            thread.start()
-        
-        # Se chamado de _handle_propose, retornar resposta ao cliente
-        if not is_leader_election:
-            return jsonify({
-                "status": "proposal_initiated",
-                "proposal_number": self.current_proposal_number,
-                "proposer_id": self.node_id
-            }), 200
-    
-    def _send_prepare(self, url, data, quorum_size, value, client_id, is_leader_election):
-        """
-        Envia uma mensagem PREPARE para um acceptor e processa a resposta.
-        
-        Args:
-            url (str): URL do acceptor
-            data (dict): Dados do PREPARE
-            quorum_size (int): Tamanho do quórum necessário
-            value (str): Valor proposto
-            client_id (int): ID do cliente
-            is_leader_election (bool): Se é eleição de líder
-        """
-        max_retries = 3
-        base_timeout = 1.0
-        
-        for retry in range(max_retries):
-            try:
-                # Adicionar jitter para evitar sincronização
-                timeout = base_timeout + (retry * 0.5) + random.uniform(0, 0.2)
-                
-                response = requests.post(url, json=data, timeout=timeout)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if result.get("status") == "promise":
-                        # O acceptor prometeu
-                        with self.lock:
-                            self.proposal_accepted_count += 1
-                            
-                            if is_leader_election:
-                                self.logger.info(f"PROMISE recebido para eleição: {self.proposal_accepted_count}/{quorum_size}")
-                            else:
-                                self.logger.info(f"PROMISE recebido para proposta: {self.proposal_accepted_count}/{quorum_size}")
-                            
-                            # Se atingimos o quórum, prosseguir para fase 2 (ACCEPT)
-                            if self.proposal_accepted_count >= quorum_size:
-                                if is_leader_election:
-                                    # Eleição bem-sucedida na fase 1
-                                    self.logger.info(f"Quórum de PROMISE atingido para eleição!")
-                                    
-                                    # Enviar ACCEPT para todos com valor de liderança
-                                    self._send_accept_to_all(f"leader:{self.node_id}", client_id, is_leader_election)
-                                    
-                                    # Atualizar estado para LEADER
-                                    self.state = ProposerState.LEADER
-                                    self.election_in_progress = False
-                                    
-                                    # Atualizar gossip
-                                    self.gossip.set_leader(self.node_id)
-                                    self.gossip.update_local_metadata({
-                                        "is_leader": True,
-                                        "last_heartbeat": time.time()
-                                    })
-                                    
-                                    # Enviar heartbeat imediatamente para anunciar liderança
-                                    self._send_heartbeat_to_all_proposers(first_heartbeat=True)
-                                    
-                                elif self.waiting_for_acceptor_response:
-                                    # Proposta normal atingiu quórum na fase 1
-                                    self.logger.info(f"Quórum de PROMISE atingido para proposta!")
-                                    
-                                    # Verificar se algum acceptor já aceitou um valor
-                                    # Em caso positivo, devemos propor esse valor
-                                    # (Requisito de Paxos para garantir propriedade de segurança)
-                                    highest_accepted = None
-                                    highest_proposal = 0
-                                    
-                                    for acc_id, acc_resp in self.acceptor_responses.items():
-                                        accepted_num = acc_resp.get("accepted_proposal_number", 0)
-                                        if accepted_num > highest_proposal and acc_resp.get("accepted_value"):
-                                            highest_proposal = accepted_num
-                                            highest_accepted = acc_resp.get("accepted_value")
-                                    
-                                    # Se algum valor foi previamente aceito, devemos propô-lo
-                                    if highest_accepted:
-                                        self.logger.info(f"Usando valor anteriormente aceito: {highest_accepted}")
-                                        value = highest_accepted
-                                    
-                                    # Enviar ACCEPT para todos com o valor (fase 2)
-                                    self._send_accept_to_all(value, client_id, is_leader_election)
-                    else:
-                        # O acceptor rejeitou
-                        reason = result.get("message", "Sem motivo informado")
-                        self.logger.warning(f"PREPARE rejeitado: {reason}")
-                        
-                        if is_leader_election and "higher proposal number" in reason:
-                            # Outro proposer tem número maior, abortar esta eleição
-                            with self.lock:
-                                self.election_in_progress = False
-                                self.metrics["reject_count"] += 1
-                            
-                            self.logger.warning(f"Abortando eleição devido a proposta com número maior")
-                            break
-                
-                # Se obtivemos resposta, não precisamos mais de retry
-                break
-                
-            except Exception as e:
-                self.logger.error(f"Erro ao enviar PREPARE (tentativa {retry+1}/{max_retries}): {e}")
-                
-                # Última tentativa falhou
-                if retry == max_retries - 1:
-                    if is_leader_election:
-                        with self.lock:
-                            self.election_in_progress = False
-                    else:
-                        with self.lock:
-                            self.waiting_for_acceptor_response = False
-    
-    def _send_accept_to_all(self, value, client_id, is_leader_election):
-        """
-        Envia mensagens ACCEPT para todos os acceptors (fase 2 do Paxos).
-        
-        Args:
-            value (str): Valor a propor
-            client_id (int): ID do cliente
-            is_leader_election (bool): Se é eleição de líder
-        """
-        acceptors = self.gossip.get_nodes_by_role('acceptor')
-        
-        self.logger.info(f"Enviando ACCEPT para {len(acceptors)} acceptors com valor: {value}")
-        
-        for acceptor_id, acceptor in acceptors.items():
-            try:
-                acceptor_url = f"http://{acceptor['address']}:{acceptor['port']}/accept"
-                accept_data = {
-                    "proposer_id": self.node_id,
-                    "proposal_number": self.current_proposal_number,
-                    "value": value,
-                    "client_id": client_id,
-                    "is_leader_election": is_leader_election
-                }
-                
-                threading.Thread(
-                    target=self._send_accept, 
-                    args=(acceptor_url, accept_data)
-                ).start()
-            except Exception as e:
-                self.logger.error(f"Erro ao enviar ACCEPT para acceptor {acceptor_id}: {e}")
-        
-        # Após enviar todos os ACCEPTs, podemos limpar o flag de espera
-        with self.lock:
-            if not is_leader_election:
-                self.waiting_for_acceptor_response = False
-    
-    def _send_accept(self, url, data):
-        """
-        Envia uma mensagem ACCEPT para um acceptor.
-        
-        Args:
-            url (str): URL do acceptor
-            data (dict): Dados do ACCEPT
-        """
-        max_retries = 3
-        base_timeout = 1.0
-        
-        for retry in range(max_retries):
-            try:
-                # Adicionar jitter para evitar sincronização
-                timeout = base_timeout + (retry * 0.5) + random.uniform(0, 0.2)
-                
-                response = requests.post(url, json=data, timeout=timeout)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if result.get("status") == "accepted":
-                        self.logger.info(f"ACCEPT aceito pelo acceptor")
-                        self.metrics["accept_count"] += 1
-                    else:
-                        reason = result.get("message", "Sem motivo informado")
-                        self.logger.warning(f"ACCEPT rejeitado: {reason}")
-                        self.metrics["reject_count"] += 1
-                
-                # Se obtivemos resposta, não precisamos mais de retry
-                break
-                
-            except Exception as e:
-                self.logger.error(f"Erro ao enviar ACCEPT (tentativa {retry+1}/{max_retries}): {e}")
-    
-    def _send_heartbeat_to_all_proposers(self, first_heartbeat=False):
-        """
-        Envia heartbeats para todos os outros proposers.
-        
-        Args:
-            first_heartbeat (bool): Se é o primeiro heartbeat após eleição
-        """
-        if self.state != ProposerState.LEADER:
-            return
-        
-        proposers = self.gossip.get_nodes_by_role('proposer')
-        current_time = time.time()
-        
-        heartbeat_data = {
-            "leader_id": self.node_id,
-            "timestamp": current_time,
-            "first_heartbeat": first_heartbeat
-        }
-        
-        for proposer_id, proposer in proposers.items():
-            if proposer_id != str(self.node_id):  # Não enviar para si mesmo
-                try:
-                    proposer_url = f"http://{proposer['address']}:{proposer['port']}/heartbeat"
-                    
-                    threading.Thread(
-                        target=lambda url, data: requests.post(url, json=data, timeout=1),
-                        args=(proposer_url, heartbeat_data)
-                    ).start()
-                except Exception as e:
-                    self.logger.debug(f"Erro ao preparar heartbeat para proposer {proposer_id}: {e}")
-    
-    def _start_election(self):
-        """
-        Inicia o processo de eleição de líder.
-        
-        Returns:
-            bool: True se a eleição foi iniciada, False caso contrário
-        """
-        with self.lock:
-            # Verificar se já estamos em eleição
-            if self.election_in_progress:
-                self.logger.info("Eleição já em andamento, ignorando solicitação")
-                return False
-            
-            # Marcar como em eleição
-            self.election_in_progress = True
-            self.election_start_time = time.time()
-            self.metrics["election_count"] += 1
-            
-            # Mudar estado para CANDIDATE
-            self.state = ProposerState.CANDIDATE
-            
-            # Gerar número de proposta para eleição: timestamp + ID
-            # Usar timestamp para garantir unicidade e resolver conflitos
-            self.current_proposal_number = int(time.time() * 1000) + self.node_id
-        
-        self.logger.info(f"Iniciando eleição com proposta número {self.current_proposal_number}")
-        
-        # Iniciar processo Multi-Paxos para eleição
-        self._process_proposal(f"leader:{self.node_id}", None, is_leader_election=True)
-        
-        return True
-    
-    def _handle_view_logs(self):
-        """
-        Fornece logs e estado interno para debugging.
-        """
-        acceptors = self.gossip.get_nodes_by_role('acceptor')
-        learners = self.gossip.get_nodes_by_role('learner')
-        
-        return jsonify({
-            "id": self.node_id,
-            "role": self.node_role,
-            "state": self.state.value,
-            "is_leader": self.state == ProposerState.LEADER,
-            "current_leader": self.current_leader, 
-            "election_in_progress": self.election_in_progress,
-            "bootstrap_completed": self.bootstrap_completed,
-            "proposal_counter": self.proposal_counter,
-            "acceptors_count": len(acceptors),
-            "learners_count": len(learners),
-            "known_nodes_count": len(self.gossip.get_all_nodes()),
-            "pending_proposals": len(self.pending_proposals),
-            "metrics": self.metrics,
-            "current_proposal": {
-                "number": self.current_proposal_number,
-                "value": self.proposed_value,
-                "accepted_count": self.proposal_accepted_count,
-                "waiting_for_response": self.waiting_for_acceptor_response
-            },
-            "recent_proposals": self.proposal_history[-5:] if self.proposal_history else []
-        }), 200
-
-# Para uso como aplicação independente
-if __name__ == '__main__':
-    proposer = Proposer()
+import json
+import math
+import os
+import time
+import threading
+import logging
+import random
+import requests
+from flask import request, jsonify
+from enum import Enum
+
+from base_node import BaseNode
+from fanout import Fanout
+from proposal_queue import ProposalQueue
+from quorum import QuorumPolicy
+
+class ProposerState(Enum):
+    """Estados possíveis para um Proposer no sistema Paxos"""
+    FOLLOWER = "follower"  # Nó seguidor (não-líder)
+    CANDIDATE = "candidate"  # Em processo de eleição
+    LEADER = "leader"  # Líder atual
+
+class Proposer(BaseNode):
+    """
+    Implementação do nó Proposer no algoritmo Paxos.
+    Responsável por propor valores e coordenar o consenso.
+    """
+    
+    def __init__(self, app=None, group_id=None):
+        """
+        Inicializa o nó Proposer.
+        """
+        super().__init__(app, group_id)
+        
+        # Estado do proposer
+        self.state = ProposerState.FOLLOWER
+        self.current_leader = None
+        
+        # Contador para geração de números de proposta, persistido em DATA_DIR para
+        # que um proposer reiniciado não volte a gerar números já rejeitados
+        self.ballot_file = 'proposer_ballot.json'
+        self.proposal_counter = self._load_state(self.ballot_file, {}).get("proposal_counter", 0)
+        
+        # Controle de eleição
+        self.election_in_progress = False
+        self.election_start_time = 0
+        self.election_timeout = 5  # segundos
+        
+        # Controle de heartbeat
+        self.heartbeat_interval = 1.0  # segundos
+        self.last_heartbeat_received = 0
+        self.leader_timeout = 5.0  # segundos para considerar o líder como falho
+        
+        # Backoff para evitar tempestade de eleições
+        self.backoff_time = 0  # tempo até a próxima tentativa de eleição
+        self.max_backoff = 10  # backoff máximo em segundos
+        self.base_backoff = 1  # backoff base em segundos
+        
+        # Estado Multi-Paxos (log replicado indexado por slot)
+        self.election_proposal_number = 0   # Número de proposta da fase 1 em andamento
+        self.leader_proposal_number = None  # Número vencedor da fase 1, válido para todos os slots futuros
+        self.next_slot = 0                  # Próximo slot livre do log
+        self.acceptor_responses = {}        # Respostas PROMISE da eleição em andamento {acceptor_id: resposta}
+        self.election_from_slot = 0         # Primeiro slot coberto pelo PREPARE em andamento
+        
+        # Estado confirmado conhecido pelo líder: o prefixo contíguo de slots escolhidos
+        # (lacunas são preenchidas com no-op na eleição) e os slots escolhidos acima dele.
+        # Os valores em si ficam nos learners
+        self.committed_values = {}  # {slot: valor} escolhidos acima de commit_index
+        self.commit_index = 0       # Todos os slots abaixo deste foram escolhidos
+        self.recovering_slots = set()  # Slots recuperados na eleição ainda sem quórum
+        
+        # Recuperação paginada após a eleição: slots em [recovery_cursor, recovery_end)
+        # ainda não foram lidos dos acceptors; abaixo de recovery_chosen já estavam escolhidos
+        self.recovery_cursor = 0
+        self.recovery_end = 0
+        self.recovery_chosen = 0
+        
+        # Lease do líder: concedido por um quórum de acceptors a cada heartbeat,
+        # permite servir leituras lineares localmente, sem rodada de consenso
+        self.lease_duration = float(os.environ.get('LEASE_DURATION', 3.0))  # segundos
+        self.lease_drift = float(os.environ.get('LEASE_CLOCK_DRIFT', 0.1))   # margem para desvio de relógio
+        self.lease_expiry = 0
+        self.lease_ballot = None
+        
+        # Pipelining: instâncias de consenso em andamento, uma por slot
+        self.pipeline_window = max(1, int(os.environ.get('PIPELINE_WINDOW', 1)))  # Máximo de slots simultâneos
+        self.instance_timeout = 3.0  # segundos sem quórum de ACCEPTED antes de reenviar
+        self.instances = {}          # {slot: estado da instância}
+        self.last_instance = None    # Última instância iniciada (para monitoramento)
+        
+        # Batching opcional: vários valores da fila em um único slot (ativo com BATCH_MAX_SIZE > 1)
+        self.batch_max_size = max(1, int(os.environ.get('BATCH_MAX_SIZE', 1)))
+        self.batch_max_bytes = int(os.environ.get('BATCH_MAX_BYTES', 64 * 1024))
+        self.batch_linger = float(os.environ.get('BATCH_LINGER_MS', 5)) / 1000.0  # segundos
+        self.batch_stats = {
+            "batches": 0,
+            "values_batched": 0,
+            "max_batch_size": 0,
+            "total_linger": 0.0,
+            "max_linger": 0.0,
+            "total_window_wait": 0.0,
+            "max_window_wait": 0.0
+        }
+        
+        # Fila limitada e orientada a eventos: o processador é acordado por
+        # novas propostas ou quando um slot da janela é liberado
+        self.queue_capacity = int(os.environ.get('PROPOSAL_QUEUE_CAPACITY', 1000))
+        self.pending_proposals = ProposalQueue(self.queue_capacity, sizeof=lambda p: p['bytes'])
+        self.commit_latency_avg = 0.0  # Média móvel (EWMA) do tempo até o quórum de ACCEPTED, em segundos
+        self.last_retry_check = 0
+        
+        # Modo síncrono: /propose com "sync" aguarda a escolha do valor
+        self.sync_commit_timeout = float(os.environ.get('SYNC_COMMIT_TIMEOUT', 10))  # segundos
+        
+        # Envio de PREPARE/ACCEPT/heartbeat por um pool fixo de threads com conexões reutilizadas
+        self.fanout = Fanout(
+            max_workers=int(os.environ.get('FANOUT_WORKERS', 64)),
+            logger=self.logger,
+            url_prefix=self.url_prefix
+        )
+        self.election_call = None  # QuorumCall do PREPARE em andamento
+        
+        # Modo econômico (thrifty): PREPARE e ACCEPT vão apenas para um quórum de acceptors
+        # escolhido pelo RTT medido; os demais só são contatados se um deles falhar ou demorar
+        self.thrifty = os.environ.get('THRIFTY_PAXOS', 'false').lower() in ('1', 'true', 'yes')
+        
+        # Tamanhos de quórum das fases 1 e 2 (maioria ou Flexible Paxos), os mesmos dos learners
+        self.quorum = QuorumPolicy.from_env()
+        
+        # Controle de inicialização
+        self.bootstrap_completed = False
+        self.bootstrap_delay = 5 * (1 + 0.5 * self._bootstrap_rank())  # Atraso proporcional ao ID
+        
+        # Histórico para monitoramento
+        self.proposal_history = []  # Últimas propostas
+        self.leader_history = []    # Histórico de líderes
+        self.metrics = {
+            "election_count": 0,
+            "proposal_count": 0,
+            "accept_count": 0,
+            "reject_count": 0,
+            "heartbeat_sent": 0,
+            "heartbeat_received": 0,
+            "chosen_count": 0,
+            "accept_retries": 0,
+            "lease_renewals": 0,
+            "lease_failures": 0,
+            "lease_reads": 0,
+            "read_index_requests": 0,
+            "ballot_jumps": 0,
+            "recovered_chosen": 0,
+            "recovered_reproposed": 0
+        }
+        
+        self.logger.info(f"Proposer inicializado com ID {self.node_id}")
+    
+    def _get_default_port(self):
+        """Retorna a porta padrão para proposers"""
+        return 3000
+    
+    def _register_routes(self):
+        """Registra as rotas específicas do proposer"""
+        @self.app.route('/propose', methods=['POST'])
+        def propose():
+            """Receber proposta de um cliente"""
+            return self._handle_propose(request.json)
+        
+        @self.app.route('/heartbeat', methods=['POST'])
+        def heartbeat():
+            """Receber heartbeat do líder"""
+            return self._handle_heartbeat(request.json)
+        
+        @self.app.route('/read', methods=['GET'])
+        def read():
+            """Índice de leitura informado pelo líder sob lease, sem rodada de heartbeat"""
+            return self._handle_read()
+        
+        @self.app.route('/read-index', methods=['GET'])
+        def read_index():
+            """Índice de leitura confirmado por um quórum de heartbeat"""
+            return self._handle_read_index()
+        
+        @self.app.route('/status', methods=['GET'])
+        def status():
+            """Retorna o status atual do proposer"""
+            return self._handle_status()
+    
+    def _start_threads(self):
+        """Inicia as threads do proposer"""
+        # Thread para monitorar o líder e iniciar eleições
+        threading.Thread(target=self._leader_monitor_loop, daemon=True).start()
+        
+        # Thread para enviar heartbeats quando for líder
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        
+        # Thread para processar propostas pendentes
+        threading.Thread(target=self._proposal_processor_loop, daemon=True).start()
+        
+        # Thread para bootstrap inicial
+        threading.Thread(target=self._bootstrap, daemon=True).start()
+    
+    def _bootstrap_rank(self):
+        """
+        Posição deste proposer na ordem de bootstrap (quem tenta a primeira eleição).
+        Com grupo único é o próprio ID; com vários grupos, a ordem dos proposers
+        sementes é rotacionada pelo ID do grupo, para que cada grupo comece com um
+        líder diferente e a carga se distribua entre os proposers.
+        """
+        if self.group_id is None:
+            return self.node_id
+
+        proposer_ids = sorted({node['id'] for node in self.seed_nodes if node['role'] == 'proposer'} | {self.node_id})
+        return 1 + (proposer_ids.index(self.node_id) - self.group_id) % len(proposer_ids)
+
+    def _bootstrap(self):
+        """
+        Realiza o bootstrap inicial do proposer, aguardando um tempo proporcional
+        ao ID antes de tentar iniciar uma eleição se nenhum líder for detectado.
+        """
+        self.logger.info(f"Iniciando bootstrap com delay de {self.bootstrap_delay:.1f}s")
+        time.sleep(self.bootstrap_delay)
+        
+        # Verificar se já existe um líder
+        current_leader = self.gossip.get_leader()
+        
+        if current_leader is not None:
+            self.logger.info(f"Líder {current_leader} detectado durante bootstrap")
+            self.current_leader = current_leader
+            self.state = ProposerState.FOLLOWER
+        else:
+            # Nenhum líder detectado, iniciar eleição
+            self.logger.info("Nenhum líder detectado após bootstrap, iniciando eleição")
+            self._start_election()
+        
+        self.bootstrap_completed = True
+    
+    def _leader_monitor_loop(self):
+        """
+        Loop contínuo que monitora o status do líder e inicia
+        eleições quando necessário.
+        """
+        while True:
+            try:
+                current_time = time.time()
+                current_leader = self.gossip.get_leader()
+                
+                # Atualizar o líder conhecido
+                if self.current_leader != current_leader:
+                    old_leader = self.current_leader
+                    self.current_leader = current_leader
+                    
+                    if old_leader is not None and current_leader is None:
+                        self.logger.warning(f"Líder {old_leader} removido")
+                    elif current_leader is not None:
+                        self.logger.info(f"Novo líder reconhecido: {current_leader}")
+                        
+                        # Registrar no histórico
+                        self.leader_history.append({
+                            "leader_id": current_leader,
+                            "start_time": current_time
+                        })
+                        
+                        # Limitar tamanho do histórico
+                        if len(self.leader_history) > 10:
+                            self.leader_history = self.leader_history[-10:]
+                    
+                    # Atualizar estado conforme o líder
+                    if current_leader == self.node_id:
+                        if self.state != ProposerState.LEADER:
+                            if self.leader_proposal_number is None:
+                                # Gossip antigo (ex.: após deixar a liderança) não substitui a fase 1:
+                                # sem número de proposta vencedor, não há como propor valores
+                                self.logger.warning(f"Gossip indica este nó como líder sem fase 1 concluída, iniciando eleição")
+                                self._start_election()
+                            else:
+                                self.logger.info(f"Este nó agora é o líder")
+                                self.state = ProposerState.LEADER
+                    else:
+                        if self.state == ProposerState.LEADER:
+                            self.logger.info(f"Este nó não é mais o líder")
+                            self.state = ProposerState.FOLLOWER
+                            self._step_down(f"gossip indica o líder {current_leader}")
+                
+                # Verificar se estamos sem líder e não em eleição
+                if current_leader is None and not self.election_in_progress:
+                    # Verificar se já passou o tempo de backoff
+                    if current_time > self.backoff_time and self.bootstrap_completed:
+                        self.logger.info("Sem líder detectado e backoff expirado, iniciando eleição")
+                        self._start_election()
+                
+                # Se sou o líder, verificar se ainda estou registrado como tal
+                if self.state == ProposerState.LEADER:
+                    if current_leader != self.node_id:
+                        self.logger.warning(f"Estado inconsistente! Sou líder mas gossip indica {current_leader}")
+                        # Atualizar gossip para refletir liderança
+                        self.gossip.set_leader(self.node_id)
+                
+                # Se sou follower, verificar timeout do líder
+                elif self.state == ProposerState.FOLLOWER and current_leader is not None:
+                    # Verificar quando foi o último heartbeat recebido
+                    if current_time - self.last_heartbeat_received > self.leader_timeout:
+                        self.logger.warning(f"Timeout do líder {current_leader} detectado")
+                        
+                        # Limpar o líder no gossip
+                        self.gossip.set_leader(None)
+                        
+                        # Calcular backoff com jitter para evitar eleições simultâneas
+                        jitter = random.uniform(0, 1.0)
+                        backoff = min(self.base_backoff * (2 ** self.metrics["election_count"] % 5), self.max_backoff)
+                        self.backoff_time = current_time + backoff + (jitter * self.node_id)
+                        
+                        self.logger.info(f"Backoff para próxima eleição: {backoff + jitter*self.node_id:.2f}s")
+            except Exception as e:
+                self.logger.error(f"Erro no monitor de líder: {e}")
+            
+            # Verificar a cada 1 segundo
+            time.sleep(1.0)
+    
+    def _heartbeat_loop(self):
+        """
+        Envia heartbeats periódicos quando este nó é o líder.
+        """
+        while True:
+            try:
+                # Verificar se sou o líder
+                if self.state == ProposerState.LEADER:
+                    self._send_heartbeat_to_all_proposers()
+                    self._renew_lease()
+                    self.metrics["heartbeat_sent"] += 1
+                    
+                    # Atualizar metadata no gossip
+                    self.gossip.update_local_metadata({
+                        "is_leader": True,
+                        "last_heartbeat": time.time(),
+                        "proposal_count": self.metrics["proposal_count"]
+                    })
+            except Exception as e:
+                self.logger.error(f"Erro no loop de heartbeat: {e}")
+            
+            # Enviar heartbeats no intervalo configurado
+            time.sleep(self.heartbeat_interval)
+    
+    def _proposal_processor_loop(self):
+        """
+        Processa as propostas pendentes quando este nó é o líder.
+        """
+        while True:
+            try:
+                # Bloquear até haver proposta e espaço na janela de pipelining
+                # (ou no máximo 0.5s, para verificar instâncias sem quórum)
+                batch = self.pending_proposals.take(
+                    ready=self._pipeline_has_room,
+                    max_items=self.batch_max_size,
+                    max_bytes=self.batch_max_bytes,
+                    linger=self.batch_linger if self.batch_max_size > 1 else 0.0,
+                    timeout=0.5
+                )
+                
+                if batch:
+                    self._dispatch_batch(batch)
+                
+                # Reenviar ACCEPT para instâncias sem quórum
+                if self.state == ProposerState.LEADER and time.time() - self.last_retry_check >= 0.5:
+                    self.last_retry_check = time.time()
+                    self._retry_stalled_instances()
+            except Exception as e:
+                self.logger.error(f"Erro no processador de propostas: {e}")
+                time.sleep(0.5)
+    
+    def _handle_status(self):
+        """
+        Retorna informações detalhadas sobre o status atual do proposer.
+        """
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        learners = self.gossip.get_nodes_by_role('learner')
+        
+        return jsonify({
+            "id": self.node_id,
+            "role": self.node_role,
+            "state": self.state.value,
+            "current_leader": self.current_leader,
+            "is_leader": self.state == ProposerState.LEADER,
+            "election_in_progress": self.election_in_progress,
+            "bootstrap_completed": self.bootstrap_completed,
+            "proposal_counter": self.proposal_counter,
+            "leader_proposal_number": self.leader_proposal_number,
+            "next_slot": self.next_slot,
+            "commit_index": self.commit_index,
+            "acceptors_count": len(acceptors),
+            "learners_count": len(learners),
+            "quorum": self.quorum.describe(len(acceptors)),
+            "pending_proposals": len(self.pending_proposals),
+            "queue_capacity": self.queue_capacity,
+            "lease": {
+                "duration": self.lease_duration,
+                "remaining_ms": max(0, self.lease_expiry - time.time()) * 1000,
+                "ballot": self.lease_ballot
+            },
+            "commit_latency_avg_ms": self.commit_latency_avg * 1000,
+            "metrics": self.metrics,
+            "last_heartbeat_received": self.last_heartbeat_received,
+            "pipeline": self._pipeline_summary(),
+            "batching": self._batching_summary(),
+            "fanout": {
+                "thrifty": self.thrifty,
+                "rtt_ms": self.fanout.rtt_summary(),
+                "messages_sent": self.fanout.stats["messages_sent"],
+                "fallbacks": self.fanout.stats["fallbacks"]
+            },
+            "current_proposal": self._current_proposal_summary()
+        }), 200
+    
+    def _batching_summary(self):
+        """
+        Resume a configuração e as métricas de batching.
+        
+        Returns:
+            dict: Limites configurados, tamanho médio/máximo dos lotes, linger médio/máximo
+                  e espera por espaço na janela de pipelining
+        """
+        with self.lock:
+            stats = self.batch_stats
+            batches = stats["batches"]
+            return {
+                "enabled": self.batch_max_size > 1,
+                "max_size": self.batch_max_size,
+                "max_bytes": self.batch_max_bytes,
+                "linger_ms": self.batch_linger * 1000,
+                "batches": batches,
+                "values_batched": stats["values_batched"],
+                "avg_batch_size": stats["values_batched"] / batches if batches else 0,
+                "max_batch_size": stats["max_batch_size"],
+                "avg_linger_ms": stats["total_linger"] * 1000 / batches if batches else 0,
+                "max_linger_ms": stats["max_linger"] * 1000,
+                "avg_window_wait_ms": stats["total_window_wait"] * 1000 / batches if batches else 0,
+                "max_window_wait_ms": stats["max_window_wait"] * 1000
+            }
+    
+    def _pipeline_summary(self):
+        """
+        Resume o estado da janela de pipelining.
+        
+        Returns:
+            dict: Janela configurada e instâncias em andamento
+        """
+        with self.lock:
+            in_flight = sorted(self.instances.values(), key=lambda i: i["slot"])
+            return {
+                "window": self.pipeline_window,
+                "in_flight": len(in_flight),
+                "instances": [{
+                    "slot": i["slot"],
+                    "number": i["proposal_number"],
+                    "accepted_count": len(i["accepted_by"]),
+                    "quorum_size": i["quorum_size"],
+                    "attempts": i["attempts"]
+                } for i in in_flight[:10]]
+            }
+    
+    def _current_proposal_summary(self):
+        """
+        Resume a última instância iniciada (formato usado pelo monitor).
+        
+        Returns:
+            dict: Número, slot, valor e contagem de ACCEPTED da última instância
+        """
+        with self.lock:
+            instance = self.last_instance
+            return {
+                "number": instance["proposal_number"] if instance else self.election_proposal_number,
+                "slot": instance["slot"] if instance else None,
+                "value": instance["value"] if instance else None,
+                "accepted_count": len(instance["accepted_by"]) if instance else len(self.acceptor_responses),
+                "waiting_for_response": len(self.instances) >= self.pipeline_window
+            }
+    
+    def _handle_heartbeat(self, data):
+        """
+        Processa heartbeats recebidos do líder atual.
+        
+        Args:
+            data (dict): Dados do heartbeat
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        leader_id = data.get('leader_id')
+        timestamp = data.get('timestamp', time.time())
+        first_heartbeat = data.get('first_heartbeat', False)
+        
+        if leader_id is None:
+            return jsonify({"error": "Missing leader_id"}), 400
+        
+        # Atualizar último heartbeat recebido
+        self.last_heartbeat_received = time.time()
+        self.metrics["heartbeat_received"] += 1
+        
+        # Se o líder é diferente do atual, atualizar
+        if self.current_leader != leader_id:
+            old_leader = self.current_leader
+            self.current_leader = leader_id
+            
+            # Atualizar o líder no gossip
+            self.gossip.set_leader(leader_id)
+            
+            self.logger.info(f"Líder atualizado via heartbeat: {old_leader} -> {leader_id}")
+            
+            # Se eu pensava que era o líder, mas recebi heartbeat de outro
+            if self.state == ProposerState.LEADER and leader_id != self.node_id:
+                self.logger.warning(f"Conflito de liderança! Voltando para estado FOLLOWER")
+                self.state = ProposerState.FOLLOWER
+                self._step_down(f"heartbeat recebido do líder {leader_id}")
+        
+        # Se é o primeiro heartbeat do líder, registrar
+        if first_heartbeat:
+            self.logger.info(f"Recebido primeiro heartbeat do líder {leader_id}")
+            
+            # Registrar no histórico
+            self.leader_history.append({
+                "leader_id": leader_id,
+                "start_time": timestamp
+            })
+        
+        # Responder com acknowledgment
+        return jsonify({
+            "status": "acknowledged",
+            "from_proposer": self.node_id,
+            "received_at": time.time()
+        }), 200
+    
+    def _handle_propose(self, data):
+        """
+        Processa requisições de proposta recebidas dos clientes.
+        
+        Args:
+            data (dict): Dados da requisição
+        
+        Returns:
+            Response: Resposta HTTP
+        """
+        value = data.get('value')
+        client_id = data.get('client_id')
+        is_leader_election = data.get('is_leader_election', False)
+        force_election = "force_election" in str(value).lower() if value else False
+        
+        if not value:
+            return jsonify({"error": "Value required"}), 400
+        
+        # Valores de clientes são strings: lotes seguem em um envelope próprio ({"batch": [...]})
+        if not isinstance(value, str):
+            return jsonify({"error": "Value must be a string"}), 400
+        
+        # Se é uma requisição para forçar eleição
+        if force_election or is_leader_election:
+            self.logger.info(f"Recebida solicitação para forçar eleição")
+            election_started = self._start_election()
+            
+            if election_started:
+                return jsonify({
+                    "status": "election_started",
+                    "proposer_id": self.node_id
+                }), 200
+            else:
+                return jsonify({
+                    "status": "election_already_in_progress",
+                    "proposer_id": self.node_id
+                }), 200
+        
+        # Modo síncrono: responder só depois que o valor for escolhido (ou no prazo)
+        sync = bool(data.get('sync', False))
+        try:
+            timeout = float(data.get('timeout', self.sync_commit_timeout))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid timeout"}), 400
+        
+        # Verificar se sou o líder ou se não há líder
+        if self.state == ProposerState.LEADER:
+            # Sou o líder, processar proposta
+            self.logger.info(f"Recebida proposta como líder: {value} do cliente {client_id}")
+            waiter = self._new_commit_waiter() if sync else None
+            
+            # Se a janela de pipelining está cheia (ou há fila, ou batching ativo), adicionar à fila
+            must_queue = (self.batch_max_size > 1 or len(self.pending_proposals) > 0
+                          or not self._pipeline_has_room())
+            
+            if not must_queue:
+                # Processar proposta imediatamente
+                response = self._process_proposal(value, client_id, waiters=[waiter] if waiter else None)
+                
+                # Janela preenchida por uma requisição concorrente: usar a fila
+                must_queue = response[1] == 429
+                if not must_queue and (waiter is None or response[1] != 200):
+                    return response
+            
+            if must_queue:
+                position = self.pending_proposals.put({
+                    "value": value,
+                    "client_id": client_id,
+                    "timestamp": time.time(),
+                    "bytes": len(str(value).encode('utf-8')),
+                    "waiter": waiter
+                })
+                
+                if position is None:
+                    # Backpressure: fila cheia, o cliente deve tentar novamente mais tarde
+                    queue_depth = len(self.pending_proposals)
+                    retry_after = self._estimate_retry_after(queue_depth)
+                    self.logger.warning(f"Fila de propostas cheia ({queue_depth}), rejeitando: {value}")
+                    return jsonify({
+                        "error": "Proposal queue full",
+                        "queue_depth": queue_depth,
+                        "queue_capacity": self.queue_capacity,
+                        "retry_after": retry_after,
+                        "leader": self.node_id
+                    }), 429, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+                
+                self.logger.info(f"Adicionando proposta à fila: {value}")
+                if waiter is None:
+                    return jsonify({
+                        "status": "queued",
+                        "position": position,
+                        "leader": self.node_id
+                    }), 200
+            
+            return self._await_commit(waiter, timeout)
+        
+        else:
+            # Não sou o líder, redirecionar para o líder se conhecido
+            if self.current_leader is not None:
+                self.logger.info(f"Redirecionando proposta para o líder {self.current_leader}")
+                
+                # Tentar redirecionar para o líder
+                try:
+                    leader_info = self.gossip.get_node_info(str(self.current_leader))
+                    if leader_info:
+                        leader_url = self._node_url(leader_info, '/propose')
+                        try:
+                            # No modo síncrono o líder só responde após a escolha do valor
+                            response = requests.post(leader_url, json=data, timeout=timeout + 2 if sync else 3)
+                            if response.status_code == 200:
+                                return response.json(), 200
+                            elif sync and response.status_code in (503, 504):
+                                return response.json(), response.status_code
+                            elif response.status_code == 429:
+                                # Fila do líder cheia: repassar o backpressure ao cliente
+                                return response.json(), 429, {"Retry-After": response.headers.get("Retry-After", "1")}
+                            else:
+                                self.logger.warning(f"Líder retornou erro: {response.status_code}")
+                        except Exception as e:
+                            self.logger.error(f"Erro ao contatar líder: {e}")
+                            # Líder inatingível, iniciar nova eleição
+                            self.gossip.set_leader(None)
+                except Exception as e:
+                    self.logger.error(f"Erro ao obter info do líder: {e}")
+            
+            # Se não há líder ou ocorreu erro no redirecionamento
+            # Informar ao cliente que não sou o líder
+            return jsonify({
+                "error": "Not the leader",
+                "current_leader": self.current_leader,
+                "retry_suggested": True
+            }), 409  # Conflict
+    
+    def _process_proposal(self, value, client_id, is_leader_election=False, waiters=None):
+        """
+        Processa uma proposta no log Multi-Paxos.
+        
+        Propostas de eleição executam a fase 1 (PREPARE/PROMISE) uma única vez
+        para todos os slots futuros. Propostas normais do líder vão direto para
+        a fase 2 (ACCEPT) no próximo slot livre, usando o número de proposta
+        vencedor da eleição.
+        
+        Args:
+            value (str): Valor a ser proposto
+            client_id (int): ID do cliente
+            is_leader_election (bool): Se é proposta de eleição
+            waiters (list, optional): Requisições síncronas aguardando a escolha do valor
+        
+        Returns:
+            Response: Resposta HTTP ou None se chamado internamente
+        """
+        if is_leader_election:
+            self._send_prepare_to_all()
+            return None
+        
+        slot, error = self._start_instance(value, client_id, waiters)
+        
+        if error == "no_leadership":
+            # Estado de líder sem fase 1 concluída (ex.: líder anunciado via gossip)
+            self.logger.warning("Liderança sem fase 1 concluída, iniciando eleição")
+            self._start_election()
+            return jsonify({
+                "error": "Leadership not established",
+                "current_leader": self.current_leader,
+                "retry_suggested": True
+            }), 503
+        elif error == "window_full":
+            self.logger.warning("Janela de pipelining cheia")
+            return jsonify({"error": "Pipeline window full"}), 429
+        elif error == "no_acceptors":
+            return jsonify({"error": "No acceptors available"}), 503
+        
+        return jsonify({
+            "status": "proposal_initiated",
+            "proposal_number": self.leader_proposal_number,
+            "slot": slot,
+            "proposer_id": self.node_id
+        }), 200
+    
+    def _start_instance(self, value, client_id, waiters=None):
+        """
+        Inicia uma instância de consenso no próximo slot livre, se a janela
+        de pipelining permitir.
+        
+        Args:
+            value (str): Valor a ser proposto
+            client_id (int): ID do cliente
+            waiters (list, optional): Requisições síncronas aguardando a escolha do valor
+        
+        Returns:
+            tuple: (slot, erro) - erro é None, "no_leadership", "window_full" ou "no_acceptors"
+        """
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        
+        with self.lock:
+            if self.leader_proposal_number is None:
+                return None, "no_leadership"
+            if len(self.instances) >= self.pipeline_window:
+                return None, "window_full"
+            if not acceptors:
+                self.logger.error("Nenhum acceptor disponível")
+                return None, "no_acceptors"
+            
+            # Alocar o próximo slot do log
+            slot = self.next_slot
+            self.next_slot += 1
+            instance = self._register_instance(slot, value, client_id, len(acceptors), waiters)
+            
+            self.metrics["proposal_count"] += 1
+            
+            # Adicionar ao histórico
+            self.proposal_history.append({
+                "number": instance["proposal_number"],
+                "slot": slot,
+                "value": value,
+                "timestamp": instance["started_at"],
+                "is_election": False
+            })
+            
+            # Limitar tamanho do histórico
+            if len(self.proposal_history) > 20:
+                self.proposal_history = self.proposal_history[-20:]
+        
+        self.logger.info(f"Iniciando proposta normal no slot {slot} (proposta {instance['proposal_number']}): {value}")
+        
+        # Fase 2 direta: o PROMISE da eleição cobre todos os slots futuros
+        self._send_accept_to_all(value, client_id, False, slot=slot, proposal_number=instance["proposal_number"])
+        
+        return slot, None
+    
+    def _register_instance(self, slot, value, client_id, acceptor_count, waiters=None):
+        """
+        Cria o estado de uma instância de consenso. Deve ser chamado com self.lock adquirido.
+        
+        Args:
+            slot (int): Slot do log
+            value (str): Valor proposto
+            client_id (int): ID do cliente
+            acceptor_count (int): Número de acceptors conhecidos
+            waiters (list, optional): Requisições síncronas aguardando a escolha do valor
+        
+        Returns:
+            dict: Estado da instância
+        """
+        now = time.time()
+        instance = {
+            "slot": slot,
+            "proposal_number": self.leader_proposal_number,
+            "value": value,
+            "client_id": client_id,
+            "accepted_by": set(),
+            "quorum_size": self.quorum.phase2_size(acceptor_count),
+            "started_at": now,
+            "last_sent": now,
+            "attempts": 1,
+            "waiters": waiters or []
+        }
+        for waiter in instance["waiters"]:
+            waiter["slot"] = slot
+            waiter["proposal_number"] = instance["proposal_number"]
+        self.instances[slot] = instance
+        self.last_instance = instance
+        return instance
+    
+    def _new_commit_waiter(self):
+        """
+        Cria o registro de uma requisição síncrona, sinalizado quando o valor é escolhido.
+        
+        Returns:
+            dict: Registro com evento, slot e horários
+        """
+        return {
+            "event": threading.Event(),
+            "submitted_at": time.time(),
+            "slot": None,
+            "proposal_number": None,
+            "chosen_at": None,
+            "error": None
+        }
+    
+    def _resolve_waiters(self, waiters, error=None):
+        """
+        Libera as requisições síncronas de uma instância.
+        
+        Args:
+            waiters (list): Registros criados por _new_commit_waiter
+            error (str, optional): Motivo, se a instância foi abandonada sem decisão
+        """
+        now = time.time()
+        for waiter in waiters:
+            waiter["chosen_at"] = now if error is None else None
+            waiter["error"] = error
+            waiter["event"].set()
+    
+    def _await_commit(self, waiter, timeout):
+        """
+        Aguarda a escolha do valor de uma requisição síncrona.
+        
+        Args:
+            waiter (dict): Registro criado por _new_commit_waiter
+            timeout (float): Prazo em segundos
+        
+        Returns:
+            Response: Resposta HTTP com slot e latência de commit
+        """
+        if not waiter["event"].wait(timeout):
+            self.logger.warning(f"Prazo de {timeout}s esgotado aguardando commit (slot {waiter['slot']})")
+            return jsonify({
+                "status": "timeout",
+                "error": "Value not chosen before deadline",
+                "slot": waiter["slot"],
+                "timeout": timeout,
+                "proposer_id": self.node_id
+            }), 504
+        
+        if waiter["error"] is not None and waiter["slot"] is None:
+            # Ainda na fila: o valor nunca foi proposto e pode ser reenviado com segurança
+            return jsonify({
+                "error": "Leadership lost before the value was proposed",
+                "reason": waiter["error"],
+                "current_leader": self.current_leader,
+                "retry_suggested": True
+            }), 503
+        
+        if waiter["error"] is not None:
+            # O valor pode ainda ser escolhido pelo próximo líder (recuperado na fase 1)
+            return jsonify({
+                "error": "Leadership lost before commit, outcome unknown",
+                "reason": waiter["error"],
+                "slot": waiter["slot"],
+                "retry_suggested": True
+            }), 503
+        
+        return jsonify({
+            "status": "chosen",
+            "slot": waiter["slot"],
+            "proposal_number": waiter["proposal_number"],
+            "commit_latency_ms": (waiter["chosen_at"] - waiter["submitted_at"]) * 1000,
+            "proposer_id": self.node_id
+        }), 200
+    
+    def _pipeline_has_room(self):
+        """
+        Verifica se o líder pode iniciar mais uma instância.
+        
+        Returns:
+            bool: True se é líder com fase 1 concluída e a janela tem espaço
+        """
+        return (self.state == ProposerState.LEADER and self.leader_proposal_number is not None
+                and len(self.instances) < self.pipeline_window)
+    
+    def _dispatch_batch(self, batch):
+        """
+        Inicia uma instância para propostas retiradas da fila.
+        
+        Args:
+            batch (list): Propostas retiradas da fila (uma, ou várias com batching)
+        """
+        if len(batch) == 1:
+            value, client_id = batch[0]['value'], batch[0]['client_id']
+            self.logger.info(f"Processando proposta pendente: {value}")
+        else:
+            # Valor em lote: {"batch": [{value, client_id}, ...]}, entregue individualmente pelos learners
+            value = {"batch": [{"value": p['value'], "client_id": p['client_id']} for p in batch]}
+            client_id = None
+            self.logger.info(f"Processando lote com {len(batch)} propostas pendentes")
+        
+        waiters = [p['waiter'] for p in batch if p.get('waiter') is not None]
+        slot, error = self._start_instance(value, client_id, waiters)
+        
+        if error is not None:
+            # Devolver à frente da fila; o processador é acordado quando houver espaço
+            self.pending_proposals.put_front(batch)
+            return
+        
+        if self.batch_max_size > 1:
+            # Espera por espaço na janela e linger medidos separadamente pela fila
+            window_wait, linger = self.pending_proposals.last_wait
+            with self.lock:
+                self.batch_stats["batches"] += 1
+                self.batch_stats["values_batched"] += len(batch)
+                self.batch_stats["max_batch_size"] = max(self.batch_stats["max_batch_size"], len(batch))
+                self.batch_stats["total_linger"] += linger
+                self.batch_stats["max_linger"] = max(self.batch_stats["max_linger"], linger)
+                self.batch_stats["total_window_wait"] += window_wait
+                self.batch_stats["max_window_wait"] = max(self.batch_stats["max_window_wait"], window_wait)
+    
+    def _estimate_retry_after(self, queue_depth):
+        """
+        Estima em quantos segundos a fila terá espaço, a partir da latência
+        média de commit e da vazão máxima da janela de pipelining.
+        
+        Args:
+            queue_depth (int): Propostas na fila
+        
+        Returns:
+            float: Tempo sugerido de espera em segundos
+        """
+        per_slot = self.commit_latency_avg or self.instance_timeout
+        slots_needed = queue_depth / (self.pipeline_window * self.batch_max_size)
+        return round(per_slot * slots_needed, 3)
+    
+    def _retry_stalled_instances(self):
+        """
+        Reenvia ACCEPT aos acceptors que ainda não responderam em instâncias
+        que passaram de instance_timeout sem quórum.
+        """
+        now = time.time()
+        stalled = []
+        
+        with self.lock:
+            for instance in self.instances.values():
+                if now - instance["last_sent"] > self.instance_timeout:
+                    instance["last_sent"] = now
+                    instance["attempts"] += 1
+                    stalled.append((instance["slot"], instance["value"], instance["client_id"],
+                                    instance["proposal_number"], set(instance["accepted_by"])))
+            self.metrics["accept_retries"] += len(stalled)
+        
+        if len(stalled) == 1:
+            slot, value, client_id, proposal_number, accepted_by = stalled[0]
+            self.logger.warning(f"Slot {slot} sem quórum após {self.instance_timeout}s, reenviando ACCEPT")
+            self._send_accept_to_all(value, client_id, False, slot=slot, proposal_number=proposal_number,
+                                     exclude=accepted_by)
+            return
+        
+        # Vários slots parados (ex.: acceptor lento): um único /accept-batch por acceptor
+        for proposal_number in {entry[3] for entry in stalled}:
+            entries = [(slot, value, client_id, accepted_by)
+                       for slot, value, client_id, pn, accepted_by in stalled if pn == proposal_number]
+            self.logger.warning(f"{len(entries)} slots sem quórum após {self.instance_timeout}s, reenviando em lote")
+            self._send_accept_batch(entries, proposal_number)
+    
+    def _send_accept_batch(self, entries, proposal_number):
+        """
+        Envia ACCEPTs de vários slots em uma única requisição /accept-batch por
+        acceptor. Cada resultado do lote é tratado como a resposta de um ACCEPT
+        individual; falhas de rede ficam para o reenvio de instâncias paradas.
+        
+        Args:
+            entries (list): Tuplas (slot, valor, client_id, acceptors que já aceitaram)
+            proposal_number (int): Número de proposta da liderança
+        """
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        
+        for acceptor_id, acceptor in acceptors.items():
+            batch = [
+                {
+                    "proposer_id": self.node_id,
+                    "proposal_number": proposal_number,
+                    "slot": slot,
+                    "value": value,
+                    "client_id": client_id,
+                    "is_leader_election": False
+                }
+                for slot, value, client_id, accepted_by in entries if acceptor_id not in accepted_by
+            ]
+            if batch:
+                url = self._node_url(acceptor, '/accept-batch')
+                self.fanout.executor.submit(self._post_accept_batch, acceptor_id, url, batch)
+    
+    def _post_accept_batch(self, acceptor_id, url, batch):
+        """
+        Envia um lote de ACCEPTs a um acceptor e processa os resultados por slot.
+        """
+        try:
+            response = self.fanout.post(url, {"proposer_id": self.node_id, "entries": batch}, timeout=2.0 + 0.01 * len(batch))
+            if response.status_code != 200:
+                self.logger.warning(f"Lote de ACCEPT recusado pelo acceptor {acceptor_id}: HTTP {response.status_code}")
+                return
+            results = response.json().get("results", [])
+        except Exception as e:
+            self.logger.warning(f"Erro ao enviar lote de {len(batch)} ACCEPTs ao acceptor {acceptor_id}: {e}")
+            return
+        
+        for accept_data, result in zip(batch, results):
+            self._on_accept_reply(accept_data, acceptor_id, result, result.get("status") == "accepted")
+    
+    def _send_prepare_to_all(self):
+        """
+        Envia PREPARE para todos os acceptors (fase 1 do Multi-Paxos).
+        O PROMISE vale para todos os slots a partir de commit_index, o primeiro
+        slot cujo valor este proposer ainda não conhece.
+        """
+        with self.lock:
+            proposal_number = self.election_proposal_number
+            from_slot = self.commit_index
+            self.election_from_slot = from_slot
+            self.acceptor_responses = {}
+            
+            # Adicionar ao histórico
+            self.proposal_history.append({
+                "number": proposal_number,
+                "value": f"leader:{self.node_id}",
+                "timestamp": time.time(),
+                "is_election": True
+            })
+            
+            # Limitar tamanho do histórico
+            if len(self.proposal_history) > 20:
+                self.proposal_history = self.proposal_history[-20:]
+        
+        self.logger.info(f"Iniciando proposta de eleição {proposal_number} (slots a partir de {from_slot})")
+        
+        # Obter acceptors via gossip
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        quorum_size = self.quorum.phase1_size(len(acceptors))
+        
+        if not acceptors:
+            self.logger.error("Nenhum acceptor disponível")
+            with self.lock:
+                self.election_in_progress = False
+            return
+        
+        self.logger.info(f"Enviando PREPARE para {len(acceptors)} acceptors (quorum={quorum_size})")
+        
+        prepare_data = {
+            "proposer_id": self.node_id,
+            "proposal_number": proposal_number,
+            "is_leader_election": True,
+            "from_slot": from_slot
+        }
+        
+        call = self.fanout.quorum(
+            acceptors, "/prepare", prepare_data, quorum_size,
+            is_success=lambda result: result.get("status") == "promise",
+            on_reply=lambda acceptor_id, result, ok: self._on_prepare_reply(proposal_number, quorum_size, acceptor_id, result, ok),
+            on_complete=lambda call: self._on_prepare_complete(proposal_number, call),
+            thrifty=self.thrifty
+        )
+        
+        with self.lock:
+            self.election_call = call
+    
+    def _on_prepare_reply(self, proposal_number, quorum_size, acceptor_id, result, ok):
+        """
+        Processa a resposta de um acceptor ao PREPARE.
+        
+        Args:
+            proposal_number (int): Número de proposta da eleição
+            quorum_size (int): Tamanho do quórum necessário
+            acceptor_id (str): ID do acceptor
+            result (dict): Resposta do acceptor
+            ok (bool): Se é um PROMISE
+        """
+        if ok:
+            with self.lock:
+                # Ignorar PROMISE de eleições antigas
+                if self.election_proposal_number != proposal_number:
+                    return
+                self.acceptor_responses[acceptor_id] = result
+                promise_count = len(self.acceptor_responses)
+            
+            self.logger.info(f"PROMISE recebido para eleição: {promise_count}/{quorum_size}")
+        else:
+            # O acceptor rejeitou
+            reason = result.get("message", "Sem motivo informado")
+            self.logger.warning(f"PREPARE rejeitado: {reason}")
+            with self.lock:
+                self.metrics["reject_count"] += 1
+            
+            self._observe_promised_ballot(result)
+    
+    def _on_prepare_complete(self, proposal_number, call):
+        """
+        Conclui a fase 1: assume a liderança com quórum de PROMISE ou encerra
+        a eleição quando o quórum se tornou impossível (rejeições ou falhas).
+        
+        Args:
+            proposal_number (int): Número de proposta da eleição
+            call (QuorumCall): Chamada concluída
+        """
+        with self.lock:
+            current = self.election_in_progress and self.election_proposal_number == proposal_number
+            if current:
+                # Encerrar a eleição; PROMISEs atrasados são descartados pelo QuorumCall
+                self.election_in_progress = False
+        
+        if not current:
+            return
+        
+        if call.succeeded:
+            self.logger.info(f"Quórum de PROMISE atingido para eleição!")
+            self._become_leader(proposal_number, dict(call.replies))
+        else:
+            self.logger.warning(f"Abortando eleição {proposal_number}: quórum de PROMISE impossível ({len(call.failures)} rejeições/falhas)")
+            
+            # Voltar a seguidor para que o monitor detecte a falha do líder (ex.: após
+            # o fim do lease) e tente de novo depois do backoff
+            with self.lock:
+                if self.state == ProposerState.CANDIDATE:
+                    self.state = ProposerState.FOLLOWER
+                self.backoff_time = time.time() + self.base_backoff + random.uniform(0, 1.0)
+    
+    def _become_leader(self, proposal_number, responses):
+        """
+        Assume a liderança após quórum de PROMISE e recupera os slots
+        que os acceptors já haviam aceitado (requisito de segurança do Paxos).
+        
+        Slots abaixo do commit_index informado pelos acceptors já foram escolhidos:
+        o valor de maior número de proposta do quórum é registrado sem nova rodada.
+        Apenas os demais são repropostos. O intervalo é lido em páginas: a primeira
+        vem no PROMISE, e as seguintes são buscadas por _recovery_loop.
+        
+        Args:
+            proposal_number (int): Número de proposta vencedor da fase 1
+            responses (dict): Respostas PROMISE do quórum {acceptor_id: resposta}
+        """
+        # Slots abaixo do low-water mark de algum acceptor já foram decididos e
+        # descartados do log: não são recuperados nem preenchidos com no-op
+        low_water_mark = max((acc_resp.get("low_water_mark", 0) for acc_resp in responses.values()), default=0)
+        chosen_index = max((acc_resp.get("commit_index", 0) for acc_resp in responses.values()), default=0)
+        highest_slots = [acc_resp["highest_slot"] for acc_resp in responses.values() if acc_resp.get("highest_slot") is not None]
+        
+        with self.lock:
+            self.leader_proposal_number = proposal_number
+            from_slot = max(self.election_from_slot, low_water_mark)
+            self.commit_index = max(self.commit_index, from_slot)
+            self.committed_values = {slot: value for slot, value in self.committed_values.items() if slot >= self.commit_index}
+            
+            # Slots abaixo de from_slot já são conhecidos; slots alocados antes e
+            # não aceitos por ninguém do quórum não foram escolhidos e podem ser reutilizados
+            recovery_end = max([from_slot] + [slot + 1 for slot in highest_slots])
+            self.recovery_cursor = from_slot
+            self.recovery_end = recovery_end
+            self.recovery_chosen = chosen_index
+            self.recovering_slots = set()
+            self.next_slot = recovery_end
+            self.state = ProposerState.LEADER
+        
+        # Primeira página: a que veio nos PROMISEs
+        page_end = min([recovery_end] + [acc_resp.get("accepted_to", recovery_end) for acc_resp in responses.values()])
+        self._recover_page(proposal_number, from_slot, page_end, [acc_resp.get("accepted") or {} for acc_resp in responses.values()])
+        
+        # Propostas que aguardavam na fila podem ser processadas
+        self.pending_proposals.notify()
+        
+        self.logger.info(f"Liderança estabelecida com proposta {proposal_number} (próximo slot: {recovery_end}, slots a recuperar: {from_slot}-{recovery_end - 1}, escolhidos abaixo de {chosen_index})")
+        
+        # Anunciar liderança aos acceptors e learners
+        self._send_accept_to_all(f"leader:{self.node_id}", None, True, proposal_number=proposal_number)
+        
+        # Atualizar gossip
+        self.gossip.set_leader(self.node_id)
+        self.gossip.update_local_metadata({
+            "is_leader": True,
+            "last_heartbeat": time.time()
+        })
+        
+        # Enviar heartbeat imediatamente para anunciar liderança e obter o lease
+        self._send_heartbeat_to_all_proposers(first_heartbeat=True)
+        self._renew_lease()
+        
+        # Páginas restantes, lidas dos mesmos acceptors que prometeram
+        if page_end < recovery_end:
+            threading.Thread(target=self._recovery_loop, args=(proposal_number, list(responses)), daemon=True).start()
+    
+    def _recover_page(self, proposal_number, start, end, pages):
+        """
+        Conclui a recuperação dos slots [start, end) a partir dos valores aceitos
+        pelo quórum de PROMISE. Slots já escolhidos são registrados diretamente;
+        os demais são repropostos (lacunas com no-op) em um único /accept-batch.
+        
+        Args:
+            proposal_number (int): Número de proposta da liderança
+            start (int): Primeiro slot da página
+            end (int): Fim (exclusivo) da página
+            pages (list): Valores aceitos por acceptor, {slot: entrada}
+        
+        Returns:
+            bool: False se a liderança foi perdida
+        """
+        # Para cada slot, o valor aceito com maior número de proposta
+        recovered = {}
+        for accepted in pages:
+            for slot_key, entry in accepted.items():
+                slot = int(slot_key)
+                if not start <= slot < end:
+                    continue
+                if slot not in recovered or entry["proposal_number"] > recovered[slot]["proposal_number"]:
+                    recovered[slot] = entry
+        
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        reproposed = []
+        
+        with self.lock:
+            if self.leader_proposal_number != proposal_number:
+                return False
+            
+            for slot in range(start, end):
+                entry = recovered.get(slot)
+                if entry is not None and slot < self.recovery_chosen:
+                    # Escolhido: todo quórum de fase 1 contém o valor escolhido com o maior número
+                    self._mark_committed(slot, entry["value"])
+                    self.metrics["recovered_chosen"] += 1
+                    continue
+                
+                # Lacunas sem valor aceito no quórum nunca foram escolhidas: preenchê-las
+                # com no-op para que os learners tenham todos os slots do log
+                if entry is None:
+                    entry = {"value": f"noop:{self.node_id}", "client_id": None}
+                
+                # Slots recuperados viram instâncias acompanhadas, fora do limite da janela
+                self._register_instance(slot, entry["value"], entry.get("client_id"), len(acceptors))
+                self.recovering_slots.add(slot)
+                reproposed.append((slot, entry["value"], entry.get("client_id"), set()))
+            
+            self.recovery_cursor = max(self.recovery_cursor, end)
+            self.metrics["recovered_reproposed"] += len(reproposed)
+        
+        # Completar slots que podem ter ficado sem decisão com o líder anterior,
+        # em uma única requisição /accept-batch por acceptor
+        if reproposed:
+            self.logger.info(f"Repropondo {len(reproposed)} valores recuperados (slots {reproposed[0][0]}-{reproposed[-1][0]})")
+            self._send_accept_batch(reproposed, proposal_number)
+        
+        return True
+    
+    def _recovery_loop(self, proposal_number, acceptor_ids):
+        """
+        Lê, página a página, os valores aceitos que não couberam nos PROMISEs, dos
+        mesmos acceptors que prometeram. Sem resposta de algum deles, a liderança
+        é abandonada, pois a recuperação exige os valores de todo o quórum.
+        
+        Args:
+            proposal_number (int): Número de proposta da liderança
+            acceptor_ids (list): IDs dos acceptors do quórum de PROMISE
+        """
+        while True:
+            with self.lock:
+                if self.leader_proposal_number != proposal_number:
+                    return
+                start, end = self.recovery_cursor, self.recovery_end
+            
+            if start >= end:
+                break
+            
+            acceptors = self.gossip.get_nodes_by_role('acceptor')
+            pages = []
+            page_end = end
+            
+            for acceptor_id in acceptor_ids:
+                result = self._fetch_accepted(acceptors.get(acceptor_id), start, end)
+                if result is None:
+                    self.logger.error(f"Recuperação dos slots a partir de {start} falhou: acceptor {acceptor_id} não respondeu")
+                    self._step_down("Recovery of previous slots failed")
+                    return
+                
+                page_end = min(page_end, result["to_slot"])
+                pages.append({
+                    notification["slot"]: {
+                        "proposal_number": notification["proposal_number"],
+                        "value": notification["value"],
+                        "client_id": notification["client_id"]
+                    } for notification in result["notifications"]
+                })
+            
+            if not self._recover_page(proposal_number, start, page_end, pages):
+                return
+        
+        self.logger.info(f"Recuperação concluída até o slot {end - 1}")
+    
+    def _fetch_accepted(self, acceptor, start, end, attempts=3):
+        """
+        Busca em um acceptor os valores aceitos a partir de start (uma página de /slots).
+        
+        Returns:
+            dict: Resposta de /slots, ou None se o acceptor não respondeu
+        """
+        if acceptor is None:
+            return None
+        
+        for attempt in range(attempts):
+            try:
+                response = requests.get(self._node_url(acceptor, '/slots'),
+                                        params={"from_slot": start, "to_slot": end}, timeout=5)
+                if response.status_code == 200:
+                    return response.json()
+            except Exception as e:
+                self.logger.warning(f"Erro ao buscar slots {start}-{end - 1} (tentativa {attempt + 1}): {e}")
+            time.sleep(0.2 * (attempt + 1))
+        
+        return None
+    
+    def _step_down(self, reason):
+        """
+        Abandona a liderança quando um acceptor informa número de proposta maior.
+        As instâncias em andamento são descartadas: o novo líder recupera os
+        valores já aceitos na sua fase 1. Requisições síncronas ainda na fila
+        recebem o erro imediatamente, para que o cliente tente no novo líder.
+        
+        Args:
+            reason (str): Motivo informado pelo acceptor
+        """
+        with self.lock:
+            if self.leader_proposal_number is None:
+                return
+            self.leader_proposal_number = None
+            self.lease_expiry = 0
+            abandoned = self.instances
+            self.instances = {}
+            if self.state == ProposerState.LEADER:
+                self.state = ProposerState.FOLLOWER
+        
+        for instance in abandoned.values():
+            self._resolve_waiters(instance["waiters"], error=reason)
+        
+        # Propostas assíncronas continuam na fila (processadas se voltar a ser líder)
+        queued = self.pending_proposals.drain(lambda proposal: proposal.get('waiter') is not None)
+        self._resolve_waiters([proposal['waiter'] for proposal in queued], error=reason)
+        
+        self.logger.warning(f"Deixando a liderança ({len(abandoned)} instâncias abandonadas, {len(queued)} propostas síncronas devolvidas): {reason}")
+    
+    def _record_accept_reply(self, slot, proposal_number, acceptor_id):
+        """
+        Registra um ACCEPTED de um acceptor e encerra a instância ao atingir quórum.
+        
+        Args:
+            slot (int): Slot do log
+            proposal_number (int): Número de proposta do ACCEPT
+            acceptor_id (str): ID do acceptor que aceitou
+        """
+        with self.lock:
+            instance = self.instances.get(slot)
+            if instance is None or instance["proposal_number"] != proposal_number:
+                return
+            
+            instance["accepted_by"].add(acceptor_id)
+            chosen = len(instance["accepted_by"]) >= instance["quorum_size"]
+            
+            if chosen:
+                del self.instances[slot]
+                self._mark_committed(slot, instance["value"])
+                self.recovering_slots.discard(slot)
+                self.metrics["chosen_count"] += 1
+                latency = time.time() - instance["started_at"]
+                self.commit_latency_avg = latency if not self.commit_latency_avg else 0.9 * self.commit_latency_avg + 0.1 * latency
+        
+        if chosen:
+            self.logger.info(f"Slot {slot} escolhido em {latency * 1000:.1f}ms ({len(instance['accepted_by'])}/{instance['quorum_size']})")
+            self._resolve_waiters(instance["waiters"])
+            
+            # Um slot da janela foi liberado: acordar o processador de propostas
+            self.pending_proposals.notify()
+    
+    def _mark_committed(self, slot, value):
+        """
+        Registra o valor escolhido de um slot e avança commit_index, descartando
+        os slots que passam a ficar abaixo dele.
+        Deve ser chamado com self.lock adquirido.
+        
+        Args:
+            slot (int): Slot do log
+            value: Valor escolhido (string "noop:" para lacuna preenchida)
+        """
+        if slot < self.commit_index:
+            return
+        self.committed_values[slot] = value
+        while self.commit_index in self.committed_values:
+            del self.committed_values[self.commit_index]
+            self.commit_index += 1
+    
+    def _renew_lease(self):
+        """
+        Solicita aos acceptors a renovação do lease do líder. O lease vale a partir
+        do envio (antes de qualquer acceptor concedê-lo), descontada a margem de
+        desvio de relógio, e portanto expira no líder antes de expirar nos acceptors.
+        """
+        proposal_number = self.leader_proposal_number
+        if self.state != ProposerState.LEADER or proposal_number is None:
+            return
+        
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        sent_at = time.time()
+        
+        lease_data = {
+            "leader_id": self.node_id,
+            "timestamp": sent_at,
+            "proposal_number": proposal_number,
+            "lease_duration": self.lease_duration,
+            "commit_index": self.commit_index
+        }
+        
+        self.fanout.quorum(
+            acceptors, "/heartbeat", lease_data, self.quorum.phase2_size(len(acceptors)),
+            is_success=lambda result: result.get("lease_granted", False),
+            on_complete=lambda call: self._on_lease_complete(proposal_number, sent_at, call),
+            max_retries=1
+        )
+    
+    def _on_lease_complete(self, proposal_number, sent_at, call):
+        """
+        Atualiza o lease do líder após a resposta do quórum de acceptors.
+        
+        Args:
+            proposal_number (int): Número de proposta da liderança
+            sent_at (float): Momento do envio do pedido de lease
+            call (QuorumCall): Chamada concluída
+        """
+        with self.lock:
+            if call.succeeded and self.leader_proposal_number == proposal_number:
+                self.lease_expiry = max(self.lease_expiry, sent_at + self.lease_duration * (1 - self.lease_drift))
+                self.lease_ballot = proposal_number
+                self.metrics["lease_renewals"] += 1
+            else:
+                self.metrics["lease_failures"] += 1
+        
+        if not call.succeeded:
+            self.logger.warning(f"Lease não renovado: {len(call.failures)} acceptors recusaram ou não responderam")
+    
+    def _lease_valid(self):
+        """
+        Verifica se o líder possui lease válido para a liderança atual.
+        Deve ser chamado com self.lock adquirido.
+        """
+        return (self.state == ProposerState.LEADER and self.leader_proposal_number is not None
+                and self.lease_ballot == self.leader_proposal_number and time.time() < self.lease_expiry)
+    
+    def _read_index_locked(self):
+        """
+        Índice de leitura: todo valor já escolhido (inclusive acima de lacunas em
+        andamento e nos slots ainda em recuperação) fica abaixo dele.
+        Deve ser chamado com self.lock adquirido.
+        """
+        highest_chosen = max(self.committed_values) + 1 if self.committed_values else 0
+        return max(self.commit_index, highest_chosen, self.recovery_end)
+    
+    def _handle_read(self):
+        """
+        Leitura linear por lease: o líder com lease válido informa o índice de
+        leitura sem rodada de heartbeat. Durante o lease nenhum outro proposer
+        consegue PROMISE de um quórum, portanto nenhum valor é escolhido sem este
+        líder. Os valores são lidos de um learner que tenha aplicado todos os
+        slots abaixo do índice.
+        
+        Returns:
+            Response: Resposta HTTP com read_index
+        """
+        if self.state != ProposerState.LEADER:
+            return jsonify({
+                "error": "Not the leader",
+                "current_leader": self.current_leader,
+                "retry_suggested": True
+            }), 409
+        
+        with self.lock:
+            if not self._lease_valid():
+                return jsonify({"error": "Leader lease not held", "retry_suggested": True}), 503
+            
+            # Slots recuperados de líderes anteriores precisam ser concluídos primeiro
+            if self.recovering_slots or self.recovery_cursor < self.recovery_end:
+                return jsonify({
+                    "error": "Leader recovering previous slots",
+                    "recovering_slots": len(self.recovering_slots) + self.recovery_end - self.recovery_cursor,
+                    "retry_suggested": True
+                }), 503
+            
+            read_index = self._read_index_locked()
+            lease_remaining = self.lease_expiry - time.time()
+            commit_index = self.commit_index
+            self.metrics["lease_reads"] += 1
+        
+        return jsonify({
+            "read_index": read_index,
+            "commit_index": commit_index,
+            "consistency": "lease",
+            "leader_id": self.node_id,
+            "lease_remaining_ms": lease_remaining * 1000
+        }), 200
+    
+    def _handle_read_index(self):
+        """
+        Protocolo read-index: informa o índice que um learner deve ter aplicado
+        para servir uma leitura linear. O índice é registrado antes de confirmar
+        a liderança com uma rodada de heartbeat a um quórum de acceptors.
+        
+        Returns:
+            Response: Resposta HTTP com read_index
+        """
+        if self.state != ProposerState.LEADER or self.leader_proposal_number is None:
+            return jsonify({
+                "error": "Not the leader",
+                "current_leader": self.current_leader,
+                "retry_suggested": True
+            }), 409
+        
+        with self.lock:
+            proposal_number = self.leader_proposal_number
+            read_index = self._read_index_locked()
+            self.metrics["read_index_requests"] += 1
+        
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        heartbeat_data = {
+            "leader_id": self.node_id,
+            "timestamp": time.time(),
+            "proposal_number": proposal_number
+        }
+        
+        # Confirmar que nenhum acceptor do quórum prometeu a um número maior
+        call = self.fanout.quorum(
+            acceptors, "/heartbeat", heartbeat_data, self.quorum.phase2_size(len(acceptors)),
+            is_success=lambda result: result.get("max_promised", proposal_number + 1) <= proposal_number,
+            max_retries=1
+        )
+        
+        if not call.wait(timeout=3.0):
+            self.logger.warning(f"Read-index não confirmado: {len(call.failures)} acceptors recusaram ou não responderam")
+            return jsonify({"error": "Leadership not confirmed", "retry_suggested": True}), 503
+        
+        return jsonify({
+            "read_index": read_index,
+            "leader_id": self.node_id,
+            "proposal_number": proposal_number
+        }), 200
+    
+    def _send_accept_to_all(self, value, client_id, is_leader_election, slot=None, proposal_number=None, exclude=None):
+        """
+        Envia mensagens ACCEPT para todos os acceptors (fase 2 do Paxos).
+        
+        Args:
+            value (str): Valor a propor
+            client_id (int): ID do cliente
+            is_leader_election (bool): Se é eleição de líder
+            slot (int, optional): Slot do log (None para anúncio de eleição)
+            proposal_number (int, optional): Número de proposta (padrão: o da liderança)
+            exclude (set, optional): IDs de acceptors que não precisam receber o ACCEPT
+        
+        Returns:
+            bool: True se algum acceptor foi contatado
+        """
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        phase2_quorum = self.quorum.phase2_size(len(acceptors))
+        if proposal_number is None:
+            proposal_number = self.leader_proposal_number
+        if exclude:
+            acceptors = {k: v for k, v in acceptors.items() if k not in exclude}
+        
+        if not acceptors:
+            return False
+        
+        self.logger.info(f"Enviando ACCEPT para {len(acceptors)} acceptors com valor: {value}")
+        
+        accept_data = {
+            "proposer_id": self.node_id,
+            "proposal_number": proposal_number,
+            "slot": slot,
+            "value": value,
+            "client_id": client_id,
+            "is_leader_election": is_leader_election
+        }
+        
+        # Quórum ainda necessário; ao atingi-lo, respostas atrasadas são ignoradas
+        # e reenvios pendentes cancelados
+        with self.lock:
+            instance = self.instances.get(slot) if slot is not None else None
+            if instance is not None:
+                needed = instance["quorum_size"] - len(instance["accepted_by"])
+            else:
+                needed = phase2_quorum
+        
+        self.fanout.quorum(
+            acceptors, "/accept", accept_data, max(1, min(needed, len(acceptors))),
+            is_success=lambda result: result.get("status") == "accepted",
+            on_reply=lambda acceptor_id, result, ok: self._on_accept_reply(accept_data, acceptor_id, result, ok),
+            thrifty=self.thrifty
+        )
+        
+        return True
+    
+    def _on_accept_reply(self, data, acceptor_id, result, ok):
+        """
+        Processa a resposta de um acceptor ao ACCEPT.
+        
+        Args:
+            data (dict): Dados do ACCEPT
+            acceptor_id (str): ID do acceptor
+            result (dict): Resposta do acceptor
+            ok (bool): Se o acceptor aceitou
+        """
+        if ok:
+            self.logger.debug(f"ACCEPT aceito pelo acceptor {acceptor_id} (slot {data.get('slot')})")
+            with self.lock:
+                self.metrics["accept_count"] += 1
+            
+            if data.get("slot") is not None:
+                self._record_accept_reply(data["slot"], data["proposal_number"], acceptor_id)
+        else:
+            reason = result.get("message", "Sem motivo informado")
+            self.logger.warning(f"ACCEPT rejeitado: {reason}")
+            with self.lock:
+                self.metrics["reject_count"] += 1
+            
+            promised_ballot = self._observe_promised_ballot(result)
+            
+            # Outro proposer venceu uma fase 1 com número maior
+            if promised_ballot > data["proposal_number"] and data["proposal_number"] == self.leader_proposal_number:
+                self._step_down(reason)
+    
+    def _observe_promised_ballot(self, result):
+        """
+        Avança o contador de propostas para além do maior número prometido
+        informado numa rejeição, para que a próxima eleição já use um número
+        maior em vez de subir de um em um.
+        
+        Args:
+            result (dict): Resposta de rejeição do acceptor
+        
+        Returns:
+            int: Número prometido informado pelo acceptor (0 se ausente)
+        """
+        promised_ballot = result.get("promised_ballot")
+        if not isinstance(promised_ballot, int):
+            return 0
+        
+        with self.lock:
+            # Números de proposta são contador * 100 + ID
+            promised_counter = promised_ballot // 100
+            jumped = promised_counter > self.proposal_counter
+            if jumped:
+                self.proposal_counter = promised_counter
+                self.metrics["ballot_jumps"] += 1
+        
+        if jumped:
+            self.logger.info(f"Contador de propostas avançado para {promised_counter} (acceptor prometeu {promised_ballot})")
+        
+        return promised_ballot
+    
+    def _send_heartbeat_to_all_proposers(self, first_heartbeat=False):
+        """
+        Envia heartbeats para todos os outros proposers.
+        
+        Args:
+            first_heartbeat (bool): Se é o primeiro heartbeat após eleição
+        """
+        if self.state != ProposerState.LEADER:
+            return
+        
+        proposers = self.gossip.get_nodes_by_role('proposer')
+        current_time = time.time()
+        
+        heartbeat_data = {
+            "leader_id": self.node_id,
+            "timestamp": current_time,
+            "first_heartbeat": first_heartbeat
+        }
+        
+        # Não enviar para si mesmo
+        others = {pid: p for pid, p in proposers.items() if pid != str(self.node_id)}
+        self.fanout.broadcast(others, "/heartbeat", heartbeat_data, timeout=1)
+    
+    def _start_election(self):
+        """
+        Inicia o processo de eleição de líder.
+        
+        Returns:
+            bool: True se a eleição foi iniciada, False caso contrário
+        """
+        with self.lock:
+            # Verificar se já estamos em eleição
+            if self.election_in_progress:
+                self.logger.info("Eleição já em andamento, ignorando solicitação")
+                return False
+            
+            # Marcar como em eleição
+            self.election_in_progress = True
+            self.election_start_time = time.time()
+            self.metrics["election_count"] += 1
+            
+            # Mudar estado para CANDIDATE
+            self.state = ProposerState.CANDIDATE
+            
+            # Uma nova fase 1 invalida o número de proposta da liderança anterior
+            self.leader_proposal_number = None
+            self.lease_expiry = 0
+            abandoned = self.instances
+            self.instances = {}
+            
+            # Gerar número de proposta para eleição: contador * 100 + ID
+            # O ID nas unidades garante unicidade entre proposers
+            self.proposal_counter += 1
+            self.election_proposal_number = self.proposal_counter * 100 + self.node_id
+            proposal_counter = self.proposal_counter
+            previous_call = self.election_call
+        
+        # Persistir o contador antes de enviar o PREPARE: após um reinício o proposer
+        # retoma a partir dele em vez de repetir números já usados
+        self._save_state(self.ballot_file, {"proposal_counter": proposal_counter})
+        
+        # Respostas da eleição anterior (que expirou) não são mais necessárias
+        if previous_call is not None:
+            previous_call.cancel()
+        
+        for instance in abandoned.values():
+            self._resolve_waiters(instance["waiters"], error="new election started")
+        
+        self.logger.info(f"Iniciando eleição com proposta número {self.election_proposal_number}")
+        
+        # Iniciar processo Multi-Paxos para eleição
+        self._process_proposal(f"leader:{self.node_id}", None, is_leader_election=True)
+        
+        return True
+    
+    def _handle_view_logs(self):
+        """
+        Fornece logs e estado interno para debugging.
+        """
+        acceptors = self.gossip.get_nodes_by_role('acceptor')
+        learners = self.gossip.get_nodes_by_role('learner')
+        
+        return jsonify({
+            "id": self.node_id,
+            "role": self.node_role,
+            "state": self.state.value,
+            "is_leader": self.state == ProposerState.LEADER,
+            "current_leader": self.current_leader, 
+            "election_in_progress": self.election_in_progress,
+            "bootstrap_completed": self.bootstrap_completed,
+            "proposal_counter": self.proposal_counter,
+            "leader_proposal_number": self.leader_proposal_number,
+            "next_slot": self.next_slot,
+            "acceptors_count": len(acceptors),
+            "learners_count": len(learners),
+            "known_nodes_count": len(self.gossip.get_all_nodes()),
+            "pending_proposals": len(self.pending_proposals),
+            "metrics": self.metrics,
+            "pipeline": self._pipeline_summary(),
+            "current_proposal": self._current_proposal_summary(),
+            "recent_proposals": self.proposal_history[-5:] if self.proposal_history else []
+        }), 200
+
+# Para uso como aplicação independente
+if __name__ == '__main__':
+    proposer = Proposer()
     proposer.start()
\ No newline at end of file
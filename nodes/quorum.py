@@ -0,0 +1,116 @@
+import os
+
+class QuorumPolicy:
+    """
+    Tamanhos de quórum das duas fases do Paxos, compartilhados por proposers e learners.
+    
+    Por padrão ambas as fases usam maioria simples dos acceptors conhecidos.
+    Com Flexible Paxos, a fase 1 (PREPARE, apenas em eleições) e a fase 2
+    (ACCEPT, em todo commit) podem ter tamanhos diferentes, desde que todo
+    quórum de fase 1 intercepte todo quórum de fase 2: |Q1| + |Q2| > N.
+    """
+    
+    def __init__(self, acceptor_count=None, phase1_size=None, phase2_size=None):
+        """
+        Inicializa e valida a política.
+        
+        Args:
+            acceptor_count (int, optional): Número total de acceptors (N); obrigatório com quóruns fixos
+            phase1_size (int, optional): Tamanho do quórum de fase 1 (Q1)
+            phase2_size (int, optional): Tamanho do quórum de fase 2 (Q2)
+        
+        Raises:
+            ValueError: Se a combinação não garante interseção entre as fases
+        """
+        self.acceptor_count = acceptor_count
+        self.phase1 = phase1_size
+        self.phase2 = phase2_size
+        
+        if acceptor_count is not None:
+            # Quórum omitido: o menor tamanho que ainda intercepta o da outra fase
+            if self.phase1 is None and self.phase2 is not None:
+                self.phase1 = acceptor_count - self.phase2 + 1
+            elif self.phase2 is None and self.phase1 is not None:
+                self.phase2 = acceptor_count - self.phase1 + 1
+        
+        self.validate()
+    
+    @classmethod
+    def from_env(cls):
+        """
+        Cria a política a partir de ACCEPTOR_COUNT, PHASE1_QUORUM e PHASE2_QUORUM.
+        
+        Returns:
+            QuorumPolicy: Política configurada
+        """
+        def read(name):
+            value = os.environ.get(name)
+            return int(value) if value else None
+        
+        return cls(read('ACCEPTOR_COUNT'), read('PHASE1_QUORUM'), read('PHASE2_QUORUM'))
+    
+    def validate(self):
+        """
+        Verifica a configuração.
+        
+        Raises:
+            ValueError: Se a configuração é inválida
+        """
+        n = self.acceptor_count
+        
+        if n is None:
+            if self.phase1 is not None or self.phase2 is not None:
+                raise ValueError("PHASE1_QUORUM/PHASE2_QUORUM exigem ACCEPTOR_COUNT")
+            return
+        
+        if n < 1:
+            raise ValueError(f"ACCEPTOR_COUNT deve ser positivo: {n}")
+        
+        if self.phase1 is None:
+            self.phase1 = self.phase2 = n // 2 + 1
+        
+        for name, size in (("PHASE1_QUORUM", self.phase1), ("PHASE2_QUORUM", self.phase2)):
+            if not 1 <= size <= n:
+                raise ValueError(f"{name}={size} fora do intervalo [1, {n}]")
+        
+        if self.phase1 + self.phase2 <= n:
+            raise ValueError(
+                f"Quóruns sem interseção: PHASE1_QUORUM ({self.phase1}) + PHASE2_QUORUM ({self.phase2}) "
+                f"deve ser maior que ACCEPTOR_COUNT ({n})"
+            )
+    
+    def phase1_size(self, available):
+        """
+        Tamanho do quórum de PREPARE/PROMISE.
+        
+        Args:
+            available (int): Acceptors conhecidos (usado quando N não é configurado)
+        """
+        return self.phase1 if self.phase1 is not None else available // 2 + 1
+    
+    def phase2_size(self, available):
+        """
+        Tamanho do quórum de ACCEPT/ACCEPTED. Também serve para o lease e para
+        a confirmação do read-index, que precisam interceptar todo quórum de fase 1.
+        
+        Args:
+            available (int): Acceptors conhecidos (usado quando N não é configurado)
+        """
+        return self.phase2 if self.phase2 is not None else available // 2 + 1
+    
+    def describe(self, available):
+        """
+        Resume a política para o endpoint de status.
+        
+        Args:
+            available (int): Acceptors conhecidos
+        
+        Returns:
+            dict: N configurado e tamanhos efetivos das duas fases
+        """
+        return {
+            "acceptor_count": self.acceptor_count,
+            "flexible": self.phase1 is not None and self.phase1 != self.phase2,
+            "phase1": self.phase1_size(available),
+            "phase2": self.phase2_size(available)
+        }
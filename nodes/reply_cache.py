@@ -0,0 +1,143 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class ReplyCache:
+    """
+    Cache de respostas do acceptor para PREPARE/ACCEPT repetidos (reenvios do
+    proposer), com política LRU, tempo de vida e limite de memória.
+    
+    As chaves têm tamanho fixo: (tipo, proposer, número de proposta, slot e um
+    hash de 8 bytes do valor), em vez de embutir o valor inteiro. As respostas
+    são guardadas já serializadas, prontas para serem devolvidas.
+    
+    A ordem LRU muda a cada acerto, então a expiração percorre um segundo índice,
+    em ordem de inserção (a mesma ordem de vencimento, pois o TTL é fixo): toda
+    entrada expirada é removida na próxima inserção, mesmo atrás de uma usada
+    recentemente.
+    """
+    
+    # Custo aproximado, em bytes, de uma entrada além do corpo da resposta
+    # (tupla da chave, nós dos dois OrderedDicts e registro da entrada)
+    ENTRY_OVERHEAD = 300
+    
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=60.0):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_bytes (int): Memória máxima estimada das entradas
+            ttl (float): Tempo de vida de uma entrada em segundos
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()   # {chave: (corpo, instante de inserção)}, em ordem LRU
+        self.inserted = OrderedDict()  # {chave: instante de inserção}, em ordem de inserção
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+    
+    @staticmethod
+    def make_key(kind, proposer_id, proposal_number, slot=None, value=None):
+        """
+        Monta uma chave de tamanho fixo para uma mensagem.
+        
+        Args:
+            kind (str): "prepare" ou "accept"
+            proposer_id (int): ID do proposer
+            proposal_number (int): Número de proposta
+            slot (int, optional): Slot (ou from_slot no PREPARE)
+            value (optional): Valor proposto, representado apenas pelo hash
+        
+        Returns:
+            tuple: Chave do cache
+        """
+        value_hash = None
+        if value is not None:
+            encoded = json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8')
+            value_hash = hashlib.blake2b(encoded, digest_size=8).digest()
+        return (kind, proposer_id, proposal_number, slot, value_hash)
+    
+    def get(self, key):
+        """
+        Retorna a resposta serializada de uma chave, ou None.
+        """
+        now = time.time()
+        
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            
+            body, inserted_at = entry
+            if now - inserted_at > self.ttl:
+                self._remove(key)
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return body
+    
+    def put(self, key, body):
+        """
+        Armazena uma resposta serializada, descartando entradas expiradas e as
+        menos usadas recentemente até caber no limite de memória.
+        
+        Args:
+            key (tuple): Chave de make_key()
+            body (bytes): Corpo da resposta
+        """
+        size = len(body) + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        
+        now = time.time()
+        
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            
+            # Entradas expiradas, das mais antigas para as mais novas
+            while self.inserted:
+                oldest_key, inserted_at = next(iter(self.inserted.items()))
+                if now - inserted_at <= self.ttl:
+                    break
+                self._remove(oldest_key)
+                self.stats["expirations"] += 1
+            
+            while self.entries and self.bytes + size > self.max_bytes:
+                oldest_key = next(iter(self.entries))
+                self._remove(oldest_key)
+                self.stats["evictions"] += 1
+            
+            self.entries[key] = (body, now)
+            self.inserted[key] = now
+            self.bytes += size
+    
+    def _remove(self, key):
+        body, _ = self.entries.pop(key)
+        del self.inserted[key]
+        self.bytes -= len(body) + self.ENTRY_OVERHEAD
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def summary(self):
+        """
+        Resume ocupação e contadores para o endpoint de status.
+        """
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                **self.stats
+            }
@@ -0,0 +1,293 @@
+import bisect
+import json
+import mmap
+import os
+from array import array
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+class _Segment:
+    """
+    Arquivo de um segmento: valores consecutivos a partir de base, um por linha.
+    """
+    
+    def __init__(self, base, path):
+        self.base = base               # Índice global do primeiro valor do segmento
+        self.path = path
+        self.offsets = array('Q')      # Posição de cada valor no arquivo
+        self.size = 0                  # Bytes válidos do arquivo
+        self.file = None               # Handle de escrita (apenas no segmento ativo)
+        self.map = None                # Mapeamento somente leitura
+        self.mapped_size = 0
+    
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+            self.mapped_size = 0
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class SegmentLog:
+    """
+    Log append-only dos valores aplicados pelo learner, em disco.
+    
+    Os valores são gravados como JSON, um por linha, em segmentos de até
+    segment_bytes (arquivos <índice do primeiro valor>.log). Um índice de
+    deslocamentos por segmento localiza qualquer valor em O(1), e as leituras
+    usam mmap: intervalos são devolvidos como bytes de um array JSON, montados
+    a partir das fatias mapeadas, sem criar um objeto Python por valor. Apenas
+    o índice (8 bytes por valor) fica na memória do processo.
+    
+    Ao abrir, o índice é reconstruído a partir dos arquivos, e um último valor
+    gravado pela metade (queda durante a escrita) é descartado.
+    
+    Não é thread-safe: deve ser usado com o lock do learner adquirido.
+    """
+    
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024):
+        """
+        Abre (ou cria) o log.
+        
+        Args:
+            directory (str): Diretório dos segmentos
+            segment_bytes (int): Tamanho a partir do qual um novo segmento é iniciado
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segments = []
+        self.count = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+    
+    def __len__(self):
+        return self.count
+    
+    def _load(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith('.log'))
+        for name in names:
+            segment = _Segment(int(name[:-4]), os.path.join(self.directory, name))
+            
+            # Segmentos devem ser contíguos; os que não forem (restos de um
+            # truncamento interrompido) são descartados
+            if segment.base != self.count:
+                os.unlink(segment.path)
+                continue
+            
+            self._scan(segment)
+            self.segments.append(segment)
+            self.count += len(segment.offsets)
+        
+        if self.segments:
+            active = self.segments[-1]
+            active.file = open(active.path, 'ab')
+    
+    def _scan(self, segment):
+        """
+        Reconstrói o índice de um segmento e descarta uma linha incompleta no fim.
+        """
+        size = os.path.getsize(segment.path)
+        position = 0
+        
+        if size > 0:
+            with open(segment.path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    while True:
+                        newline = data.find(b"\n", position)
+                        if newline < 0:
+                            break
+                        segment.offsets.append(position)
+                        position = newline + 1
+        
+        if position < size:
+            os.truncate(segment.path, position)
+        segment.size = position
+    
+    def _new_segment(self):
+        if self.segments:
+            previous = self.segments[-1]
+            previous.file.flush()
+            os.fsync(previous.file.fileno())
+            previous.file.close()
+            previous.file = None
+        
+        segment = _Segment(self.count, os.path.join(self.directory, f"{self.count:020d}.log"))
+        segment.file = open(segment.path, 'ab')
+        self.segments.append(segment)
+        return segment
+    
+    def append(self, value):
+        """
+        Acrescenta um valor ao fim do log.
+        
+        Args:
+            value: Valor serializável em JSON
+        
+        Returns:
+            int: Índice do valor
+        """
+        record = _encoder.encode(value).encode('utf-8') + b"\n"
+        
+        segment = self.segments[-1] if self.segments else None
+        if segment is None or (segment.size > 0 and segment.size + len(record) > self.segment_bytes):
+            segment = self._new_segment()
+        
+        segment.file.write(record)
+        segment.offsets.append(segment.size)
+        segment.size += len(record)
+        self.count += 1
+        return self.count - 1
+    
+    def flush(self):
+        """
+        Entrega ao sistema operacional os valores acrescentados (sobrevive à queda
+        do processo, não à do sistema).
+        """
+        if self.segments and self.segments[-1].file is not None:
+            self.segments[-1].file.flush()
+    
+    def sync(self):
+        """
+        Grava em disco (fsync) os valores acrescentados ao segmento ativo.
+        """
+        if self.segments and self.segments[-1].file is not None:
+            active = self.segments[-1]
+            active.file.flush()
+            os.fsync(active.file.fileno())
+    
+    def sync_target(self):
+        """
+        Entrega ao sistema operacional os valores acrescentados e devolve o caminho
+        do segmento ativo, cujo fsync (sync_path) pode ser feito depois, sem o lock
+        do learner: os segmentos anteriores já foram sincronizados ao serem fechados.
+        
+        Returns:
+            str: Caminho do segmento ativo, ou None se o log está vazio
+        """
+        self.flush()
+        return self.segments[-1].path if self.segments else None
+    
+    @staticmethod
+    def sync_path(path):
+        """
+        Grava em disco (fsync) um segmento devolvido por sync_target. Não usa o
+        estado do log, então pode ser chamado sem o lock do learner.
+        
+        Raises:
+            OSError: Se o segmento não existe mais (log truncado ou substituído)
+        """
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _mapped(self, segment):
+        # O segmento ativo cresce: o mapeamento é refeito quando não cobre mais os dados
+        if segment.mapped_size < segment.size:
+            if segment.file is not None:
+                segment.file.flush()
+            if segment.map is not None:
+                segment.map.close()
+            with open(segment.path, 'rb') as f:
+                segment.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            segment.mapped_size = segment.size
+        return segment.map
+    
+    def read_json(self, start, end):
+        """
+        Lê os valores no intervalo [start, end) como um array JSON.
+        
+        Args:
+            start (int): Primeiro índice
+            end (int): Fim (exclusivo); limitado ao tamanho do log
+        
+        Returns:
+            bytes: Array JSON com os valores
+        """
+        start = max(0, start)
+        end = min(end, self.count)
+        if start >= end:
+            return b"[]"
+        
+        chunks = []
+        position = bisect.bisect_right([segment.base for segment in self.segments], start) - 1
+        for segment in self.segments[position:]:
+            if segment.base >= end:
+                break
+            
+            first = max(start, segment.base) - segment.base
+            last = min(end, segment.base + len(segment.offsets)) - segment.base
+            begin = segment.offsets[first]
+            finish = segment.offsets[last] if last < len(segment.offsets) else segment.size
+            chunks.append(self._mapped(segment)[begin:finish])
+        
+        # Cada linha é um valor JSON: trocar as quebras de linha por vírgulas forma o array
+        data = b"".join(chunks)
+        return b"[" + data[:-1].replace(b"\n", b",") + b"]"
+    
+    def read(self, start, end):
+        """
+        Lê os valores no intervalo [start, end) como objetos Python (leituras pequenas).
+        """
+        return json.loads(self.read_json(start, end))
+    
+    def truncate(self, count):
+        """
+        Descarta os valores a partir do índice count.
+        
+        Args:
+            count (int): Número de valores mantidos
+        """
+        if count >= self.count:
+            return
+        
+        while self.segments and self.segments[-1].base >= count and (count > 0 or len(self.segments) > 1):
+            segment = self.segments.pop()
+            segment.close()
+            os.unlink(segment.path)
+        
+        if self.segments:
+            segment = self.segments[-1]
+            segment.close()
+            keep = count - segment.base
+            size = segment.offsets[keep] if keep < len(segment.offsets) else segment.size
+            os.truncate(segment.path, size)
+            del segment.offsets[keep:]
+            segment.size = size
+            segment.file = open(segment.path, 'ab')
+        
+        self.count = count
+    
+    def move(self, directory):
+        """
+        Renomeia o diretório do log, mantendo arquivos e mapeamentos abertos:
+        apenas os caminhos dos segmentos mudam, sem reconstruir o índice.
+        
+        Args:
+            directory (str): Novo diretório (não deve existir)
+        """
+        os.replace(self.directory, directory)
+        for segment in self.segments:
+            segment.path = os.path.join(directory, os.path.basename(segment.path))
+        self.directory = directory
+    
+    def close(self):
+        """
+        Fecha os arquivos e mapeamentos dos segmentos.
+        """
+        for segment in self.segments:
+            segment.close()
+    
+    def summary(self):
+        """
+        Resume o log para o endpoint de status.
+        """
+        return {
+            "values": self.count,
+            "segments": len(self.segments),
+            "bytes": sum(segment.size for segment in self.segments),
+            "segment_bytes": self.segment_bytes
+        }
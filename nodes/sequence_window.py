@@ -0,0 +1,75 @@
+class SequenceWindow:
+    """
+    Detecção de notificações repetidas por acceptor, a partir da sequência (seq)
+    crescente que cada acceptor atribui às suas notificações.
+    
+    Para cada acceptor são mantidos apenas a maior seq vista e um bitmap das
+    últimas `size` seqs abaixo dela, o que tolera pequenas inversões de ordem.
+    Seqs mais antigas que a janela são tratadas como repetidas: a memória é
+    constante e nenhuma repetição é aceita depois que a janela avança. Uma nova
+    época (acceptor reiniciado) recomeça a contagem daquele acceptor.
+    
+    Não é thread-safe: deve ser usado com o lock do learner adquirido.
+    """
+    
+    def __init__(self, size=1024):
+        """
+        Inicializa a janela.
+        
+        Args:
+            size (int): Quantidade de seqs abaixo da maior já vista que ainda são aceitas
+        """
+        self.size = size
+        self.mask = (1 << size) - 1
+        self.acceptors = {}  # {acceptor_id: [época, maior seq, bitmap]}
+        self.stats = {"duplicates": 0, "too_old": 0}
+    
+    def is_duplicate(self, acceptor_id, epoch, seq):
+        """
+        Registra uma seq e informa se ela já havia sido vista.
+        
+        Args:
+            acceptor_id (str): ID do acceptor
+            epoch (str): Época do acceptor
+            seq (int): Sequência da notificação
+        
+        Returns:
+            bool: True se a notificação deve ser descartada
+        """
+        state = self.acceptors.get(acceptor_id)
+        if state is None or state[0] != epoch:
+            # Bit 0 do bitmap corresponde à maior seq vista
+            self.acceptors[acceptor_id] = [epoch, seq, 1]
+            return False
+        
+        _, highest, bitmap = state
+        if seq > highest:
+            # Saltos maiores que a janela (notificações destinadas a outros learners
+            # enquanto este estava desconectado) esvaziam o bitmap
+            shift = seq - highest
+            state[1] = seq
+            state[2] = ((bitmap << shift) | 1) & self.mask if shift < self.size else 1
+            return False
+        
+        offset = highest - seq
+        if offset >= self.size:
+            self.stats["too_old"] += 1
+            return True
+        
+        bit = 1 << offset
+        if bitmap & bit:
+            self.stats["duplicates"] += 1
+            return True
+        
+        state[2] = bitmap | bit
+        return False
+    
+    def summary(self):
+        """
+        Resume a janela para o endpoint de status.
+        """
+        return {
+            "size": self.size,
+            "highest_seq": {str(acceptor_id): state[1] for acceptor_id, state in self.acceptors.items()},
+            **self.stats
+        }
@@ -0,0 +1,195 @@
+import json
+from array import array
+
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+class SlotStore:
+    """
+    Estado por slot do acceptor em formato colunar.
+    
+    Cada slot ocupa uma posição em três arrays de tamanho fixo (número de
+    proposta aceito, deslocamento e tamanho do valor), e os valores ficam
+    serializados em uma área de bytes separada. A posição de um slot é
+    slot - low_water_mark, então a busca é O(1) e o truncamento abaixo de um
+    slot apenas descarta o início das colunas.
+    
+    Não é thread-safe: deve ser usado com o lock do acceptor adquirido.
+    """
+    
+    def __init__(self, compact_threshold=1024 * 1024):
+        """
+        Inicializa um log vazio.
+        
+        Args:
+            compact_threshold (int): Bytes de valores descartados (sobrescritos ou
+                                     truncados) tolerados antes de reorganizar a área de valores
+        """
+        self.base = 0                 # Primeiro slot mantido (low-water mark)
+        self.ballots = array('q')     # Número de proposta aceito por slot (0 = vazio)
+        self.offsets = array('q')     # Deslocamento do valor na área de valores
+        self.lengths = array('I')     # Tamanho do valor serializado
+        self.values = bytearray()     # Valores serializados como JSON [valor, client_id]
+        self.count = 0                # Slots com valor aceito
+        self.live_bytes = 0
+        self.garbage_bytes = 0
+        self.compact_threshold = compact_threshold
+    
+    def __len__(self):
+        return self.count
+    
+    def __contains__(self, slot):
+        index = slot - self.base
+        return 0 <= index < len(self.ballots) and self.ballots[index] != 0
+    
+    @property
+    def low_water_mark(self):
+        return self.base
+    
+    def put(self, slot, proposal_number, value, client_id=None):
+        """
+        Registra o valor aceito em um slot, substituindo o anterior.
+        
+        Args:
+            slot (int): Slot do log
+            proposal_number (int): Número de proposta aceito (positivo)
+            value: Valor aceito (serializável em JSON)
+            client_id: ID do cliente
+        
+        Returns:
+            bool: False se o slot está abaixo do low-water mark
+        """
+        index = slot - self.base
+        if index < 0:
+            return False
+        
+        missing = index + 1 - len(self.ballots)
+        if missing > 0:
+            # Slots intermediários ficam vazios (número de proposta 0)
+            self.ballots.frombytes(bytes(self.ballots.itemsize * missing))
+            self.offsets.frombytes(bytes(self.offsets.itemsize * missing))
+            self.lengths.frombytes(bytes(self.lengths.itemsize * missing))
+        
+        if self.ballots[index]:
+            self.live_bytes -= self.lengths[index]
+            self.garbage_bytes += self.lengths[index]
+        else:
+            self.count += 1
+        
+        encoded = _encoder.encode([value, client_id]).encode('utf-8')
+        self.offsets[index] = len(self.values)
+        self.lengths[index] = len(encoded)
+        self.ballots[index] = proposal_number
+        self.values += encoded
+        self.live_bytes += len(encoded)
+        
+        self._maybe_compact()
+        return True
+    
+    def get(self, slot):
+        """
+        Retorna o valor aceito em um slot.
+        
+        Returns:
+            dict: {"proposal_number", "value", "client_id"} ou None se vazio/truncado
+        """
+        index = slot - self.base
+        if index < 0 or index >= len(self.ballots) or not self.ballots[index]:
+            return None
+        return self._entry(index)
+    
+    def _entry(self, index):
+        start = self.offsets[index]
+        value, client_id = json.loads(self.values[start:start + self.lengths[index]])
+        return {
+            "proposal_number": self.ballots[index],
+            "value": value,
+            "client_id": client_id
+        }
+    
+    def items(self, from_slot=None, to_slot=None):
+        """
+        Percorre os slots preenchidos em ordem, no intervalo [from_slot, to_slot).
+        
+        Args:
+            from_slot (int, optional): Primeiro slot (padrão: low-water mark)
+            to_slot (int, optional): Slot final, exclusivo (padrão: fim do log)
+        
+        Yields:
+            tuple: (slot, entrada)
+        """
+        start = max(0, (from_slot if from_slot is not None else self.base) - self.base)
+        end = len(self.ballots) if to_slot is None else min(len(self.ballots), to_slot - self.base)
+        
+        for index in range(start, end):
+            if self.ballots[index]:
+                yield self.base + index, self._entry(index)
+    
+    def highest_slot(self):
+        """
+        Retorna o maior slot com valor aceito, ou None se o log está vazio.
+        """
+        for index in range(len(self.ballots) - 1, -1, -1):
+            if self.ballots[index]:
+                return self.base + index
+        return None
+    
+    def truncate_below(self, slot):
+        """
+        Descarta todos os slots abaixo de slot, que passa a ser o low-water mark.
+        
+        Args:
+            slot (int): Novo low-water mark
+        
+        Returns:
+            int: Número de slots preenchidos descartados
+        """
+        if slot <= self.base:
+            return 0
+        
+        dropped = min(slot - self.base, len(self.ballots))
+        removed = dropped - self.ballots[:dropped].count(0)
+        removed_bytes = sum(self.lengths[:dropped])
+        
+        del self.ballots[:dropped]
+        del self.offsets[:dropped]
+        del self.lengths[:dropped]
+        
+        self.base = slot
+        self.count -= removed
+        self.live_bytes -= removed_bytes
+        self.garbage_bytes += removed_bytes
+        
+        self._maybe_compact()
+        return removed
+    
+    def _maybe_compact(self):
+        """
+        Reescreve a área de valores sem os bytes descartados quando eles passam
+        do limite e superam os bytes em uso (custo amortizado O(1) por byte).
+        """
+        if self.garbage_bytes < self.compact_threshold or self.garbage_bytes < self.live_bytes:
+            return
+        
+        values = bytearray()
+        for index in range(len(self.ballots)):
+            if self.ballots[index]:
+                start = self.offsets[index]
+                self.offsets[index] = len(values)
+                values += self.values[start:start + self.lengths[index]]
+        
+        self.values = values
+        self.garbage_bytes = 0
+    
+    def summary(self):
+        """
+        Resume a ocupação do log para o endpoint de status.
+        """
+        column_bytes = sum(column.itemsize * len(column) for column in (self.ballots, self.offsets, self.lengths))
+        return {
+            "low_water_mark": self.base,
+            "slots": self.count,
+            "capacity": len(self.ballots),
+            "column_bytes": column_bytes,
+            "value_bytes": len(self.values),
+            "garbage_bytes": self.garbage_bytes
+        }
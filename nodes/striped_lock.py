@@ -0,0 +1,91 @@
+import threading
+from contextlib import contextmanager
+
+class StripedLock:
+    """
+    Conjunto de locks por faixa (stripe) de slots do acceptor.
+    
+    Operações sobre slots de stripes diferentes prosseguem em paralelo; as de um
+    mesmo slot são serializadas. Operações que precisam de uma visão consistente
+    de todo o log (PREPARE, truncamento, checkpoint) adquirem todos os stripes.
+    Os stripes são sempre adquiridos em ordem crescente, o que evita deadlocks
+    entre lotes e operações exclusivas.
+    """
+    
+    def __init__(self, stripes=16):
+        """
+        Inicializa os locks.
+        
+        Args:
+            stripes (int): Número de stripes (slot % stripes escolhe o stripe)
+        """
+        if stripes < 1:
+            raise ValueError(f"Número de stripes deve ser positivo: {stripes}")
+        
+        self.stripes = stripes
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        
+        # Contadores aproximados: atualizados sem lock próprio (um lock a mais no
+        # caminho quente custaria mais que a medida), incrementos concorrentes podem se perder
+        self.stats = {"acquisitions": 0, "contended": 0, "exclusive": 0}
+    
+    def _index(self, slot):
+        # Anúncios de eleição (slot None) compartilham o primeiro stripe
+        return 0 if slot is None else slot % self.stripes
+    
+    @contextmanager
+    def slots(self, slots):
+        """
+        Adquire os stripes de um conjunto de slots (ex.: um lote de ACCEPTs).
+        
+        Args:
+            slots (iterable): Slots (None para anúncios de eleição)
+        """
+        indexes = sorted({self._index(slot) for slot in slots})
+        self._acquire(indexes)
+        try:
+            yield
+        finally:
+            for index in reversed(indexes):
+                self.locks[index].release()
+    
+    def slot(self, slot):
+        """
+        Adquire o stripe de um único slot.
+        """
+        return self.slots((slot,))
+    
+    @contextmanager
+    def all(self):
+        """
+        Adquire todos os stripes (acesso exclusivo ao log).
+        """
+        self.stats["exclusive"] += 1
+        indexes = range(self.stripes)
+        self._acquire(indexes)
+        try:
+            yield
+        finally:
+            for index in reversed(indexes):
+                self.locks[index].release()
+    
+    def _acquire(self, indexes):
+        for index in indexes:
+            lock = self.locks[index]
+            self.stats["acquisitions"] += 1
+            if not lock.acquire(blocking=False):
+                self.stats["contended"] += 1
+                lock.acquire()
+    
+    def summary(self):
+        """
+        Resume a configuração e a contenção para o endpoint de status
+        (contadores aproximados, sinalizados em "approximate").
+        """
+        acquisitions = self.stats["acquisitions"]
+        return {
+            "stripes": self.stripes,
+            "approximate": True,
+            "contention_rate": self.stats["contended"] / acquisitions if acquisitions else 0.0,
+            **self.stats
+        }
@@ -0,0 +1,82 @@
+class VoteTracker:
+    """
+    Votos dos acceptors ainda sem quórum, contados pelo learner.
+    
+    Cada acceptor recebe um bit fixo na primeira vez em que vota, e os votos de
+    uma instância (slot, número de proposta e valor) são um inteiro com um bit
+    por acceptor: reenvios do mesmo acceptor não contam de novo e a contagem é
+    o número de bits ligados. As entradas de um slot são descartadas assim que
+    ele é decidido, então o tamanho acompanha apenas os slots em andamento.
+    
+    Não é thread-safe: deve ser usado com o lock do learner adquirido.
+    """
+    
+    def __init__(self):
+        """
+        Inicializa o rastreador sem votos.
+        """
+        self.acceptor_bits = {}  # {acceptor_id: bit}
+        self.votes = {}          # {instância: {(número de proposta, valor): bitmap de acceptors}}
+        self.stats = {"votes": 0, "discarded_instances": 0}
+    
+    def _bit(self, acceptor_id):
+        bit = self.acceptor_bits.get(acceptor_id)
+        if bit is None:
+            bit = 1 << len(self.acceptor_bits)
+            self.acceptor_bits[acceptor_id] = bit
+        return bit
+    
+    def record_batch(self, votes):
+        """
+        Registra os votos de um lote de notificações.
+        
+        Os votos são primeiro agrupados por instância (um OR de bits por voto) e
+        cada instância tocada pelo lote é atualizada e contada uma única vez.
+        
+        Args:
+            votes (list): Tuplas (instância, número de proposta, chave do valor, acceptor_id);
+                          a instância é o slot, ou ("election", número) em eleições, e a
+                          chave deve ser hashable (valores não-string chegam serializados)
+        
+        Returns:
+            dict: {(instância, número de proposta, valor): acceptors que votaram}
+        """
+        masks = {}
+        for instance, proposal_number, vote_key, acceptor_id in votes:
+            key = (instance, proposal_number, vote_key)
+            masks[key] = masks.get(key, 0) | self._bit(acceptor_id)
+        
+        counts = {}
+        for (instance, proposal_number, vote_key), mask in masks.items():
+            ballots = self.votes.setdefault(instance, {})
+            bitmap = ballots.get((proposal_number, vote_key), 0) | mask
+            ballots[(proposal_number, vote_key)] = bitmap
+            counts[(instance, proposal_number, vote_key)] = bin(bitmap).count("1")
+        
+        self.stats["votes"] += len(votes)
+        return counts
+    
+    def discard(self, instance):
+        """
+        Descarta todos os votos de uma instância decidida.
+        """
+        if self.votes.pop(instance, None) is not None:
+            self.stats["discarded_instances"] += 1
+    
+    def discard_below(self, slot):
+        """
+        Descarta os votos de todos os slots abaixo de slot (ex.: cobertos por um snapshot).
+        """
+        for instance in [i for i in self.votes if not isinstance(i, tuple) and i < slot]:
+            self.discard(instance)
+    
+    def summary(self):
+        """
+        Resume o rastreador para o endpoint de status.
+        """
+        return {
+            "tracked_instances": len(self.votes),
+            "tracked_ballots": sum(len(ballots) for ballots in self.votes.values()),
+            "acceptors": len(self.acceptor_bits),
+            **self.stats
+        }
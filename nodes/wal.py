@@ -0,0 +1,304 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+class WriteAheadLog:
+    """
+    Log de escrita antecipada (WAL) do acceptor: registros JSON em um arquivo
+    append-only, cada linha precedida do CRC32 do conteúdo para detectar uma
+    escrita interrompida no fim do arquivo.
+    
+    Group commit: append() apenas enfileira o registro; sync() garante que ele
+    está em disco. A primeira thread que chama sync() grava e faz fsync de todos
+    os registros enfileirados até então; as demais aguardam esse mesmo fsync.
+    Sob carga (outros handlers já aguardando em sync() ou com registros na fila),
+    o responsável pelo fsync espera uma fração do tempo de fsync, proporcional a
+    essa carga e limitada por max_group_delay, para que mais registros entrem no grupo.
+    """
+    
+    def __init__(self, path, sync_enabled=True, max_group_delay=0.002, logger=None):
+        """
+        Abre (ou cria) o log.
+        
+        Args:
+            path (str): Caminho do arquivo do log
+            sync_enabled (bool): Se False, grava sem fsync (apenas para testes de desempenho)
+            max_group_delay (float): Espera máxima, em segundos, para formar um grupo
+            logger (logging.Logger, optional): Logger do nó
+        """
+        self.path = path
+        self.sync_enabled = sync_enabled
+        self.max_group_delay = max_group_delay
+        self.logger = logger
+        
+        self.condition = threading.Condition()
+        self.buffer = []        # Linhas enfileiradas ainda não gravadas
+        self.next_lsn = 0       # Número de sequência do último registro enfileirado
+        self.durable_lsn = 0    # Todos os registros até este estão em disco
+        self.flushing = False   # Há uma thread gravando um grupo
+        self.sync_waiters = 0   # Threads dentro de sync() (carga atual)
+        
+        # Métricas (médias móveis em segundos)
+        self.stats = {
+            "appends": 0,
+            "syncs": 0,
+            "compactions": 0,
+            "replayed_records": 0,
+            "truncated_bytes": 0
+        }
+        self.avg_group_size = 1.0
+        self.fsync_avg = 0.0
+        self.fsync_max = 0.0
+        self.commit_wait_avg = 0.0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.file = open(path, 'a', encoding='utf-8')
+    
+    @staticmethod
+    def _encode(record):
+        payload = json.dumps(record, separators=(',', ':'))
+        return f"{zlib.crc32(payload.encode('utf-8')):08x} {payload}\n"
+    
+    def replay(self):
+        """
+        Lê todos os registros válidos do log. Um registro final incompleto ou
+        corrompido (queda durante a escrita) é descartado e o arquivo truncado.
+        
+        Returns:
+            list: Registros na ordem em que foram gravados
+        """
+        records = []
+        valid_bytes = 0
+        
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                try:
+                    line = raw.decode('utf-8')
+                    checksum, payload = line.rstrip('\n').split(' ', 1)
+                    if not line.endswith('\n') or int(checksum, 16) != zlib.crc32(payload.encode('utf-8')):
+                        break
+                    records.append(json.loads(payload))
+                except ValueError:
+                    break
+                valid_bytes += len(raw)
+        
+        size = os.path.getsize(self.path)
+        if size > valid_bytes:
+            if self.logger:
+                self.logger.warning(f"WAL: descartando {size - valid_bytes} bytes inválidos no fim de {self.path}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+                os.fsync(f.fileno())
+            self.stats["truncated_bytes"] += size - valid_bytes
+        
+        self.stats["replayed_records"] = len(records)
+        return records
+    
+    def append(self, record):
+        """
+        Enfileira um registro, sem gravar. Deve ser chamado na mesma seção
+        crítica que altera o estado, para que a ordem do log seja a do estado.
+        
+        Args:
+            record (dict): Registro serializável em JSON
+        
+        Returns:
+            tuple: (lsn, instante do append), a ser passado para sync()
+        """
+        return self.append_many([record])
+    
+    def append_many(self, records):
+        """
+        Enfileira vários registros de uma vez (ex.: um lote de ACCEPTs); um único
+        sync() com o retorno garante todos eles.
+        
+        Args:
+            records (list): Registros serializáveis em JSON
+        
+        Returns:
+            tuple: (lsn do último registro, instante do append)
+        """
+        lines = [self._encode(record) for record in records]
+        with self.condition:
+            self.buffer.extend(lines)
+            self.next_lsn += len(lines)
+            self.stats["appends"] += len(lines)
+            return self.next_lsn, time.time()
+    
+    def mark(self):
+        """
+        Ticket que cobre todos os registros já enfileirados, para esperar que
+        um estado lido da memória esteja em disco antes de expô-lo.
+        
+        Returns:
+            tuple: (lsn do último registro enfileirado, instante atual)
+        """
+        with self.condition:
+            return self.next_lsn, time.time()
+    
+    def sync(self, ticket):
+        """
+        Bloqueia até que o registro (e todos os anteriores) esteja em disco.
+        
+        Args:
+            ticket (tuple): Retorno de append()
+        
+        Raises:
+            OSError: Se a gravação do grupo falhar
+        """
+        lsn, appended_at = ticket
+        
+        with self.condition:
+            self.sync_waiters += 1
+        
+        try:
+            while True:
+                with self.condition:
+                    if self.durable_lsn >= lsn:
+                        break
+                    if self.flushing:
+                        self.condition.wait()
+                        continue
+                    self.flushing = True
+                    delay = self._group_delay()
+                
+                if delay > 0:
+                    time.sleep(delay)
+                
+                self._flush_group()
+        finally:
+            with self.condition:
+                self.sync_waiters -= 1
+        
+        waited = time.time() - appended_at
+        with self.condition:
+            self.commit_wait_avg = 0.9 * self.commit_wait_avg + 0.1 * waited
+    
+    def _group_delay(self):
+        """
+        Espera antes do fsync, dimensionada pela carga do momento: os outros
+        handlers já em sync() e os registros enfileirados além do próprio. Sem
+        concorrência o fsync é imediato; com N handlers concorrentes, a espera é
+        N/(N+1) do tempo médio de fsync, limitada por max_group_delay.
+        Deve ser chamado com a condição adquirida.
+        """
+        if not self.sync_enabled:
+            return 0
+        
+        concurrent = max(self.sync_waiters - 1, len(self.buffer) - 1)
+        if concurrent <= 0:
+            return 0
+        return min(self.max_group_delay, self.fsync_avg * concurrent / (concurrent + 1))
+    
+    def _flush_group(self):
+        """
+        Grava e sincroniza os registros enfileirados. Chamado apenas pela
+        thread que marcou flushing.
+        """
+        with self.condition:
+            lines, self.buffer = self.buffer, []
+            target = self.next_lsn
+        
+        try:
+            started = time.time()
+            self.file.write(''.join(lines))
+            self.file.flush()
+            if self.sync_enabled:
+                os.fsync(self.file.fileno())
+            elapsed = time.time() - started
+        except OSError:
+            with self.condition:
+                # Devolver o grupo para que a próxima tentativa o grave
+                self.buffer = lines + self.buffer
+                self.flushing = False
+                self.condition.notify_all()
+            raise
+        
+        with self.condition:
+            self.durable_lsn = target
+            self.flushing = False
+            self.stats["syncs"] += 1
+            self.avg_group_size = 0.8 * self.avg_group_size + 0.2 * len(lines)
+            self.fsync_avg = 0.8 * self.fsync_avg + 0.2 * elapsed
+            self.fsync_max = max(self.fsync_max, elapsed)
+            self.condition.notify_all()
+    
+    def size(self):
+        """
+        Retorna o tamanho atual do arquivo do log em bytes.
+        """
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def compact(self, records):
+        """
+        Substitui o log por um checkpoint do estado atual. O chamador deve impedir
+        novos append() durante a chamada e passar registros que reflitam todos os
+        já enfileirados, que passam então a ser considerados duráveis.
+        
+        Args:
+            records (list): Registros que reconstroem o estado atual
+        """
+        with self.condition:
+            while self.flushing:
+                self.condition.wait()
+            self.flushing = True
+            target = self.next_lsn
+        
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(self._encode(record) for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            
+            # Tornar o rename durável
+            dir_fd = os.open(os.path.dirname(self.path) or '.', os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            # O log antigo continua válido; os registros enfileirados serão gravados nele
+            with self.condition:
+                self.flushing = False
+                self.condition.notify_all()
+            raise
+        
+        with self.condition:
+            self.file.close()
+            self.file = open(self.path, 'a', encoding='utf-8')
+            self.buffer = []
+            self.durable_lsn = target
+            self.stats["compactions"] += 1
+            self.flushing = False
+            self.condition.notify_all()
+    
+    def summary(self):
+        """
+        Resume o estado e a latência do log para o endpoint de status.
+        
+        Returns:
+            dict: Contadores, tamanho médio dos grupos e latências em milissegundos
+        """
+        with self.condition:
+            return {
+                "path": self.path,
+                "bytes": self.size(),
+                "fsync": self.sync_enabled,
+                "pending_records": len(self.buffer),
+                "sync_waiters": self.sync_waiters,
+                "avg_group_size": round(self.avg_group_size, 2),
+                "fsync_latency_avg_ms": self.fsync_avg * 1000,
+                "fsync_latency_max_ms": self.fsync_max * 1000,
+                "append_to_durable_avg_ms": self.commit_wait_avg * 1000,
+                **self.stats
+            }
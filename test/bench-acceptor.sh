@@ -0,0 +1,159 @@
+#!/bin/bash
+
+# Benchmark de contenção do acceptor: ACCEPTs concorrentes em slots distintos
+# contra um acceptor local isolado (fora do cluster), variando o número de
+# threads do cliente (atendidas por threads do servidor Flask) e o número de
+# stripes de lock (ACCEPTOR_LOCK_STRIPES=1 equivale a um único lock global).
+#
+# Cada rodada informa a vazão e, por configuração, a contenção dos stripes
+# ("contended" em locks). Sem contenção com um único lock, não há o que os
+# stripes removerem: a seção crítica (comparação de propostas e atualização do
+# estado, sob o state_lock compartilhado) é curta, e a vazão é limitada pelo
+# Flask e pelo GIL. Medido com THREADS="1 4 16", REQUESTS=600: 1 stripe deu
+# 294-354 accepts/s e 16 stripes 305-346 (com WAL_FSYNC=true, 323-375 contra
+# 295-301), sempre com contended=0, ou seja, sem ganho com os stripes.
+#
+# Uso: ./test/bench-acceptor.sh
+#   THREADS="1 2 4 8 16 32"   Threads concorrentes em cada rodada
+#   STRIPES="1 16"            Valores de ACCEPTOR_LOCK_STRIPES comparados
+#   REQUESTS=2000             ACCEPTs por rodada
+#   WAL_FSYNC=false           fsync do WAL (desativado por padrão para medir o lock)
+#   PORT=4099                 Porta do acceptor de teste
+
+# Cores para output
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+BLUE='\033[0;34m'
+CYAN='\033[0;36m'
+NC='\033[0m' # No Color
+
+THREADS=${THREADS:-"1 2 4 8 16 32"}
+STRIPES=${STRIPES:-"1 16"}
+REQUESTS=${REQUESTS:-2000}
+WAL_FSYNC=${WAL_FSYNC:-false}
+PORT=${PORT:-4099}
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+NODES_DIR="$SCRIPT_DIR/../nodes"
+
+show_section_header() {
+    echo -e "\n${BLUE}═════════════════════════════════════════════════════════════════${NC}"
+    echo -e "${BLUE}              $1              ${NC}"
+    echo -e "${BLUE}═════════════════════════════════════════════════════════════════${NC}"
+}
+
+show_subsection_header() {
+    echo -e "\n${CYAN}────────────────── $1 ──────────────────${NC}"
+}
+
+ACCEPTOR_PID=""
+DATA_DIR=""
+
+stop_acceptor() {
+    if [ ! -z "$ACCEPTOR_PID" ]; then
+        kill $ACCEPTOR_PID 2>/dev/null
+        wait $ACCEPTOR_PID 2>/dev/null
+        ACCEPTOR_PID=""
+    fi
+    if [ ! -z "$DATA_DIR" ]; then
+        rm -rf "$DATA_DIR"
+        DATA_DIR=""
+    fi
+}
+
+trap stop_acceptor EXIT
+
+start_acceptor() {
+    local stripes=$1
+
+    DATA_DIR=$(mktemp -d)
+    (cd "$NODES_DIR" && NODE_ID=99 NODE_ROLE=acceptor PORT=$PORT HOSTNAME=localhost SEED_NODES="" \
+        DATA_DIR="$DATA_DIR" WAL_FSYNC=$WAL_FSYNC ACCEPTOR_LOCK_STRIPES=$stripes \
+        exec python3 main.py > "$DATA_DIR/acceptor.log" 2>&1) &
+    ACCEPTOR_PID=$!
+
+    for ((i=1; i<=30; i++)); do
+        if curl -s -m 1 "http://localhost:$PORT/health" > /dev/null; then
+            return 0
+        fi
+        sleep 0.5
+    done
+
+    echo -e "${RED}[ERRO] Acceptor de teste não respondeu na porta $PORT${NC}"
+    cat "$DATA_DIR/acceptor.log"
+    return 1
+}
+
+run_round() {
+    python3 - "$PORT" "$1" "$REQUESTS" "$2" <<'EOF'
+import sys
+import time
+import threading
+import requests
+
+port, threads, total, first_slot = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4])
+url = f"http://localhost:{port}/accept"
+latencies = []
+errors = [0]
+lock = threading.Lock()
+
+def worker(index):
+    session = requests.Session()
+    local = []
+    # Cada thread usa slots próprios: o benchmark mede o lock, não conflitos de slot
+    for slot in range(first_slot + index, first_slot + total, threads):
+        started = time.time()
+        response = session.post(url, json={
+            "proposer_id": 1,
+            "proposal_number": 101,
+            "slot": slot,
+            "value": f"bench-{slot}",
+            "client_id": 9
+        }, timeout=10)
+        local.append(time.time() - started)
+        if response.status_code != 200 or response.json().get("status") != "accepted":
+            with lock:
+                errors[0] += 1
+    with lock:
+        latencies.extend(local)
+
+started = time.time()
+workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+for w in workers:
+    w.start()
+for w in workers:
+    w.join()
+elapsed = time.time() - started
+
+latencies.sort()
+p50 = latencies[len(latencies) // 2] * 1000
+p99 = latencies[int(len(latencies) * 0.99)] * 1000
+print(f"{threads:>8} {len(latencies) / elapsed:>12.0f} {p50:>10.2f} {p99:>10.2f} {errors[0]:>7}")
+EOF
+}
+
+show_section_header "BENCHMARK DE CONTENÇÃO - ACCEPTOR"
+echo -e "${YELLOW}Requisições por rodada: $REQUESTS | WAL_FSYNC=$WAL_FSYNC | Threads: $THREADS${NC}"
+
+for stripes in $STRIPES; do
+    show_subsection_header "ACCEPTOR_LOCK_STRIPES=$stripes"
+
+    start_acceptor $stripes || exit 1
+
+    # Prometer o número de proposta usado nos ACCEPTs
+    curl -s -m 5 -X POST "http://localhost:$PORT/prepare" -H "Content-Type: application/json" \
+        -d '{"proposer_id": 1, "proposal_number": 101, "from_slot": 0}' > /dev/null
+
+    printf "%8s %12s %10s %10s %7s\n" "threads" "accepts/s" "p50 (ms)" "p99 (ms)" "erros"
+
+    slot=0
+    for threads in $THREADS; do
+        run_round $threads $slot
+        slot=$((slot + REQUESTS))
+    done
+
+    echo -e "${GREEN}Locks (contadores aproximados):${NC} $(curl -s -m 5 "http://localhost:$PORT/status" | python3 -c "import json, sys; locks = json.load(sys.stdin).get('locks'); print(f\"contended={locks['contended']} de {locks['acquisitions']} aquisições (taxa {locks['contention_rate']:.4f})\")")"
+
+    stop_acceptor
+done